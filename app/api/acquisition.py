@@ -3,20 +3,116 @@ Data Acquisition API Endpoints
 """
 from fastapi import APIRouter, HTTPException, Query
 from datetime import datetime
-from app.models.schemas import (
-    DAQReadResponse,
-    DAQData
-)
+from functools import partial
+from typing import Optional
+import numpy as np
+from app.models.schemas import ADCStatusResponse, CaptureStatus, DAQReadResponse
+from app.api.responses import contiguous, fast_json_response
 from app.services.acquisition_service import acquisition_service
+from app.services.decimation import decimate as decimate_data
+from app.services.hardware_executor import run_on_hardware
 
 router = APIRouter(prefix="/api", tags=["acquisition"])
 
+DECIMATE_QUERY = Query(
+    default=None,
+    pattern="^(lttb|minmax)$",
+    description="Server-side decimation: 'lttb' (Largest-Triangle-Three-Buckets) or 'minmax' (min/max per bucket)"
+)
+POINTS_QUERY = Query(default=2000, ge=10, le=100000, description="Target points per channel when decimating")
+
+
+def build_read_payload(
+    data: np.ndarray,
+    sample_rate: int,
+    decimate: Optional[str] = None,
+    points: int = 2000,
+    warning: Optional[str] = None,
+    run_id: Optional[str] = None,
+    trigger: Optional[dict] = None,
+    statistics: Optional[dict] = None
+) -> dict:
+    """
+    Build the content of a DAQReadResponse for acquired data, optionally decimated
+    
+    Channel values stay numpy arrays, to be encoded by FastJSONResponse
+    without building Python lists. Rows of stored runs (transposed
+    memory maps) are copied into contiguous arrays, which orjson encodes
+    natively.
+    
+    Args:
+        data: Array of shape (4, samples)
+        sample_rate: Sampling rate in Hz
+        decimate: Decimation method ('lttb', 'minmax') or None for full resolution
+        points: Target points per channel when decimating
+        warning: Optional warning message
+        run_id: ID of the stored run
+        trigger: Switching event of a relay-triggered acquisition, if any
+        statistics: Per-channel statistics computed during the acquisition, if any
+        
+    Returns:
+        Dictionary with the fields of DAQReadResponse
+    """
+    indices = None
+    values = np.asarray(data)
+    
+    if decimate is not None:
+        index_array, values = decimate_data(data, decimate, points)
+        indices = {f'adc{n + 1}': contiguous(index_array[n]) for n in range(4)}
+    
+    return {
+        'status': "success",
+        'samples': data.shape[1],
+        'sample_rate': sample_rate,
+        'channels': 4,
+        'data': {f'adc{n + 1}': contiguous(values[n]) for n in range(4)},
+        'timestamp': datetime.now().isoformat(),
+        'warning': warning,
+        'decimation': decimate,
+        'indices': indices,
+        'run_id': run_id,
+        'trigger_sample': trigger['sample_index'] if trigger else None,
+        'statistics': statistics
+    }
+
+
+def build_read_response(
+    data: np.ndarray,
+    sample_rate: int,
+    decimate: Optional[str] = None,
+    points: int = 2000,
+    warning: Optional[str] = None,
+    run_id: Optional[str] = None,
+    trigger: Optional[dict] = None,
+    statistics: Optional[dict] = None
+) -> DAQReadResponse:
+    """
+    Build the API response model for acquired data (see build_read_payload)
+    
+    The endpoints send build_read_payload() through FastJSONResponse instead;
+    this validated model is for callers that need the Pydantic object.
+    
+    Returns:
+        DAQReadResponse with per-channel values (and indices when decimated)
+    """
+    payload = build_read_payload(data, sample_rate, decimate, points, warning, run_id, trigger, statistics)
+    for key in ('data', 'indices'):
+        if payload[key] is not None:
+            payload[key] = {channel: values.tolist() for channel, values in payload[key].items()}
+    return DAQReadResponse(**payload)
+
 
 @router.post("/start-read-adc")
 async def start_read_adc(
     samples: int = Query(default=500, ge=100, le=500000, description="Number of samples per channel (or buffer size)"),
     sample_rate: int = Query(default=100, ge=1, le=500000, description="Sampling rate in Hz"),
-    measurement_time: float = Query(default=0, ge=0, le=20, description="Expected measurement duration in seconds (optional)")
+    measurement_time: float = Query(default=0, ge=0, le=20, description="Expected measurement duration in seconds (optional)"),
+    circuit: Optional[str] = Query(default=None, pattern="^(rl|rc|rlc)$", description="Circuit type, stored with the run"),
+    inductance: Optional[str] = Query(default=None, max_length=64, description="Inductance label, stored with the run"),
+    capacitance: Optional[str] = Query(default=None, max_length=64, description="Capacitance label, stored with the run"),
+    resistance: Optional[str] = Query(default=None, max_length=64, description="Resistance label, stored with the run"),
+    discharge_resistor: Optional[str] = Query(default=None, max_length=64, description="Discharge resistor label, stored with the run"),
+    trigger_relay: Optional[str] = Query(default=None, max_length=16, description="Relay to switch on once the ADC is armed (e.g. zs1_1); its switching sample is reported")
 ):
     """
     Start continuous ADC measurement from all 4 ADC channels
@@ -24,7 +120,14 @@ async def start_read_adc(
     This endpoint configures and starts ADC data acquisition in the background.
     No data is returned until stop-read-adc is called.
     
-    This endpoint ONLY configures ADC - it does not control relays or charge capacitors.
+    This endpoint ONLY configures ADC - it does not control relays or charge
+    capacitors, except for the optional trigger relay.
+    
+    With `trigger_relay` (normally zs1_1, main power), the ADC is armed first
+    and the relay is switched on by the server. `trigger.sample_index` is
+    the sample at which it switched: exact (0) when the adc_trigger_source
+    setting names a terminal wired to the relay line, otherwise from software
+    timestamps, within `trigger.uncertainty_samples`.
     
     Workflow:
     1. Call this endpoint to start acquisition
@@ -35,9 +138,17 @@ async def start_read_adc(
         samples: Number of samples per channel to acquire (default: 500, range: 100-500000)
         sample_rate: Sampling rate in Hz (default: 100, range: 1-1000000)
         measurement_time: Expected measurement duration in seconds (default: 0, range: 0-10)
+        circuit, inductance, capacitance, resistance, discharge_resistor:
+            Optional circuit description, written to the METADATA/PARAMETERS
+            sections of exports of this run
+        trigger_relay: Optional relay to switch on after arming the ADC
         
     Returns:
         Status message confirming acquisition has started
+        
+    Raises:
+        400 Bad Request: If trigger_relay is unknown or already ON
+        409 Conflict: If acquisition or streaming is already running
     """
     try:
         # Calculate optimal buffer size based on measurement time if provided
@@ -49,20 +160,33 @@ async def start_read_adc(
         else:
             buffer_size = samples
         
-        result = acquisition_service.start_read_adc(
+        parameters = {
+            'inductance': inductance,
+            'capacitance': capacitance,
+            'resistance': resistance,
+            'discharge_resistor': discharge_resistor
+        }
+        result = await run_on_hardware(
+            acquisition_service.start_read_adc,
             samples_per_channel=buffer_size,
-            sample_rate=sample_rate
+            sample_rate=sample_rate,
+            circuit=circuit,
+            parameters={key: value for key, value in parameters.items() if value},
+            trigger_relay=trigger_relay
         )
         
         return {
             "status": "started",
-            "message": f"ADC acquisition started successfully with buffer size: {buffer_size}",
+            "message": f"ADC acquisition started successfully with buffer size: {result['buffer_size']}",
             "samples_per_channel": result['samples_per_channel'],
             "sample_rate": result['sample_rate'],
             "channels": result['channels'],
-            "buffer_size": buffer_size,
+            "buffer_size": result['buffer_size'],
+            "trigger": result['trigger'],
             "timestamp": datetime.now().isoformat()
         }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except RuntimeError as e:
         raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
@@ -73,15 +197,28 @@ async def start_read_adc(
 
 
 @router.post("/stop-read-adc", response_model=DAQReadResponse)
-async def stop_read_adc():
+async def stop_read_adc(
+    decimate: Optional[str] = DECIMATE_QUERY,
+    points: int = POINTS_QUERY
+):
     """
     Stop ADC acquisition and return all collected data
     
     This endpoint stops the running ADC acquisition and returns all data
-    collected from the 4 ADC channels since start-read-adc was called.
+    collected from the 4 ADC channels since start-read-adc was called,
+    with per-channel `statistics` computed during the acquisition.
+    
+    With `decimate` set, the data is reduced on the server to about `points`
+    points per channel and `indices` holds the sample index of every point.
+    The full-resolution data stays available from GET /adc-data and,
+    under the returned `run_id`, from GET /runs/{run_id}/samples.
+    
+    Args:
+        decimate: Optional decimation method ('lttb' or 'minmax')
+        points: Target points per channel when decimating (default: 2000)
     
     Returns:
-        All acquired data from all 4 ADC channels
+        All acquired data from all 4 ADC channels (or its decimated form)
         
     Raises:
         409 Conflict: If no acquisition is currently running
@@ -90,22 +227,23 @@ async def stop_read_adc():
         # Get config before stopping (stop_read_adc clears it)
         config = acquisition_service._task_config.copy() if acquisition_service._task_config else {}
         
-        # Stop and get data
-        adc1, adc2, adc3, adc4 = acquisition_service.stop_read_adc()
+        # Stop and get data (array of shape (4, samples))
+        data = await run_on_hardware(acquisition_service.stop_read_adc)
+        
+        # Reader errors (e.g. buffer overrun) end the run early but keep the data
+        reader_error = acquisition_service._reader_error
         
-        return DAQReadResponse(
-            status="success",
-            samples=len(adc1),
+        return await fast_json_response(partial(
+            build_read_payload,
+            data,
             sample_rate=config.get('sample_rate', 0),
-            channels=4,
-            data=DAQData(
-                adc1=adc1,
-                adc2=adc2,
-                adc3=adc3,
-                adc4=adc4
-            ),
-            timestamp=datetime.now().isoformat()
-        )
+            decimate=decimate,
+            points=points,
+            warning=f"Acquisition ended early: {reader_error}" if reader_error else None,
+            run_id=acquisition_service.get_last_run_id(),
+            trigger=config.get('trigger'),
+            statistics=acquisition_service.get_last_statistics()
+        ), endpoint='stop_read_adc')
     except RuntimeError as e:
         raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
@@ -115,10 +253,28 @@ async def stop_read_adc():
         )
 
 
-@router.get("/adc-status")
-async def get_adc_status():
+@router.get("/adc-status", response_model=ADCStatusResponse)
+async def get_adc_status(
+    preview_points: int = Query(default=0, ge=0, le=10000, description="Points per channel of a preview of the most recent samples (0: no preview)"),
+    preview_decimate: str = Query(default="minmax", pattern="^(lttb|minmax)$", description="Decimation method of the preview")
+):
     """
-    Check if ADC acquisition is currently running
+    Check if ADC acquisition is currently running, and how far it got
+    
+    Everything is served from counters the reader keeps in memory; the DAQ
+    task is not touched, so this endpoint can be polled while measuring.
+    
+    While running:
+    - `progress`: samples acquired, elapsed time, DAQ buffer fill (estimated
+      from the last read and the time since) and the resulting overrun risk
+    - `statistics`: per-channel min, max, mean, RMS, variance and the sample
+      index and time of the min and max, updated as blocks arrive
+    - `preview` (with `preview_points` > 0): the last status_preview_seconds
+      of samples, decimated, with the absolute sample index of every point
+    
+    Args:
+        preview_points: Points per channel of the preview (0: no preview)
+        preview_decimate: Decimation method of the preview ('lttb' or 'minmax')
     
     Returns:
         Status information about the current ADC acquisition state
@@ -126,9 +282,165 @@ async def get_adc_status():
     is_running = acquisition_service.is_acquisition_running()
     config = acquisition_service._task_config.copy() if acquisition_service._task_config else None
     
-    return {
+    return await fast_json_response(lambda: {
         "is_running": is_running,
         "configuration": config,
+        "progress": acquisition_service.get_progress(),
+        "statistics": acquisition_service.get_statistics(),
+        "preview": acquisition_service.get_preview(preview_points, preview_decimate) if preview_points else None,
         "timestamp": datetime.now().isoformat()
-    }
+    }, endpoint='adc_status')
+
+
+@router.get("/adc-data", response_model=DAQReadResponse)
+async def get_adc_data(
+    decimate: Optional[str] = DECIMATE_QUERY,
+    points: int = POINTS_QUERY
+):
+    """
+    Get the data of the most recent completed acquisition
+    
+    Returns the full-resolution data by default, or a decimated version
+    when `decimate` is set.
+    
+    Args:
+        decimate: Optional decimation method ('lttb' or 'minmax')
+        points: Target points per channel when decimating (default: 2000)
+    
+    Returns:
+        Data from all 4 ADC channels
+        
+    Raises:
+        404 Not Found: If no acquisition has completed yet
+    """
+    try:
+        data, config = acquisition_service.get_last_data()
+    except RuntimeError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    
+    return await fast_json_response(partial(
+        build_read_payload,
+        data,
+        sample_rate=config.get('sample_rate', 0),
+        decimate=decimate,
+        points=points,
+        run_id=acquisition_service.get_last_run_id(),
+        trigger=config.get('trigger'),
+        statistics=acquisition_service.get_last_statistics()
+    ), endpoint='adc_data')
+
+
+@router.post("/capture/start", response_model=CaptureStatus)
+async def start_capture(
+    level: float = Query(description="Trigger level in volts"),
+    slope: str = Query(default="rising", pattern="^(rising|falling|either)$", description="Crossing direction"),
+    channel: str = Query(default="any", pattern="^(any|adc[1-4])$", description="Channel to watch, or any of them"),
+    sample_rate: int = Query(default=100000, ge=1, le=500000, description="Sampling rate in Hz"),
+    pre_samples: int = Query(default=1000, ge=0, le=500000, description="Samples per channel kept before the trigger"),
+    post_samples: int = Query(default=1000, ge=1, le=500000, description="Samples per channel kept from the trigger on"),
+    circuit: Optional[str] = Query(default=None, pattern="^(rl|rc|rlc)$", description="Circuit type, stored with the run")
+):
+    """
+    Arm a triggered capture
+    
+    The ADC runs continuously and each block is checked for the trigger
+    condition on the server. Only the last `pre_samples` are kept while
+    waiting; when the watched channel crosses `level` in the `slope`
+    direction, the pre-trigger samples and `post_samples` from the trigger
+    on are stored as a run and acquisition stops. A capture can wait
+    indefinitely without using more memory or storage.
+    
+    Workflow:
+    1. Call this endpoint to arm the capture
+    2. Switch the circuit (relays, sequence)
+    3. Poll /capture/status until state is 'completed', then call
+       /capture/stop (or call it earlier to cancel)
+    
+    Returns:
+        Capture status
+        
+    Raises:
+        409 Conflict: If acquisition, streaming or another capture is running
+    """
+    try:
+        return await run_on_hardware(
+            acquisition_service.start_capture,
+            sample_rate=sample_rate,
+            level=level,
+            slope=slope,
+            channel=channel,
+            pre_samples=pre_samples,
+            post_samples=post_samples,
+            circuit=circuit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error arming triggered capture: {str(e)}"
+        )
+
 
+@router.get("/capture/status", response_model=CaptureStatus)
+async def get_capture_status():
+    """
+    Get the state of the current or last triggered capture
+    
+    Returns:
+        Capture status; `trigger.sample_index` is the trigger sample in the stored run
+        
+    Raises:
+        404 Not Found: If no capture was armed
+    """
+    status = acquisition_service.get_capture_status()
+    if status is None:
+        raise HTTPException(status_code=404, detail="No triggered capture was armed")
+    return status
+
+
+@router.post("/capture/stop", response_model=DAQReadResponse)
+async def stop_capture(
+    decimate: Optional[str] = DECIMATE_QUERY,
+    points: int = POINTS_QUERY
+):
+    """
+    Stop the triggered capture and return the captured event
+    
+    If the capture is still waiting for its trigger, it is cancelled (409).
+    If it triggered but has not stored all post-trigger samples yet, the
+    samples stored so far are returned. `trigger_sample` is the index of
+    the trigger sample.
+    
+    Args:
+        decimate: Optional decimation method ('lttb' or 'minmax')
+        points: Target points per channel when decimating (default: 2000)
+    
+    Returns:
+        Captured data from all 4 ADC channels (or its decimated form)
+        
+    Raises:
+        409 Conflict: If no capture was armed or it ended without a trigger
+    """
+    try:
+        data, status = await run_on_hardware(acquisition_service.stop_capture)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error stopping triggered capture: {str(e)}"
+        )
+    
+    return await fast_json_response(partial(
+        build_read_payload,
+        data,
+        sample_rate=status['sample_rate'],
+        decimate=decimate,
+        points=points,
+        warning=f"Capture ended early: {status['error']}" if status['error'] else None,
+        run_id=status['run_id'],
+        trigger=status['trigger']
+    ), endpoint='capture')
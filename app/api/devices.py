@@ -2,8 +2,10 @@
 Device Information API Endpoints
 """
 from fastapi import APIRouter, HTTPException
-from app.models.schemas import DevicesResponse
+from datetime import datetime
+from app.models.schemas import DevicesResponse, HardwareQueueStatus
 from app.services.device_service import device_service
+from app.services.hardware_executor import get_stats, run_on_hardware
 
 router = APIRouter(prefix="/api", tags=["devices"])
 
@@ -17,10 +19,24 @@ async def get_devices():
         Device information including driver version and connected devices
     """
     try:
-        return device_service.get_devices()
+        return await run_on_hardware(device_service.get_devices)
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Error querying devices: {str(e)}"
         )
 
+
+@router.get("/hardware/queue", response_model=HardwareQueueStatus)
+async def get_hardware_queue():
+    """
+    Get statistics of the hardware worker queue
+    
+    All DAQmx calls run one at a time on a single worker thread. This
+    reports how many calls are waiting, how long they waited and how many
+    relay writes were coalesced.
+    
+    Returns:
+        Queue depth, counters and queue wait times
+    """
+    return HardwareQueueStatus(**get_stats(), timestamp=datetime.now().isoformat())
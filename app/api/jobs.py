@@ -0,0 +1,90 @@
+"""
+Hardware Job API Endpoints
+"""
+from fastapi import APIRouter, HTTPException, Query
+from app.models.schemas import (
+    CapacitorDischargeRequest,
+    JobInfo
+)
+from app.services.acquisition_service import acquisition_service
+from app.services.job_service import job_service
+
+router = APIRouter(prefix="/api", tags=["jobs"])
+
+
+@router.post("/jobs/discharge", response_model=JobInfo, status_code=202)
+async def start_discharge_job(request: CapacitorDischargeRequest):
+    """
+    Start a capacitor discharge in the background
+    
+    Returns immediately with a job ID; poll GET /jobs/{job_id} or block on
+    GET /jobs/{job_id}/wait until the discharge has finished.
+    
+    Args:
+        request: Request body with capacitor, discharge resistor, and duration
+        
+    Returns:
+        The queued job
+        
+    Raises:
+        400 Bad Request: If the capacitor or discharge resistor is unknown
+    """
+    capacitor = request.capacitor.lower()
+    discharge_resistor = request.discharge_resistor.lower()
+    try:
+        # Reject bad components now instead of with a failed job later
+        acquisition_service.discharge_steps(capacitor, discharge_resistor, request.duration)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    job = job_service.submit(
+        'discharge',
+        {'capacitor': capacitor, 'discharge_resistor': discharge_resistor, 'duration': request.duration},
+        acquisition_service.discharge_capacitor,
+        capacitor=capacitor,
+        discharge_resistor=discharge_resistor,
+        duration=request.duration
+    )
+    return JobInfo(**job.to_dict())
+
+
+@router.get("/jobs/{job_id}", response_model=JobInfo)
+async def get_job(job_id: str):
+    """
+    Get the status of a background job
+    
+    Args:
+        job_id: Job ID returned when the job was started
+        
+    Returns:
+        Job status, result or error
+    """
+    try:
+        return JobInfo(**job_service.get(job_id).to_dict())
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+
+
+@router.get("/jobs/{job_id}/wait", response_model=JobInfo)
+async def wait_for_job(
+    job_id: str,
+    timeout: float = Query(default=30.0, gt=0, le=300, description="Maximum time to wait in seconds")
+):
+    """
+    Wait until a background job has finished
+    
+    Returns when the job completes or fails, or after `timeout` seconds
+    with the job still pending/running.
+    
+    Args:
+        job_id: Job ID
+        timeout: Maximum time to wait in seconds (default: 30)
+        
+    Returns:
+        Job status, result or error
+    """
+    try:
+        job = await job_service.wait(job_id, timeout)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    return JobInfo(**job.to_dict())
@@ -0,0 +1,30 @@
+"""
+Metrics API
+Prometheus scrape endpoint
+"""
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.services import hardware_executor, metrics
+from app.services.broadcast_service import broadcast_hub
+
+router = APIRouter(tags=["metrics"])
+
+metrics.registry.gauge_callback(
+    'hardware_queue_depth', 'Calls waiting for the hardware thread',
+    lambda: hardware_executor.get_stats()['queue_depth'])
+metrics.registry.gauge_callback(
+    'ws_clients', 'WebSocket clients subscribed to the shared stream',
+    lambda: broadcast_hub.subscriber_count)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """
+    Service metrics in the Prometheus text exposition format
+    
+    Histograms of DAQ task creation/start/read times, relay port write
+    latency per module and WebSocket send latency and queue depth;
+    counters of samples read, buffer overruns and dropped stream blocks;
+    gauges of buffer fill, hardware queue depth and stream clients.
+    """
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
@@ -17,6 +17,7 @@ from app.models.schemas import (
 )
 from app.services.relay_service import relay_service
 from app.services.acquisition_service import acquisition_service
+from app.services.hardware_executor import run_on_hardware, run_relay_write
 
 router = APIRouter(prefix="/api", tags=["relays"])
 
@@ -40,7 +41,9 @@ async def control_relay(relay_name: str, state: bool):
         Relay control status and timestamp
     """
     try:
-        result = relay_service.control_relay(relay_name, state)
+        relay_service.validate_relay_names([relay_name])
+        # Queued writes are coalesced, so bursts of clicks cost one write
+        result = await run_relay_write(relay_service.control_multiple_relays, {relay_name: state})
         return RelayControlResponse(
             relay=relay_name,
             state=state,
@@ -132,7 +135,8 @@ async def control_multiple_relays(request: MultipleRelayControlRequest):
         }
     """
     try:
-        result = relay_service.control_multiple_relays(request.relay_states)
+        relay_service.validate_relay_names(list(request.relay_states.keys()))
+        result = await run_relay_write(relay_service.control_multiple_relays, request.relay_states)
         return MultipleRelayControlResponse(
             status="success",
             message=result,
@@ -160,7 +164,7 @@ async def get_all_relay_states():
         Current state of all relays with statistics
     """
     try:
-        relay_states = relay_service.get_all_relay_states()
+        relay_states = await run_on_hardware(relay_service.get_all_relay_states)
         
         # Build detailed relay state list
         relay_list = []
@@ -206,8 +210,7 @@ async def disable_all_relays():
         Status message and count of relays that were disabled
     """
     try:
-        message = relay_service.disable_all_relays()
-        enabled_relays = relay_service.get_enabled_relays()
+        message = await run_on_hardware(relay_service.disable_all_relays)
         
         return DisableAllRelaysResponse(
             status="success",
@@ -234,7 +237,7 @@ async def disable_enabled_relays():
         Status message and list of disabled relay names
     """
     try:
-        disabled_relays, count = relay_service.disable_enabled_relays()
+        disabled_relays, count = await run_on_hardware(relay_service.disable_enabled_relays)
         
         message = f"Disabled {count} relay(s): {', '.join(disabled_relays)}" if count > 0 else "No relays were enabled"
         
@@ -266,7 +269,7 @@ async def sync_relays_with_hardware():
         Current state of all relays read directly from hardware
     """
     try:
-        hardware_states = relay_service.sync_with_hardware()
+        hardware_states = await run_on_hardware(relay_service.sync_with_hardware)
         
         # Build detailed relay state list
         relay_list = []
@@ -308,7 +311,9 @@ async def discharge_capacitor(request: CapacitorDischargeRequest):
     Discharge a capacitor through a specified discharge resistor
     
     This endpoint controls relays to safely discharge a capacitor through
-    a selected resistor, then turns off all relays.
+    a selected resistor, then turns off all relays. The discharge runs on
+    the hardware thread; use POST /jobs/discharge to start it without
+    waiting for it to finish.
     
     Args:
         request: Request body with capacitor, discharge resistor, and duration
@@ -336,7 +341,8 @@ async def discharge_capacitor(request: CapacitorDischargeRequest):
         }
     """
     try:
-        acquisition_service.discharge_capacitor(
+        await run_on_hardware(
+            acquisition_service.discharge_capacitor,
             capacitor=request.capacitor.lower(),
             discharge_resistor=request.discharge_resistor.lower(),
             duration=request.duration
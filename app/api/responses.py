@@ -0,0 +1,103 @@
+"""
+Fast JSON Responses
+Pre-encoded responses for large sample payloads, bypassing Pydantic validation
+"""
+import json
+import time
+from typing import Any, Callable
+import numpy as np
+from fastapi.responses import Response
+from starlette.concurrency import run_in_threadpool
+from app.services import metrics
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+
+def _default(obj):
+    """Make numpy values JSON-serializable for the standard library encoder"""
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def contiguous(array: np.ndarray) -> np.ndarray:
+    """
+    Plain C-contiguous ndarray with the data of array (no copy if it already is one)
+
+    Args:
+        array: Array or array subclass (e.g. a row of a memory-mapped run)
+    """
+    return np.ascontiguousarray(array).view(np.ndarray)
+
+
+def _orjson_default(obj):
+    """
+    Hand arrays orjson can't serialize natively back to it as plain
+    C-contiguous ndarrays
+
+    orjson only takes C-contiguous numpy.ndarray instances; rows of a stored
+    run (a transposed np.memmap) are neither. Copying the row keeps the
+    native encoding and the dtype's own float representation, where
+    tolist() would build a list of Python floats.
+    """
+    if isinstance(obj, np.ndarray) and (type(obj) is not np.ndarray or not obj.flags.c_contiguous):
+        return contiguous(obj)
+    return _default(obj)
+
+
+def dumps(content) -> bytes:
+    """
+    Encode content as JSON, including numpy arrays and scalars
+
+    Uses orjson's native numpy serialization when available (no Python list
+    of floats is built; arrays it can't take as they are go through
+    contiguous() first), otherwise the standard library encoder.
+    """
+    if orjson is not None:
+        return orjson.dumps(content, default=_orjson_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+class FastJSONResponse(Response):
+    """
+    JSON response encoded directly from dicts holding numpy arrays
+
+    Returned from endpoints whose response_model documents the shape; FastAPI
+    sends Response objects as they are, so the data is not validated or
+    re-serialized. The encode time is recorded in the
+    response_encode_seconds metric and the X-Encode-Time-Ms header.
+    """
+
+    media_type = "application/json"
+
+    def __init__(self, content, endpoint: str = 'other', **kwargs):
+        self.endpoint = endpoint
+        self.encode_seconds = 0.0
+        super().__init__(content, **kwargs)
+        self.headers['X-Encode-Time-Ms'] = f'{self.encode_seconds * 1000:.3f}'
+
+    def render(self, content) -> bytes:
+        start = time.perf_counter()
+        body = dumps(content)
+        self.encode_seconds = time.perf_counter() - start
+        metrics.response_encode_seconds.labels(self.endpoint).observe(self.encode_seconds)
+        return body
+
+
+async def fast_json_response(build: Callable[[], Any], endpoint: str = 'other') -> FastJSONResponse:
+    """
+    Build the content of a FastJSONResponse and encode it in the thread pool
+
+    Decimating or encoding a multi-million-sample run takes long enough to
+    stall every other request and WebSocket when done on the event loop.
+
+    Args:
+        build: Returns the content (e.g. a functools.partial of build_read_payload)
+        endpoint: Label of the response_encode_seconds metric
+    """
+    return await run_in_threadpool(lambda: FastJSONResponse(build(), endpoint=endpoint))
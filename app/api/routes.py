@@ -3,7 +3,7 @@ Main API Router
 Aggregates all API routers
 """
 from fastapi import APIRouter
-from app.api import devices, relays, acquisition, websocket
+from app.api import devices, relays, acquisition, runs, sequence, jobs, websocket, metrics
 
 # Create main API router
 api_router = APIRouter()
@@ -12,5 +12,9 @@ api_router = APIRouter()
 api_router.include_router(devices.router)
 api_router.include_router(relays.router)
 api_router.include_router(acquisition.router)
+api_router.include_router(runs.router)
+api_router.include_router(sequence.router)
+api_router.include_router(jobs.router)
 api_router.include_router(websocket.router)
+api_router.include_router(metrics.router)
 
@@ -0,0 +1,243 @@
+"""
+Measurement Run API Endpoints
+"""
+import asyncio
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from datetime import datetime
+from typing import Optional
+from app.models.schemas import (
+    RunAnalysisResponse,
+    RunInfo,
+    RunsListResponse,
+    RunSamplesResponse
+)
+from app.api.acquisition import DECIMATE_QUERY, POINTS_QUERY
+from app.api.responses import contiguous, fast_json_response
+from app.services.analysis_service import analysis_service
+from app.services.decimation import decimate as decimate_data
+from app.services.export_service import EXPORT_FORMATS, ExportDependencyError, export_run
+from app.services.run_store import run_store
+
+router = APIRouter(prefix="/api", tags=["runs"])
+
+
+def _run_info(meta: dict) -> RunInfo:
+    """Build a RunInfo from stored run metadata"""
+    config = meta.get('configuration') or {}
+    return RunInfo(
+        run_id=meta['run_id'],
+        samples=meta.get('samples', 0),
+        channels=meta.get('channels', 4),
+        sample_rate=config.get('sample_rate', 0),
+        started_at=config.get('started_at'),
+        stopped_at=meta.get('stopped_at'),
+        relays_at_start=meta.get('relays_at_start') or [],
+        relays_at_stop=meta.get('relays_at_stop') or [],
+        configuration=config,
+        statistics=meta.get('statistics')
+    )
+
+
+@router.get("/runs", response_model=RunsListResponse)
+async def list_runs():
+    """
+    List all stored measurement runs
+
+    Returns:
+        Metadata of every stored run, newest first
+    """
+    try:
+        runs = [_run_info(meta) for meta in run_store.list_runs()]
+        return RunsListResponse(total_runs=len(runs), runs=runs)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error listing runs: {str(e)}"
+        )
+
+
+@router.get("/runs/{run_id}", response_model=RunInfo)
+async def get_run(run_id: str):
+    """
+    Get metadata of a stored run
+
+    Args:
+        run_id: Run ID returned by stop-read-adc
+
+    Returns:
+        Run metadata (configuration, timing and relay states)
+    """
+    try:
+        return _run_info(run_store.get_metadata(run_id))
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+
+
+@router.get("/runs/{run_id}/samples", response_model=RunSamplesResponse)
+async def get_run_samples(
+    run_id: str,
+    offset: int = Query(default=0, ge=0, description="First sample index"),
+    length: int = Query(default=10000, ge=1, le=1000000, description="Number of samples per channel"),
+    decimate: Optional[str] = DECIMATE_QUERY,
+    points: int = POINTS_QUERY
+):
+    """
+    Get a range of samples from a stored run
+
+    Large runs can be paged with offset/length without loading the whole
+    run. With `decimate` set, the range is reduced to about `points` points
+    per channel and `indices` holds the absolute sample index of each point.
+
+    Args:
+        run_id: Run ID
+        offset: First sample index (default: 0)
+        length: Samples per channel to return (default: 10000, max: 1000000)
+        decimate: Optional decimation method ('lttb' or 'minmax')
+        points: Target points per channel when decimating
+
+    Returns:
+        The requested samples from all 4 ADC channels
+    """
+    try:
+        meta = run_store.get_metadata(run_id)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+
+    def build() -> dict:
+        data = run_store.read_samples(run_id, offset, length)
+        indices = None
+        values = data
+        if decimate is not None:
+            index_array, values = decimate_data(data, decimate, points)
+            index_array = index_array + offset
+            indices = {f'adc{n + 1}': contiguous(index_array[n]) for n in range(4)}
+        return {
+            'run_id': run_id,
+            'offset': offset,
+            'length': data.shape[1],
+            'total_samples': meta.get('samples', 0),
+            'sample_rate': (meta.get('configuration') or {}).get('sample_rate', 0),
+            'data': {f'adc{n + 1}': contiguous(values[n]) for n in range(4)},
+            'decimation': decimate,
+            'indices': indices,
+            'timestamp': datetime.now().isoformat()
+        }
+
+    # Read, decimated and encoded off the event loop; RunSamplesResponse documents the shape
+    try:
+        return await fast_json_response(build, endpoint='run_samples')
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+
+
+@router.get("/runs/{run_id}/analysis", response_model=RunAnalysisResponse)
+async def get_run_analysis(
+    run_id: str,
+    circuit: Optional[str] = Query(default=None, pattern="^(rl|rc|rlc)$", description="Circuit model (default: the run's circuit)"),
+    start: Optional[int] = Query(default=None, ge=0, description="First sample of the transient (default: detected)"),
+    length: Optional[int] = Query(default=None, ge=10, description="Samples to analyze (default: detected)")
+):
+    """
+    Fit the circuit's step response to a stored run
+
+    RC and RL runs are fitted with an exponential (time constant), RLC runs
+    with a damped oscillation or, if overdamped, two exponentials (decay
+    rate, resonant frequency, damping ratio). Every channel with a
+    transient is fitted; parameters come from the best fit. R, L and C
+    estimates combine the fit with the nominal values of the components
+    switched in at the start of the run.
+
+    By default the window starts at the switching event (the run's trigger
+    sample, refined to the actual step) and ends before the next one, cut
+    to a few settling times. Long windows are block-averaged to at most
+    8000 points. The fit runs in a worker process.
+
+    Args:
+        run_id: Run ID
+        circuit: 'rc', 'rl' or 'rlc' (default: stored with the run)
+        start: First sample of the transient
+        length: Samples per channel to analyze
+
+    Returns:
+        Fit per channel, circuit parameters and component estimates
+
+    Raises:
+        404 Not Found: If the run does not exist
+        400 Bad Request: If the circuit is unknown or there is no transient
+    """
+    try:
+        result = await asyncio.wrap_future(analysis_service.submit(run_id, circuit, start, length))
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error analyzing run: {str(e)}"
+        )
+
+    return RunAnalysisResponse(**result, timestamp=datetime.now().isoformat())
+
+
+@router.get("/runs/{run_id}/export")
+def export_run_file(
+    run_id: str,
+    format: str = Query(default="csv", pattern="^(csv|npy|parquet|hdf5)$", description="Export file format")
+):
+    """
+    Download a stored run as a file
+    
+    The file is generated in chunks from the run on disk and streamed, so
+    server memory use does not depend on the run length. CSV exports start
+    with the same METADATA / PARAMETERS sections as the dashboard's export.
+    Parquet and HDF5 need the optional pyarrow / h5py packages.
+    
+    Args:
+        run_id: Run ID
+        format: 'csv', 'npy', 'parquet' or 'hdf5' (default: csv)
+        
+    Returns:
+        The run's samples as a file download
+        
+    Raises:
+        404 Not Found: If the run does not exist
+        501 Not Implemented: If the format's package is not installed
+    """
+    try:
+        chunks = export_run(run_id, format)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    except ExportDependencyError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    
+    media_type, extension = EXPORT_FORMATS[format]
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="measurement_{run_id}.{extension}"'}
+    )
+
+
+@router.delete("/runs/{run_id}")
+async def delete_run(run_id: str):
+    """
+    Delete a stored run
+
+    Args:
+        run_id: Run ID
+
+    Returns:
+        Confirmation message
+    """
+    try:
+        run_store.delete_run(run_id)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+
+    return {
+        "status": "deleted",
+        "run_id": run_id,
+        "timestamp": datetime.now().isoformat()
+    }
@@ -0,0 +1,103 @@
+"""
+Sequence API Endpoints
+"""
+from fastapi import APIRouter, HTTPException
+from datetime import datetime
+from app.models.schemas import (
+    SequenceRequest,
+    SequenceResponse,
+    SequenceStepResult
+)
+from app.api.acquisition import build_read_payload
+from app.api.responses import fast_json_response
+from app.services.hardware_executor import run_on_hardware
+from app.services.sequence_service import sequence_service, SequenceError
+
+router = APIRouter(prefix="/api", tags=["sequence"])
+
+
+@router.post("/sequence", response_model=SequenceResponse)
+async def run_sequence(request: SequenceRequest):
+    """
+    Run a relay/acquisition sequence on the server
+    
+    The whole step list runs in one request, so waits between relay steps
+    are timed on the server instead of depending on browser round trips.
+    Relays in one 'set' step are switched with one write per module port.
+    
+    Step types:
+    - set: {"relays": {"zs1_1": true, ...}}
+    - wait: {"seconds": 0.2}
+    - disable_all: turn off all enabled relays
+    - discharge: {"capacitor": "cs1", "discharge_resistor": "rz2", "duration": 0.2}
+    - start_adc: {"samples", "sample_rate", "measurement_time", "circuit", "parameters",
+      "trigger_relay"} - the trigger relay's switching sample is returned in `trigger`
+    - stop_adc: {"decimate", "points"} - the data is returned in `acquisition`
+    
+    If a step fails, an acquisition started by the sequence is stopped and
+    all enabled relays are turned off.
+    
+    The sequence holds the hardware for its whole duration, so its wait and
+    discharge times may add up to at most 60 s.
+    
+    Args:
+        request: Step list
+        
+    Returns:
+        Per-step timing, run ID and, for stop_adc, the acquired data
+        
+    Example request body:
+        {
+            "steps": [
+                {"type": "set", "relays": {"zs1_4": true, "zk1_5": true}},
+                {"type": "start_adc", "samples": 1000, "sample_rate": 1000, "trigger_relay": "zs1_1"}
+            ]
+        }
+    """
+    try:
+        result = await run_on_hardware(
+            sequence_service.run,
+            [step.model_dump(exclude_none=True) for step in request.steps]
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except SequenceError as e:
+        if isinstance(e.cause, ValueError):
+            status_code = 400
+        elif isinstance(e.cause, RuntimeError):
+            status_code = 409
+        else:
+            status_code = 500
+        raise HTTPException(status_code=status_code, detail=str(e))
+    
+    response = SequenceResponse(
+        status="success",
+        steps_executed=len(result['steps']),
+        steps=[SequenceStepResult(**step) for step in result['steps']],
+        total_ms=result['total_ms'],
+        run_id=result['run_id'],
+        trigger=result['trigger'],
+        timestamp=datetime.now().isoformat()
+    ).model_dump()
+    
+    def build() -> dict:
+        # Sample data skips model validation (see FastJSONResponse)
+        stopped = result['acquisition']
+        if stopped is not None:
+            reader_error = stopped['reader_error']
+            response['acquisition'] = build_read_payload(
+                stopped['data'],
+                sample_rate=stopped['sample_rate'],
+                decimate=stopped['decimate'],
+                points=stopped['points'],
+                warning=f"Acquisition ended early: {reader_error}" if reader_error else None,
+                run_id=stopped['run_id'],
+                trigger=stopped['trigger'],
+                statistics=stopped['statistics']
+            )
+        return response
+    
+    # Decimated and encoded off the event loop
+    return await fast_json_response(build, endpoint='sequence')
@@ -1,40 +1,168 @@
 """
 WebSocket API for Real-Time Data Streaming
 """
-from fastapi import APIRouter, WebSocket
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 import asyncio
 import json
+import time
 from datetime import datetime
-from typing import List
-from app.services.acquisition_service import acquisition_service
+from typing import List, Optional
+from app.core.config import settings
+from app.core.logging_config import get_logger, log_fields
+from app.services.broadcast_service import broadcast_hub, Subscription
+from app.services.frame_codec import encode_frame, ENCODINGS
+from app.services import metrics
 
 router = APIRouter(tags=["websocket"])
+logger = get_logger(__name__)
 
 # Store active WebSocket connections
 active_connections: List[WebSocket] = []
 
 
+async def _forward_blocks(
+    websocket: WebSocket,
+    subscription: Subscription,
+    binary: bool = False,
+    encoding: str = 'float32'
+):
+    """
+    Send blocks from a hub subscription to one client
+
+    Args:
+        websocket: Connected client
+        subscription: The client's subscription to the shared stream
+        binary: Send data as binary frames instead of JSON
+        encoding: Sample encoding for binary frames ('float32' or 'int16')
+    """
+    dt = 1.0 / subscription.sample_rate
+    reported_dropped = 0
+    send_time = metrics.ws_send_seconds.labels("binary" if binary else "json")
+    queue_depth = metrics.ws_queue_depth.labels()
+    dropped_blocks = metrics.ws_dropped_blocks.labels()
+
+    while True:
+        block = await subscription.queue.get()
+        queue_depth.observe(subscription.queue.qsize())
+
+        if subscription.error is not None:
+            await websocket.send_json({
+                "type": "error",
+                "message": subscription.error
+            })
+            return
+
+        if subscription.dropped > reported_dropped:
+            await websocket.send_json({
+                "type": "overrun",
+                "dropped_blocks": subscription.dropped - reported_dropped,
+                "message": "Client fell behind, oldest blocks were skipped"
+            })
+            dropped_blocks.inc(subscription.dropped - reported_dropped)
+            reported_dropped = subscription.dropped
+
+        start = time.perf_counter()
+
+        if binary:
+            await websocket.send_bytes(encode_frame(
+                block.seq,
+                block.first_sample * dt,
+                dt * subscription.decimation,
+                block.data,
+                encoding=encoding,
+                full_scale=settings.adc_full_scale
+            ))
+        else:
+            await websocket.send_json({
+                "type": "data",
+                "seq": block.seq,
+                "timestamp": datetime.fromtimestamp(block.timestamp).isoformat(),
+                "t0": block.first_sample * dt,
+                "dt": dt * subscription.decimation,
+                "data": {
+                    "adc1": block.data[0].tolist(),
+                    "adc2": block.data[1].tolist(),
+                    "adc3": block.data[2].tolist(),
+                    "adc4": block.data[3].tolist()
+                }
+            })
+        send_time.observe(time.perf_counter() - start)
+
+        if subscription.overflowed:
+            await websocket.send_json({
+                "type": "error",
+                "message": "Client too slow, disconnecting"
+            })
+            await websocket.close(code=1013)
+            return
+
+
+async def _unsubscribe(forwarder: Optional[asyncio.Task], subscription: Optional[Subscription]):
+    """Cancel a client's forwarding task and leave the hub"""
+    if forwarder is not None:
+        forwarder.cancel()
+        try:
+            await forwarder
+        except (asyncio.CancelledError, Exception):
+            pass
+
+    if subscription is not None:
+        await broadcast_hub.unsubscribe(subscription)
+
+
+@router.get("/api/stream-status")
+async def get_stream_status():
+    """
+    Get the state of the shared live stream
+
+    Returns:
+        Hardware stream configuration and queue figures for each subscriber
+    """
+    return {
+        **broadcast_hub.get_status(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+
 @router.websocket("/ws/daq")
 async def websocket_daq(websocket: WebSocket):
     """
     WebSocket endpoint for real-time DAQ data streaming
-    
+
     Send JSON commands:
-    - {"action": "start", "sample_rate": 100, "interval": 0.1}
+    - {"action": "start", "sample_rate": 100, "interval": 0.1, "policy": "drop_oldest",
+       "format": "json", "encoding": "float32"}
     - {"action": "stop"}
-    
+
+    All clients share one hardware stream. The first client to start decides
+    the hardware sample rate and the block `interval` (seconds of samples per
+    message); later clients receive the running stream decimated to
+    approximately their requested `sample_rate`. Blocks are numbered with
+    `seq` and positioned in time with `t0`/`dt`.
+
+    `policy` selects what happens when the client cannot keep up:
+    'drop_oldest' (default) skips the oldest queued blocks and sends an
+    overrun notice, 'disconnect' closes the connection.
+
+    `format` selects how data is sent: 'json' (default) sends text messages
+    with per-channel float lists, 'binary' sends binary frames with a 36-byte
+    header followed by channel-interleaved samples (see
+    app.services.frame_codec). With binary frames `encoding` selects 'float32'
+    (default) or 'int16' scaled to the ADC input range. Status, overrun and
+    error messages are always JSON text.
+
     Receives:
     - Connection status messages
     - Real-time data from all 4 ADC channels
+    - Overrun notices if the client cannot keep up
     - Error messages
     """
     await websocket.accept()
     active_connections.append(websocket)
-    
-    streaming = False
-    sample_rate = 100
-    interval = 0.1  # seconds between readings
-    
+
+    forwarder: Optional[asyncio.Task] = None
+    subscription: Optional[Subscription] = None
+
     try:
         # Send welcome message
         await websocket.send_json({
@@ -42,72 +170,70 @@ async def websocket_daq(websocket: WebSocket):
             "status": "connected",
             "message": "WebSocket connected. Send 'start' command to begin streaming."
         })
-        
+
         while True:
-            # Check for commands from client
-            try:
-                message = await asyncio.wait_for(
-                    websocket.receive_text(),
-                    timeout=0.01
-                )
-                command = json.loads(message)
-                
-                if command.get("action") == "start":
-                    streaming = True
-                    sample_rate = command.get("sample_rate", 100)
-                    interval = command.get("interval", 0.1)
-                    await websocket.send_json({
-                        "type": "status",
-                        "status": "streaming",
-                        "message": f"Started streaming at {sample_rate} Hz"
-                    })
-                
-                elif command.get("action") == "stop":
-                    streaming = False
+            message = await websocket.receive_text()
+            command = json.loads(message)
+
+            if command.get("action") == "start":
+                await _unsubscribe(forwarder, subscription)
+                forwarder, subscription = None, None
+
+                data_format = command.get("format", "json")
+                encoding = command.get("encoding", "float32")
+                if data_format not in ("json", "binary") or encoding not in ENCODINGS:
                     await websocket.send_json({
-                        "type": "status",
-                        "status": "stopped",
-                        "message": "Stopped streaming"
+                        "type": "error",
+                        "message": f"Unsupported format '{data_format}' / encoding '{encoding}'"
                     })
-                    
-            except asyncio.TimeoutError:
-                pass  # No message received, continue
-            
-            # Stream data if enabled
-            if streaming:
+                    continue
+
                 try:
-                    # Read a small sample for streaming
-                    adc1, adc2, adc3, adc4 = acquisition_service.read_continuous_sample(
-                        samples_per_channel=10,
-                        sample_rate=sample_rate
+                    subscription = await broadcast_hub.subscribe(
+                        sample_rate=int(command.get("sample_rate", 100)),
+                        interval=float(command.get("interval", 0.1)),
+                        policy=command.get("policy", "drop_oldest")
                     )
-                    
-                    # Send data to client
-                    await websocket.send_json({
-                        "type": "data",
-                        "timestamp": datetime.now().isoformat(),
-                        "data": {
-                            "adc1": adc1,
-                            "adc2": adc2,
-                            "adc3": adc3,
-                            "adc4": adc4
-                        }
-                    })
-                    
-                    await asyncio.sleep(interval)
-                    
                 except Exception as e:
                     await websocket.send_json({
                         "type": "error",
-                        "message": f"Error reading data: {str(e)}"
+                        "message": f"Error starting stream: {str(e)}"
                     })
-                    streaming = False
-            else:
-                await asyncio.sleep(0.1)
-                
+                    continue
+
+                hub_rate = subscription.sample_rate
+                effective_rate = hub_rate / subscription.decimation
+                forwarder = asyncio.create_task(_forward_blocks(
+                    websocket,
+                    subscription,
+                    binary=data_format == "binary",
+                    encoding=encoding
+                ))
+                await websocket.send_json({
+                    "type": "status",
+                    "status": "streaming",
+                    "message": f"Started streaming at {effective_rate:g} Hz",
+                    "sample_rate": effective_rate,
+                    "hardware_sample_rate": hub_rate,
+                    "clients": broadcast_hub.subscriber_count,
+                    "format": data_format,
+                    "encoding": encoding if data_format == "binary" else None
+                })
+
+            elif command.get("action") == "stop":
+                await _unsubscribe(forwarder, subscription)
+                forwarder, subscription = None, None
+                await websocket.send_json({
+                    "type": "status",
+                    "status": "stopped",
+                    "message": "Stopped streaming"
+                })
+
+    except WebSocketDisconnect:
+        pass
     except Exception as e:
-        print(f"WebSocket error: {e}")
+        logger.warning("WebSocket error", extra=log_fields(error=str(e)))
     finally:
+        await _unsubscribe(forwarder, subscription)
         if websocket in active_connections:
             active_connections.remove(websocket)
-
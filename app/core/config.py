@@ -24,10 +24,47 @@ class Settings(BaseSettings):
     # Use 'cDAQ1' for simulation, 'cDAQ9189-2119A5F' for real device
     daq_device_name: str = 'cDAQ1'
     
+    # Hardware backend: 'nidaqmx' (NI driver) or 'simulated' (in-process
+    # RC/RL/RLC board model, for testing and benchmarks without hardware)
+    daq_backend: str = 'nidaqmx'
+    
+    # Simulated backend: supply voltage and RMS noise added to each sample (V)
+    simulated_source_voltage: float = 5.0
+    simulated_noise: float = 0.002
+    
+    # Terminal wired to the zs1_1 relay line, used as the ADC start trigger
+    # for relay-triggered acquisitions (e.g. '/cDAQ1/PFI0'). Empty: the
+    # switching event is located from software timestamps instead
+    adc_trigger_source: str = ''
+    
+    # Seconds a hardware read of relay states is reused (writes invalidate it)
+    relay_state_cache_ttl: float = 0.2
+    
+    # ADC input range in volts (used to scale int16 WebSocket frames)
+    adc_full_scale: float = 10.0
+    
     # Default acquisition settings
     default_sample_rate: int = 100
     default_samples: int = 500
     
+    # Sample type of stored runs ('float32' or 'float64' for double the size)
+    sample_dtype: str = 'float32'
+    
+    # Directory where measurement runs are stored
+    runs_dir: str = 'data/runs'
+    
+    # Worker processes fitting transients for /api/runs/{run_id}/analysis
+    analysis_workers: int = 2
+    
+    # Seconds of the most recent samples kept for /api/adc-status previews
+    status_preview_seconds: float = 1.0
+    
+    # Logging: level, format ('json' or 'text') and how many occurrences of a
+    # high-frequency event (relay switch, stream block error) make one record
+    log_level: str = 'INFO'
+    log_format: str = 'json'
+    log_sample_every: int = 10
+    
     class Config:
         env_file = ".env"
         case_sensitive = False
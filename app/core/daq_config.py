@@ -2,7 +2,7 @@
 DAQ Hardware Configuration
 Defines all channel paths and relay configurations
 """
-from typing import Dict
+from typing import Dict, List, Tuple
 from app.core.config import settings
 
 
@@ -169,7 +169,94 @@ class RelayMapping:
         """
         return {name: channel for name, channel in self.relays.items() 
                 if name.startswith(module.lower() + '_')}
+    
+    def get_port_and_line(self, relay_name: str) -> Tuple[str, int]:
+        """
+        Get the module port and line number of a relay
+        
+        Args:
+            relay_name: Name of the relay (e.g., 'zk1_5')
+            
+        Returns:
+            Tuple of (port channel, line number), e.g. ('cDAQ1Mod4/port0', 4)
+            
+        Raises:
+            ValueError: If relay name is unknown
+        """
+        channel = self.get_channel(relay_name)
+        port, line = channel.rsplit('/line', 1)
+        return port, int(line)
+    
+    def group_by_port(self, relay_names: List[str]) -> Dict[str, List[Tuple[str, int]]]:
+        """
+        Group relays by the module port they are on
+        
+        Args:
+            relay_names: Relay names
+            
+        Returns:
+            Dictionary of {port channel: [(relay name, line number), ...]},
+            ordered by port and line
+            
+        Raises:
+            ValueError: If a relay name is unknown
+        """
+        groups: Dict[str, List[Tuple[str, int]]] = {}
+        for relay_name in relay_names:
+            port, line = self.get_port_and_line(relay_name)
+            groups.setdefault(port, []).append((relay_name, line))
+        return {port: sorted(groups[port], key=lambda item: item[1]) for port in sorted(groups)}
+    
+    def decode_port_mask(self, port: str, mask: int) -> Dict[str, bool]:
+        """
+        Decode a port bitmask (bit N = line N) into relay states
+        
+        Args:
+            port: Port channel (e.g., 'cDAQ1Mod4/port0')
+            mask: Port value read from hardware
+            
+        Returns:
+            Dictionary of {relay_name: state} for the relays on the port
+        """
+        states = {}
+        for relay_name in self.relays:
+            relay_port, line = self.get_port_and_line(relay_name)
+            if relay_port == port:
+                states[relay_name] = bool(mask >> line & 1)
+        return states
+
 
+# Nominal component values of the measurement board, by relay
+INDUCTORS = {            # (inductance H, winding resistance Ω)
+    'zk1_1': (1e-3, 0.5),      # Ls1 1 mH
+    'zk1_2': (10e-3, 2.5),     # Ls2 10 mH
+    'zk1_3': (75.6e-3, 50.1),  # Ls3 75.6 mH
+    'zk1_4': (0.6, 1.0),       # Ls4 ~0.6 H
+}
+CAPACITORS = {           # capacitance F
+    'zk2_1': 48e-6,      # Cs1 48 μF
+    'zk2_2': 9.5e-6,     # Cs2 9.5 μF
+    'zk2_3': 1e-6,       # Cs3 1 μF
+    'zk2_4': 222e-9,     # Cs4 222 nF
+}
+R1S_RESISTORS = {        # Ω, voltage measured on ADC2
+    'zk1_5': 4.9,
+    'zk1_6': 56.8,
+    'zk1_7': 739.0,
+    'zk1_8': 26.9e3,
+}
+R2R_RESISTORS = {        # Ω, voltage measured on ADC4
+    'zk4_1': 14.9,
+    'zk4_2': 32.9,
+    'zk4_3': 4.91e3,
+    'zk4_4': 47.4e3,
+}
+DISCHARGE_RESISTORS = {  # Ω
+    'zk2_5': 3.0,        # R2s1
+    'zk2_6': 21.7,       # R2s2
+    'zk2_7': 357.0,      # R2s3
+    'zk2_8': 2.18e3,     # R2s4
+}
 
 # Initialize global channel configuration
 daq_channels = DAQChannels(settings.daq_device_name)
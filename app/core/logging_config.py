@@ -0,0 +1,148 @@
+"""
+Logging Configuration
+Structured logging through a queue, so services never wait on log I/O
+"""
+import atexit
+import itertools
+import json
+import logging
+import queue
+import sys
+import threading
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+from app.core.config import settings
+
+# Logger all application loggers (app.*) propagate to
+APP_LOGGER = 'app'
+
+_listener: Optional[QueueListener] = None
+_setup_lock = threading.Lock()
+
+
+def log_fields(**fields) -> dict:
+    """
+    Structured fields for a log call
+
+    Example:
+        logger.info("Relay switched", extra=log_fields(relay='zs1_1', state=True))
+    """
+    return {'fields': fields}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, event and the record's fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'event': record.getMessage()
+        }
+        entry.update(getattr(record, 'fields', None) or {})
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    """Human-readable line with the record's fields as key=value pairs"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = (f"{datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds')} "
+                f"{record.levelname:<7} {record.name}: {record.getMessage()}")
+        fields = getattr(record, 'fields', None)
+        if fields:
+            line += ' ' + ' '.join(f'{key}={value}' for key, value in fields.items())
+        if record.exc_text:
+            line += '\n' + record.exc_text
+        return line
+
+
+class _QueueHandler(QueueHandler):
+    """Queue handler that leaves formatting to the listener thread"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only what can't cross threads is resolved here: message arguments
+        # and the traceback
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class LogSampler:
+    """
+    Lets 1 of every N occurrences of an event through
+
+    Used for high-frequency events (relay switches, stream blocks) so they
+    don't flood the log. Sampled records carry a 'sampled' field with N.
+    """
+
+    def __init__(self, every: int):
+        self.every = max(1, every)
+        self._counters: Dict[str, itertools.count] = {}
+
+    def __call__(self, event: str) -> bool:
+        counter = self._counters.get(event)
+        if counter is None:
+            counter = self._counters.setdefault(event, itertools.count())
+        return next(counter) % self.every == 0
+
+
+def setup_logging():
+    """
+    Route app.* loggers through a queue to a stderr handler (idempotent)
+
+    Level, format ('json' or 'text') come from the log_level and log_format
+    settings.
+    """
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            return
+
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(TextFormatter() if settings.log_format.lower() == 'text' else JsonFormatter())
+
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        logger = logging.getLogger(APP_LOGGER)
+        logger.setLevel(settings.log_level.upper())
+        logger.addHandler(_QueueHandler(log_queue))
+        logger.propagate = False
+
+        _listener = QueueListener(log_queue, handler)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Write out queued records and stop the logging thread"""
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+            logger = logging.getLogger(APP_LOGGER)
+            for handler in list(logger.handlers):
+                if isinstance(handler, _QueueHandler):
+                    logger.removeHandler(handler)
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    Get a logger under the app hierarchy, setting up logging on first use
+
+    Args:
+        name: Module name (__name__)
+    """
+    setup_logging()
+    return logging.getLogger(name)
+
+
+# Shared sampler for high-frequency events
+sampler = LogSampler(settings.log_sample_every)
@@ -0,0 +1,47 @@
+"""
+Hardware Abstraction Layer
+Selects the DAQ backend the services run their tasks on
+"""
+import threading
+from typing import Optional
+from app.core.config import settings
+from app.hardware.base import AnalogInputTask, DAQBackend, DeviceError, DigitalPortTask
+
+BACKENDS = ('nidaqmx', 'simulated')
+
+_backend: Optional[DAQBackend] = None
+_backend_lock = threading.Lock()
+
+
+def create_backend(name: str) -> DAQBackend:
+    """
+    Create a DAQ backend by name
+
+    Args:
+        name: 'nidaqmx' for NI hardware, 'simulated' for the in-process device
+
+    Raises:
+        ValueError: If the name is unknown
+    """
+    if name == 'nidaqmx':
+        # Imported here so the simulated backend runs without the NI driver
+        from app.hardware.nidaqmx_backend import NidaqmxBackend
+        return NidaqmxBackend(settings.daq_device_name)
+    if name == 'simulated':
+        from app.hardware.simulated import SimulatedBackend
+        return SimulatedBackend(
+            device_name=settings.daq_device_name,
+            source_voltage=settings.simulated_source_voltage,
+            noise=settings.simulated_noise,
+            full_scale=settings.adc_full_scale
+        )
+    raise ValueError(f"Unknown DAQ backend '{name}'. Must be one of: {', '.join(BACKENDS)}")
+
+
+def get_backend() -> DAQBackend:
+    """Get the backend selected by the daq_backend setting (created on first use)"""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = create_backend(settings.daq_backend.lower())
+        return _backend
@@ -0,0 +1,156 @@
+"""
+Hardware Abstraction Layer - Interfaces
+Defines the tasks and backends the services use to talk to the DAQ
+"""
+from abc import ABC, abstractmethod
+from typing import Callable, Optional
+import numpy as np
+
+
+class DeviceError(RuntimeError):
+    """Raised when the DAQ backend reports an error (driver error, overrun, timeout)"""
+
+
+class AnalogInputTask(ABC):
+    """Hardware-timed analog input task reading several channels at once"""
+
+    @abstractmethod
+    def start(self):
+        """Start acquiring (or arm the task when a start trigger is configured)"""
+
+    @property
+    @abstractmethod
+    def start_time(self) -> Optional[float]:
+        """
+        time.perf_counter() value of the first sample, None until it is taken
+
+        Software-started tasks estimate it from the start call;
+        start_time_uncertainty holds the possible error in seconds.
+        """
+
+    # Seconds the first sample may be off from start_time
+    start_time_uncertainty = 0.0
+
+    @abstractmethod
+    def set_start_trigger(self, source: str):
+        """
+        Wait for a rising digital edge on source before acquiring
+
+        Must be called before start(). The first sample is taken on the edge.
+
+        Raises:
+            DeviceError: If the source can't be used as a start trigger
+        """
+
+    @property
+    @abstractmethod
+    def available(self) -> int:
+        """Samples per channel acquired and not read yet"""
+
+    @abstractmethod
+    def read(self, data: np.ndarray, timeout: float = 10.0):
+        """
+        Read samples into a preallocated array
+
+        Args:
+            data: C-contiguous float64 array of shape (channels, samples);
+                  exactly data.shape[1] samples per channel are read
+            timeout: Seconds to wait for the samples
+
+        Raises:
+            DeviceError: On a timeout, buffer overrun or driver error
+        """
+
+    @abstractmethod
+    def on_every_n_samples(self, n: int, callback: Callable[[int], None]):
+        """
+        Register a callback run every n samples acquired into the buffer
+
+        Must be called before start(). The callback gets the number of samples
+        and is expected to read them with read().
+        """
+
+    @abstractmethod
+    def stop(self):
+        """Stop acquiring"""
+
+    @abstractmethod
+    def close(self):
+        """Release the task"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class DigitalPortTask(ABC):
+    """Digital output task covering the relay lines of one module port"""
+
+    @abstractmethod
+    def write(self, states: np.ndarray):
+        """Set every line of the port (element N = line N)"""
+
+    @abstractmethod
+    def read_mask(self) -> int:
+        """Read all lines at once as a bitmask (bit N = line N)"""
+
+    @abstractmethod
+    def close(self):
+        """Release the task"""
+
+
+class DAQBackend(ABC):
+    """Creates tasks on one kind of DAQ hardware"""
+
+    # Backend name, as used by the daq_backend setting
+    name = ''
+
+    # Whether digital output states can be read back from the device
+    supports_do_readback = True
+
+    @abstractmethod
+    def create_ai_task(
+        self,
+        physical_channel: str,
+        channels: int,
+        sample_rate: int,
+        samples_per_channel: int,
+        continuous: bool = True
+    ) -> AnalogInputTask:
+        """
+        Create a configured analog input voltage task
+
+        Args:
+            physical_channel: Channel range, e.g. 'cDAQ1Mod1/ai0:3'
+            channels: Number of channels in the range
+            sample_rate: Sampling rate in Hz
+            samples_per_channel: Buffer size (continuous) or samples to acquire (finite)
+            continuous: CONTINUOUS acquisition if True, FINITE otherwise
+
+        Raises:
+            DeviceError: If the task cannot be created
+        """
+
+    @abstractmethod
+    def create_port_task(self, port: str, line_count: int) -> DigitalPortTask:
+        """
+        Create a committed digital output task for lines 0..line_count-1 of a port
+
+        Raises:
+            DeviceError: If the task cannot be created
+        """
+
+    @abstractmethod
+    def get_system_info(self) -> dict:
+        """
+        Describe the driver and devices
+
+        Returns:
+            Dictionary with driver_version and devices (list of dictionaries
+            with name, product_category and product_type)
+        """
+
+    def close(self):
+        """Release backend resources"""
@@ -0,0 +1,167 @@
+"""
+NI-DAQmx Backend
+Runs tasks on NI hardware (or NI MAX simulated devices) through nidaqmx
+"""
+import time
+from contextlib import contextmanager
+from typing import Callable, Optional
+import numpy as np
+import nidaqmx as ni
+from nidaqmx.constants import AcquisitionType, Edge, LineGrouping, TaskMode
+from nidaqmx.errors import DaqError
+from nidaqmx.stream_readers import AnalogMultiChannelReader, DigitalSingleChannelReader
+from nidaqmx.stream_writers import DigitalSingleChannelWriter
+from app.hardware.base import AnalogInputTask, DAQBackend, DeviceError, DigitalPortTask
+
+
+@contextmanager
+def _device_errors():
+    """Re-raise driver errors as DeviceError"""
+    try:
+        yield
+    except DaqError as e:
+        raise DeviceError(str(e)) from e
+
+
+class NidaqmxAITask(AnalogInputTask):
+    """Analog input voltage task on a DAQmx device"""
+
+    def __init__(self, physical_channel: str, sample_rate: int, samples_per_channel: int, continuous: bool):
+        with _device_errors():
+            self.task = ni.Task()
+            try:
+                self.task.ai_channels.add_ai_voltage_chan(physical_channel)
+                self.task.timing.cfg_samp_clk_timing(
+                    rate=sample_rate,
+                    sample_mode=AcquisitionType.CONTINUOUS if continuous else AcquisitionType.FINITE,
+                    samps_per_chan=samples_per_channel
+                )
+                self.reader = AnalogMultiChannelReader(self.task.in_stream)
+            except Exception:
+                self.task.close()
+                raise
+        self._triggered = False
+        self._start_time: Optional[float] = None
+
+    def start(self):
+        with _device_errors():
+            # Commit first so the timed start call only starts the sample clock
+            self.task.control(TaskMode.TASK_COMMIT)
+            before = time.perf_counter()
+            self.task.start()
+            after = time.perf_counter()
+        if not self._triggered:
+            self._start_time = after
+            self.start_time_uncertainty = after - before
+
+    @property
+    def start_time(self) -> Optional[float]:
+        # The trigger edge time isn't known in perf_counter terms
+        return self._start_time
+
+    def set_start_trigger(self, source: str):
+        with _device_errors():
+            self.task.triggers.start_trigger.cfg_dig_edge_start_trig(source, trigger_edge=Edge.RISING)
+        self._triggered = True
+
+    @property
+    def available(self) -> int:
+        with _device_errors():
+            return self.task.in_stream.avail_samp_per_chan
+
+    def read(self, data: np.ndarray, timeout: float = 10.0):
+        with _device_errors():
+            self.reader.read_many_sample(data, number_of_samples_per_channel=data.shape[1], timeout=timeout)
+
+    def on_every_n_samples(self, n: int, callback: Callable[[int], None]):
+        def handler(task_handle, every_n_samples_event_type, number_of_samples, callback_data):
+            callback(number_of_samples)
+            return 0
+
+        with _device_errors():
+            self.task.register_every_n_samples_acquired_into_buffer_event(n, handler)
+
+    def stop(self):
+        with _device_errors():
+            self.task.stop()
+        self._start_time = None
+
+    def close(self):
+        with _device_errors():
+            self.task.close()
+
+
+class NidaqmxPortTask(DigitalPortTask):
+    """Committed digital output task covering all relay lines of one module port"""
+
+    def __init__(self, port: str, line_count: int):
+        self.port = port
+        self.line_count = line_count
+        with _device_errors():
+            self.task = ni.Task()
+            try:
+                self.task.do_channels.add_do_chan(
+                    f'{port}/line0:{line_count - 1}',
+                    line_grouping=LineGrouping.CHAN_FOR_ALL_LINES
+                )
+                # Reserve and commit once, so each write/read only transfers data
+                self.task.control(TaskMode.TASK_COMMIT)
+                self.writer = DigitalSingleChannelWriter(self.task.out_stream, auto_start=True)
+                self.reader = DigitalSingleChannelReader(self.task.in_stream)
+            except Exception:
+                self.task.close()
+                raise
+
+    def write(self, states: np.ndarray):
+        with _device_errors():
+            self.writer.write_one_sample_multi_line(states)
+
+    def read_mask(self) -> int:
+        with _device_errors():
+            return int(self.reader.read_one_sample_port_uint32())
+
+    def close(self):
+        try:
+            self.task.close()
+        except DaqError:
+            pass
+
+
+class NidaqmxBackend(DAQBackend):
+    """Backend for NI-DAQmx devices"""
+
+    name = 'nidaqmx'
+
+    def __init__(self, device_name: str):
+        self.device_name = device_name
+        # NI MAX simulated devices (e.g. cDAQ1) don't support reading DO states
+        self.supports_do_readback = device_name.lower() not in ['cdaq1', 'dev1', 'sim']
+
+    def create_ai_task(
+        self,
+        physical_channel: str,
+        channels: int,
+        sample_rate: int,
+        samples_per_channel: int,
+        continuous: bool = True
+    ) -> AnalogInputTask:
+        return NidaqmxAITask(physical_channel, sample_rate, samples_per_channel, continuous)
+
+    def create_port_task(self, port: str, line_count: int) -> DigitalPortTask:
+        return NidaqmxPortTask(port, line_count)
+
+    def get_system_info(self) -> dict:
+        with _device_errors():
+            local_system = ni.system.System.local()
+            driver_version = local_system.driver_version
+            return {
+                'driver_version': f"{driver_version.major_version}.{driver_version.minor_version}.{driver_version.update_version}",
+                'devices': [
+                    {
+                        'name': device.name,
+                        'product_category': str(device.product_category),
+                        'product_type': device.product_type
+                    }
+                    for device in local_system.devices
+                ]
+            }
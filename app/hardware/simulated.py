@@ -0,0 +1,472 @@
+"""
+Simulated DAQ Backend
+In-process device that produces RC/RL/RLC charge and discharge waveforms
+from the relays that are switched on, for testing and benchmarks without NI hardware
+"""
+import bisect
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+import numpy as np
+from app.core.daq_config import (
+    CAPACITORS, DISCHARGE_RESISTORS, INDUCTORS, R1S_RESISTORS, R2R_RESISTORS, relay_mapping
+)
+from app.hardware.base import AnalogInputTask, DAQBackend, DeviceError, DigitalPortTask
+
+POWER_RELAY = 'zs1_1'
+ADC1_SHORT_RELAY = 'zs1_2'
+DISCHARGE_RELAY = 'zs2_2'
+
+# Wiring and contact resistance in series with every loop
+WIRING_RESISTANCE = 0.1
+
+# Relay changes remembered for AI tasks reading behind real time
+_EVENT_HISTORY = 1024
+
+
+class CircuitConfig(NamedTuple):
+    """Series loop formed by the relays switched on"""
+    closed: bool              # Any component in the loop
+    source: float             # Applied voltage (0 when main power is off)
+    resistance: float         # Total series resistance in Ω
+    inductance: float         # H, 0 = no inductor
+    inductor_resistance: float
+    capacitance: float        # F, 0 = no capacitor (shorted)
+    capacitors: Tuple[str, ...]
+    r1s: float                # Resistance across ADC2
+    r2r: float                # Resistance across ADC4
+    adc1_shorted: bool
+
+
+def circuit_config(relay_states: Dict[str, bool], source_voltage: float) -> CircuitConfig:
+    """
+    Derive the simulated loop from relay states
+
+    Selected inductors and resistors are in series, selected capacitors in
+    parallel. With the discharge relay on, the capacitors are discharged
+    through the selected discharge resistors and the source is disconnected.
+    """
+    def selected(table):
+        return [relay for relay in table if relay_states.get(relay)]
+
+    capacitors = tuple(selected(CAPACITORS))
+    capacitance = sum(CAPACITORS[relay] for relay in capacitors)
+
+    if relay_states.get(DISCHARGE_RELAY):
+        discharge = sum(DISCHARGE_RESISTORS[relay] for relay in selected(DISCHARGE_RESISTORS))
+        return CircuitConfig(
+            closed=bool(capacitors), source=0.0, resistance=discharge + WIRING_RESISTANCE,
+            inductance=0.0, inductor_resistance=0.0, capacitance=capacitance,
+            capacitors=capacitors, r1s=0.0, r2r=0.0, adc1_shorted=True
+        )
+
+    inductors = selected(INDUCTORS)
+    inductance = sum(INDUCTORS[relay][0] for relay in inductors)
+    inductor_resistance = sum(INDUCTORS[relay][1] for relay in inductors)
+    r1s = sum(R1S_RESISTORS[relay] for relay in selected(R1S_RESISTORS))
+    r2r = sum(R2R_RESISTORS[relay] for relay in selected(R2R_RESISTORS))
+
+    return CircuitConfig(
+        closed=bool(inductors or capacitors or r1s or r2r),
+        source=source_voltage if relay_states.get(POWER_RELAY) else 0.0,
+        resistance=r1s + r2r + inductor_resistance + WIRING_RESISTANCE,
+        inductance=inductance,
+        inductor_resistance=inductor_resistance,
+        capacitance=capacitance,
+        capacitors=capacitors,
+        r1s=r1s,
+        r2r=r2r,
+        adc1_shorted=bool(relay_states.get(ADC1_SHORT_RELAY))
+    )
+
+
+class SimulatedCircuit:
+    """
+    State of the simulated board (loop current and capacitor voltages)
+
+    Between relay changes the loop is linear with a step input, so the state
+    at any time is computed in closed form instead of integrated sample by
+    sample.
+    """
+
+    def __init__(self, noise: float, full_scale: float, seed: Optional[int] = None):
+        self.noise = noise
+        self.full_scale = full_scale
+        self.current = 0.0
+        self.cap_voltages = {relay: 0.0 for relay in CAPACITORS}
+        self._rng = np.random.default_rng(seed)
+
+    def _loop_cap_voltage(self, config: CircuitConfig) -> float:
+        if not config.capacitors:
+            return 0.0
+        # Parallel capacitors share their charge when connected
+        charge = sum(CAPACITORS[relay] * self.cap_voltages[relay] for relay in config.capacitors)
+        return charge / config.capacitance
+
+    def evolve(self, config: CircuitConfig, elapsed: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Loop current and capacitor voltage after the given times
+
+        The state is advanced to the last time.
+
+        Args:
+            config: Loop in effect for the whole interval
+            elapsed: Increasing times in seconds since the current state
+
+        Returns:
+            Tuple of (current, capacitor voltage) arrays
+        """
+        vs = config.source
+        r = config.resistance
+        l = config.inductance
+        c = config.capacitance
+        i0 = self.current if l > 0 else 0.0
+        v0 = self._loop_cap_voltage(config)
+
+        if not config.closed:
+            i = np.zeros_like(elapsed)
+            vc = np.full_like(elapsed, v0)
+        elif l > 0 and c > 0:
+            # Series RLC: x' = A x + b with x = (i, vc), A = [[-R/L, -1/L], [1/C, 0]]
+            damping = r / l
+            discriminant = damping * damping - 4.0 / (l * c)
+            if abs(discriminant) < 1e-9 * damping * damping:
+                # Critically damped: nudge off the repeated eigenvalue
+                discriminant = 1e-9 * damping * damping
+            root = np.sqrt(complex(discriminant))
+            lambdas = np.array([(-damping + root) / 2, (-damping - root) / 2])
+            # Eigenvector of each eigenvalue: (lambda C, 1)
+            vectors = np.array([lambdas * c, [1.0, 1.0]], dtype=complex)
+            coefficients = np.linalg.solve(vectors, np.array([i0, v0 - vs], dtype=complex))
+            modes = coefficients[:, None] * np.exp(np.outer(lambdas, elapsed))
+            state = (vectors @ modes).real
+            i = state[0]
+            vc = state[1] + vs
+        elif l > 0:
+            # Series RL
+            i_final = vs / r
+            i = i_final + (i0 - i_final) * np.exp(-elapsed * (r / l))
+            vc = np.zeros_like(elapsed)
+        elif c > 0:
+            # Series RC
+            vc = vs + (v0 - vs) * np.exp(-elapsed / (r * c))
+            i = (vs - vc) / r
+        else:
+            i = np.full_like(elapsed, vs / r)
+            vc = np.zeros_like(elapsed)
+
+        if len(elapsed):
+            self.current = float(i[-1]) if l > 0 and config.closed else 0.0
+            for relay in config.capacitors:
+                self.cap_voltages[relay] = float(vc[-1])
+        return i, vc
+
+    def outputs(self, config: CircuitConfig, i: np.ndarray, vc: np.ndarray, out: np.ndarray):
+        """
+        Fill ADC channel voltages for the given loop state
+
+        CH1 = inductor voltage, CH2 = R1s voltage, CH3 = capacitor voltage,
+        CH4 = R2r voltage, plus Gaussian noise, clipped to the input range.
+        """
+        if config.inductance > 0 and not config.adc1_shorted:
+            # L di/dt + R_L i = source - (other resistors) i - vc
+            out[0] = config.source - (config.resistance - config.inductor_resistance) * i - vc
+        else:
+            out[0] = 0.0
+        out[1] = i * config.r1s
+        out[2] = vc
+        out[3] = i * config.r2r
+        if self.noise > 0:
+            out += self._rng.normal(0.0, self.noise, out.shape)
+        np.clip(out, -self.full_scale, self.full_scale, out=out)
+
+
+class SimulatedAITask(AnalogInputTask):
+    """
+    Analog input task paced by the wall clock
+
+    Sample k of the task is taken at start time + k / sample_rate. Samples
+    become available as real time passes and are computed when read.
+    With a start trigger, the start time is the moment the power relay is
+    switched on (the simulated board has it wired to every trigger terminal).
+    """
+
+    def __init__(self, backend: 'SimulatedBackend', channels: int, sample_rate: int,
+                 samples_per_channel: int, continuous: bool):
+        self.backend = backend
+        self.channels = channels
+        self.sample_rate = sample_rate
+        self.buffer_size = samples_per_channel
+        self.continuous = continuous
+        self.trigger_source: Optional[str] = None
+        self._running = False
+        self._start_time: Optional[float] = None
+        self._read_pos = 0
+        self._callback: Optional[Tuple[int, Callable[[int], None]]] = None
+        self._callback_thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._read_pos = 0
+        self._stop_event.clear()
+        if self.trigger_source is not None:
+            self.backend._arm(self)
+        else:
+            self._start_time = self.backend._ai_started()
+        if self._callback is not None:
+            self._callback_thread = threading.Thread(target=self._callback_loop, name="sim-every-n", daemon=True)
+            self._callback_thread.start()
+
+    def _triggered(self, when: float):
+        """Start edge from the backend: the first sample is taken at 'when'"""
+        self._start_time = when
+
+    @property
+    def start_time(self) -> Optional[float]:
+        return self._start_time
+
+    def set_start_trigger(self, source: str):
+        if self._running:
+            raise DeviceError("The start trigger must be configured before the task is started")
+        self.trigger_source = source
+
+    def _acquired(self) -> int:
+        if self._start_time is None:
+            return 0
+        acquired = int((time.perf_counter() - self._start_time) * self.sample_rate)
+        return acquired if self.continuous else min(acquired, self.buffer_size)
+
+    @property
+    def available(self) -> int:
+        return self._acquired() - self._read_pos
+
+    def read(self, data: np.ndarray, timeout: float = 10.0):
+        if not self._running:
+            self.start()
+        count = data.shape[1]
+        if not self.continuous and self._read_pos + count > self.buffer_size:
+            raise DeviceError("Requested more samples than the finite task acquires")
+
+        deadline = time.perf_counter() + timeout
+        while self.available < count:
+            missing = (count - self.available) / self.sample_rate
+            if time.perf_counter() + missing > deadline:
+                raise DeviceError(f"Timeout: {count} samples were not available within {timeout:g} s")
+            time.sleep(max(missing, 0.0005))
+
+        if self.continuous and self.available > self.buffer_size:
+            raise DeviceError(
+                "Buffer overrun: samples were overwritten before they could be read "
+                f"({self.available} pending, buffer holds {self.buffer_size})"
+            )
+
+        times = self._start_time + (self._read_pos + np.arange(count)) / self.sample_rate
+        self.backend._sample(times, data)
+        self._read_pos += count
+
+    def on_every_n_samples(self, n: int, callback: Callable[[int], None]):
+        self._callback = (n, callback)
+
+    def _callback_loop(self):
+        n, callback = self._callback
+        while not self._stop_event.is_set():
+            pending = self.available
+            if pending < n:
+                self._stop_event.wait((n - pending) / self.sample_rate)
+                continue
+            try:
+                callback(n)
+            except Exception:
+                # Like a failed DAQmx callback, stop delivering blocks
+                return
+
+    def stop(self):
+        if not self._running:
+            return
+        self._running = False
+        self._stop_event.set()
+        thread = self._callback_thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        self._callback_thread = None
+        self.backend._ai_stopped(self)
+        self._start_time = None
+
+    def close(self):
+        self.stop()
+
+
+class SimulatedPortTask(DigitalPortTask):
+    """Digital output port of the simulated device"""
+
+    def __init__(self, backend: 'SimulatedBackend', port: str, line_count: int):
+        self.backend = backend
+        self.port = port
+        self.line_count = line_count
+
+    def write(self, states: np.ndarray):
+        mask = 0
+        for line, state in enumerate(states):
+            if state:
+                mask |= 1 << line
+        self.backend._write_port(self.port, mask)
+
+    def read_mask(self) -> int:
+        return self.backend._port_masks.get(self.port, 0)
+
+    def close(self):
+        pass
+
+
+class SimulatedBackend(DAQBackend):
+    """
+    In-process DAQ device
+
+    Relay writes change the simulated circuit; analog input tasks sample it.
+    Each relay change is timestamped so samples read behind real time still
+    see it at the moment it happened.
+    """
+
+    name = 'simulated'
+    supports_do_readback = True
+
+    def __init__(self, device_name: str = 'cDAQ1', source_voltage: float = 5.0, noise: float = 0.002,
+                 full_scale: float = 10.0, seed: Optional[int] = None):
+        self.device_name = device_name
+        self.source_voltage = source_voltage
+        self.circuit = SimulatedCircuit(noise, full_scale, seed)
+        self._lock = threading.RLock()
+        self._port_masks: Dict[str, int] = {}
+        now = time.perf_counter()
+        self._model_time = now
+        self._event_times: List[float] = [now]
+        self._event_configs: List[CircuitConfig] = [circuit_config({}, source_voltage)]
+        self._active_ai = 0
+        # Tasks waiting for the power relay start edge
+        self._armed: List[SimulatedAITask] = []
+
+    def relay_states(self) -> Dict[str, bool]:
+        """Relay states as set on the simulated ports"""
+        states = {}
+        for port, mask in self._port_masks.items():
+            states.update(relay_mapping.decode_port_mask(port, mask))
+        return states
+
+    def _write_port(self, port: str, mask: int):
+        with self._lock:
+            if self._port_masks.get(port, 0) == mask:
+                return
+            now = time.perf_counter()
+            if self._active_ai == 0:
+                # Nobody samples the circuit: bring it up to date under the old loop
+                self._advance(now)
+            power_was_on = self.relay_states().get(POWER_RELAY, False)
+            self._port_masks[port] = mask
+            states = self.relay_states()
+            self._event_times.append(now)
+            self._event_configs.append(circuit_config(states, self.source_voltage))
+            if len(self._event_times) > _EVENT_HISTORY:
+                del self._event_times[0]
+                del self._event_configs[0]
+
+            if states.get(POWER_RELAY) and not power_was_on:
+                # Rising edge on the trigger line: armed tasks start sampling now
+                for task in self._armed:
+                    self._active_ai += 1
+                    task._triggered(now)
+                self._armed.clear()
+
+    def _advance(self, now: float):
+        self._sample(np.array([now]), np.empty((4, 1)))
+
+    def _ai_started(self) -> float:
+        with self._lock:
+            now = time.perf_counter()
+            if self._active_ai == 0:
+                self._advance(now)
+            self._active_ai += 1
+            return now
+
+    def _arm(self, task: 'SimulatedAITask'):
+        with self._lock:
+            self._armed.append(task)
+
+    def _ai_stopped(self, task: 'SimulatedAITask'):
+        with self._lock:
+            if task in self._armed:
+                # Stopped before its trigger: it never sampled
+                self._armed.remove(task)
+            else:
+                self._active_ai = max(0, self._active_ai - 1)
+
+    def _sample(self, times: np.ndarray, out: np.ndarray):
+        """
+        Compute the ADC channels at the given times and advance the circuit
+
+        Times before the circuit's current time are evaluated at that time.
+        The loop is split at every relay change in between.
+        """
+        channels = out.shape[0]
+        count = len(times)
+        with self._lock:
+            times = np.maximum(times, self._model_time)
+            values = out if channels == 4 else np.empty((4, count))
+            now = self._model_time
+            index = bisect.bisect_right(self._event_times, now) - 1
+            start = 0
+            while start < count:
+                config = self._event_configs[index]
+                if index + 1 < len(self._event_times):
+                    segment_end = self._event_times[index + 1]
+                    stop = int(np.searchsorted(times, segment_end, side='left'))
+                else:
+                    segment_end = None
+                    stop = count
+                segment = times[start:stop]
+                # Evaluate up to the relay change too, so the next loop starts from it
+                points = segment if stop == count else np.append(segment, segment_end)
+                if len(points):
+                    i, vc = self.circuit.evolve(config, points - now)
+                    if len(segment):
+                        self.circuit.outputs(config, i[:len(segment)], vc[:len(segment)], values[:, start:stop])
+                    now = points[-1]
+                start = stop
+                index += 1
+            self._model_time = now
+
+            # Relay changes before the circuit's time are no longer needed
+            keep = bisect.bisect_right(self._event_times, now) - 1
+            if keep > 0:
+                del self._event_times[:keep]
+                del self._event_configs[:keep]
+
+        if values is not out:
+            out[:] = values[:channels]
+
+    def create_ai_task(
+        self,
+        physical_channel: str,
+        channels: int,
+        sample_rate: int,
+        samples_per_channel: int,
+        continuous: bool = True
+    ) -> AnalogInputTask:
+        if sample_rate <= 0 or samples_per_channel <= 0:
+            raise DeviceError("Sample rate and samples per channel must be positive")
+        return SimulatedAITask(self, channels, sample_rate, samples_per_channel, continuous)
+
+    def create_port_task(self, port: str, line_count: int) -> DigitalPortTask:
+        return SimulatedPortTask(self, port, line_count)
+
+    def get_system_info(self) -> dict:
+        return {
+            'driver_version': 'simulated',
+            'devices': [
+                {'name': f'{self.device_name}Mod{module}', 'product_category': 'Simulated',
+                 'product_type': 'Simulated AI (4 ch)' if module == 1 else 'Simulated DO (8 lines)'}
+                for module in range(1, 8)
+            ]
+        }
@@ -9,7 +9,11 @@ from fastapi.middleware.cors import CORSMiddleware
 from pathlib import Path
 
 from app.core.config import settings
+from app.core.logging_config import shutdown_logging
 from app.api.routes import api_router
+from app.services import hardware_executor
+from app.services.analysis_service import analysis_service
+from app.services.relay_service import relay_service
 
 
 def create_application() -> FastAPI:
@@ -44,6 +48,14 @@ def create_application() -> FastAPI:
     # Include all API routes
     app.include_router(api_router)
     
+    @app.on_event("shutdown")
+    async def shutdown():
+        """Finish queued hardware calls, release the pooled relay tasks, stop analysis workers and flush logs"""
+        hardware_executor.shutdown()
+        relay_service.close()
+        analysis_service.shutdown()
+        shutdown_logging()
+    
     # Root endpoint
     @app.get("/")
     async def root():
@@ -57,6 +69,7 @@ def create_application() -> FastAPI:
                 "redoc": "/redoc",
                 "dashboard": "/dashboard",
                 "devices": "/api/devices",
+                "hardware_queue": "/api/hardware/queue",
                 "all_relays": "/api/relays",
                 "relays_by_module": "/api/relays/module/{module_name}",
                 "relay_states": "/api/relays/states",
@@ -67,8 +80,20 @@ def create_application() -> FastAPI:
                 "start_read_adc": "/api/start-read-adc",
                 "stop_read_adc": "/api/stop-read-adc",
                 "adc_status": "/api/adc-status",
+                "adc_data": "/api/adc-data",
+                "capture_start": "/api/capture/start",
+                "capture_status": "/api/capture/status",
+                "capture_stop": "/api/capture/stop",
+                "runs": "/api/runs",
+                "run_samples": "/api/runs/{run_id}/samples",
+                "run_analysis": "/api/runs/{run_id}/analysis",
                 "discharge_capacitor": "/api/discharge-capacitor",
-                "websocket": "/ws/daq"
+                "sequence": "/api/sequence",
+                "discharge_job": "/api/jobs/discharge",
+                "job_status": "/api/jobs/{job_id}",
+                "stream_status": "/api/stream-status",
+                "websocket": "/ws/daq",
+                "metrics": "/metrics"
             }
         }
     
@@ -2,7 +2,7 @@
 Pydantic models for request/response schemas
 """
 from pydantic import BaseModel, Field
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Optional
 from datetime import datetime
 
 
@@ -21,6 +21,19 @@ class DevicesResponse(BaseModel):
     devices: List[DeviceInfo]
 
 
+class HardwareQueueStatus(BaseModel):
+    """Statistics of the hardware worker thread queue"""
+    queue_depth: int  # calls waiting to run
+    current: Optional[str] = None  # call running now
+    executed: int
+    coalesced: int  # relay writes merged into a queued write
+    failed: int
+    wait_ms_last: float  # time calls waited in the queue
+    wait_ms_avg: float
+    wait_ms_max: float
+    timestamp: str
+
+
 # ============== Relay Models ==============
 
 class RelayControlResponse(BaseModel):
@@ -99,14 +112,102 @@ class DAQData(BaseModel):
     adc4: List[float]
 
 
+class DAQIndices(BaseModel):
+    """Sample indices of decimated points for each channel"""
+    adc1: List[int]
+    adc2: List[int]
+    adc3: List[int]
+    adc4: List[int]
+
+
+class ChannelStatistics(BaseModel):
+    """Running statistics of one channel, computed while acquiring"""
+    count: int  # samples
+    min: float
+    max: float
+    mean: float
+    rms: float
+    variance: float  # population variance
+    std: float
+    min_index: int  # sample index of the (first) minimum
+    max_index: int  # sample index of the (first) maximum
+    min_time_s: float  # time of the minimum from the first sample
+    max_time_s: float  # time of the maximum from the first sample
+
+
 class DAQReadResponse(BaseModel):
     """Response model for DAQ data reading"""
     status: str
-    samples: int
+    samples: int  # full-resolution samples per channel
     sample_rate: int
     channels: int
     data: DAQData
     timestamp: str
+    warning: Optional[str] = None
+    decimation: Optional[str] = None  # 'lttb' or 'minmax' when data is decimated
+    indices: Optional[DAQIndices] = None  # sample index of each decimated point
+    run_id: Optional[str] = None  # ID under which the run was stored
+    trigger_sample: Optional[int] = None  # sample index of the trigger relay's switching event
+    statistics: Optional[Dict[str, ChannelStatistics]] = None  # per channel, computed during acquisition
+
+
+class ADCProgress(BaseModel):
+    """Progress of a running acquisition, from the reader's in-memory counters"""
+    samples: int  # samples per channel acquired so far
+    blocks: int  # blocks drained from the DAQ buffer
+    elapsed_s: float
+    buffer_fill_percent: float  # DAQ buffer fill estimated from the last read and the time since
+    peak_buffer_fill_percent: float  # highest fill measured at a read
+    overrun_risk: str  # 'low', 'elevated', 'high' or 'overrun' (reading failed)
+    reader_error: Optional[str] = None
+
+
+class ADCPreview(BaseModel):
+    """Decimated copy of the most recent samples of a running acquisition"""
+    start_index: int  # sample index of the first sample in the window
+    samples: int  # samples per channel in the window
+    decimation: str  # 'lttb' or 'minmax'
+    indices: DAQIndices
+    data: DAQData
+
+
+class ADCStatusResponse(BaseModel):
+    """Response model for the ADC acquisition status"""
+    is_running: bool
+    configuration: Optional[Dict[str, Any]] = None
+    progress: Optional[ADCProgress] = None
+    statistics: Optional[Dict[str, ChannelStatistics]] = None
+    preview: Optional[ADCPreview] = None
+    timestamp: str
+
+
+class TriggerInfo(BaseModel):
+    """Switching event of a relay-triggered acquisition"""
+    relay: str
+    mode: str  # 'hardware' (start trigger wired to the relay line) or 'software' (timestamped)
+    sample_index: int  # sample at which the relay was switched on
+    uncertainty_samples: int  # +/- samples (0 with a hardware trigger)
+
+
+class CaptureStatus(BaseModel):
+    """State of a triggered capture"""
+    state: str  # 'armed', 'triggered', 'completed', 'cancelled' or 'failed'
+    sample_rate: int
+    channel: str  # watched channel ('adc1'..'adc4') or 'any'
+    level: float
+    slope: str  # 'rising', 'falling' or 'either'
+    pre_samples: int
+    post_samples: int
+    block_size: int
+    buffer_size: int
+    circuit: Optional[str] = None
+    parameters: Dict[str, str] = {}
+    armed_at: str
+    samples_scanned: int  # samples checked for the trigger so far
+    triggered_at: Optional[str] = None
+    trigger: Optional[Dict[str, Any]] = None  # sample_index = trigger sample in the stored run
+    run_id: Optional[str] = None  # set once the event is stored
+    error: Optional[str] = None
 
 
 class CapacitorDischargeRequest(BaseModel):
@@ -138,19 +239,143 @@ class CapacitorDischargeResponse(BaseModel):
     timestamp: str
 
 
+# ============== Job Models ==============
+
+class JobInfo(BaseModel):
+    """Status of a background hardware job"""
+    job_id: str
+    kind: str
+    status: str  # 'pending', 'running', 'completed' or 'failed'
+    params: Dict[str, Any] = {}
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    created_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+
+
+# ============== Sequence Models ==============
+
+class SequenceStep(BaseModel):
+    """One step of a relay/acquisition sequence; fields depend on the step type"""
+    type: str = Field(
+        description="Step type: set, wait, disable_all, discharge, start_adc or stop_adc",
+        pattern="^(set|wait|disable_all|discharge|start_adc|stop_adc)$"
+    )
+    # set
+    relays: Optional[Dict[str, bool]] = None
+    # wait
+    seconds: Optional[float] = Field(default=None, ge=0, le=60)
+    # discharge
+    capacitor: Optional[str] = Field(default=None, pattern="^(cs[1-4]|CS[1-4])$")
+    discharge_resistor: Optional[str] = Field(default=None, pattern="^(rz[1-4]|RZ[1-4])$")
+    duration: Optional[float] = Field(default=None, ge=0.1, le=10.0)
+    # start_adc
+    samples: Optional[int] = Field(default=None, ge=100, le=500000)
+    sample_rate: Optional[int] = Field(default=None, ge=1, le=500000)
+    measurement_time: Optional[float] = Field(default=None, ge=0, le=20)
+    circuit: Optional[str] = Field(default=None, pattern="^(rl|rc|rlc)$")
+    parameters: Optional[Dict[str, str]] = None
+    trigger_relay: Optional[str] = None
+    # stop_adc
+    decimate: Optional[str] = Field(default=None, pattern="^(lttb|minmax)$")
+    points: Optional[int] = Field(default=None, ge=10, le=100000)
+
+
+class SequenceRequest(BaseModel):
+    """Request model for running a sequence"""
+    steps: List[SequenceStep] = Field(min_length=1, max_length=200)
+
+
+class SequenceStepResult(BaseModel):
+    """Timing of an executed sequence step"""
+    index: int
+    type: str
+    started_ms: float  # relative to the start of the sequence
+    duration_ms: float
+
+
+class SequenceResponse(BaseModel):
+    """Response model for a completed sequence"""
+    status: str
+    steps_executed: int
+    steps: List[SequenceStepResult]
+    total_ms: float
+    run_id: Optional[str] = None
+    trigger: Optional[TriggerInfo] = None  # switching event of a start_adc step with trigger_relay
+    acquisition: Optional[DAQReadResponse] = None  # data of the stop_adc step
+    timestamp: str
+
+
+# ============== Measurement Run Models ==============
+
+class RunInfo(BaseModel):
+    """Metadata of a stored measurement run"""
+    run_id: str
+    samples: int
+    channels: int
+    sample_rate: int
+    started_at: Optional[str] = None
+    stopped_at: Optional[str] = None
+    relays_at_start: List[str] = []
+    relays_at_stop: List[str] = []
+    configuration: Dict[str, Any] = {}
+    statistics: Optional[Dict[str, ChannelStatistics]] = None  # per channel, computed during acquisition
+
+
+class RunsListResponse(BaseModel):
+    """Response model for the list of stored runs"""
+    total_runs: int
+    runs: List[RunInfo]
+
+
+class RunAnalysisResponse(BaseModel):
+    """Transient fit of a stored run"""
+    run_id: str
+    circuit: str
+    window: Dict[str, Any]  # start, length, points, block (samples averaged per point), sample_rate
+    channels: Dict[str, Optional[Dict[str, Any]]]  # fit per channel, None without a transient
+    fit_channel: str  # channel the parameters are derived from (best fit)
+    model: str  # 'exponential', 'damped_oscillation' or 'double_exponential'
+    parameters: Dict[str, Any]  # time constant(s), resonant frequency, damping ratio, ...
+    nominal: Dict[str, Optional[float]]  # R, L, C of the relays switched in at the start
+    estimates: Dict[str, Optional[float]]  # R, L, C from the fit and the other nominal values
+    duration_ms: float
+    timestamp: str
+
+
+class RunSamplesResponse(BaseModel):
+    """Response model for a range of samples from a stored run"""
+    run_id: str
+    offset: int
+    length: int  # full-resolution samples per channel in the range
+    total_samples: int
+    sample_rate: int
+    data: DAQData
+    decimation: Optional[str] = None
+    indices: Optional[DAQIndices] = None  # absolute sample index of each point
+    timestamp: str
+
+
 # ============== WebSocket Models ==============
 
 class WebSocketCommand(BaseModel):
     """WebSocket command from client"""
     action: str  # 'start' or 'stop'
     sample_rate: Optional[int] = 100
-    interval: Optional[float] = 0.1
+    interval: Optional[float] = 0.1  # seconds of samples per data message
+    policy: Optional[str] = 'drop_oldest'  # 'drop_oldest' or 'disconnect'
+    format: Optional[str] = 'json'  # 'json' or 'binary'
+    encoding: Optional[str] = 'float32'  # binary frames: 'float32' or 'int16'
 
 
 class WebSocketDataMessage(BaseModel):
     """WebSocket data message to client"""
     type: str = "data"
+    seq: int
     timestamp: str
+    t0: float
+    dt: float
     data: DAQData
 
 
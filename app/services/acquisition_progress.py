@@ -0,0 +1,139 @@
+"""
+Acquisition Progress
+In-memory progress counters and the most recent samples of a running
+acquisition, updated by the reader thread and read by status requests
+"""
+import threading
+import time
+from typing import List, Optional
+
+import numpy as np
+
+from app.services.decimation import decimate
+from app.services.trigger import PreTriggerBuffer
+
+# Estimated DAQ buffer fill (fraction) from which an overrun risk is reported
+RISK_ELEVATED = 0.5
+RISK_HIGH = 0.8
+
+# Most samples per channel kept for previews
+MAX_PREVIEW_SAMPLES = 200_000
+
+
+class AcquisitionProgress:
+    """
+    Progress of a running acquisition, without touching the DAQ task
+
+    The reader records every block it drains together with the number of
+    samples that were waiting in the DAQ buffer. Status requests estimate
+    the current buffer fill from that and the time since the last read
+    (the hardware keeps sampling at sample_rate), so a stalled reader shows
+    up as a growing overrun risk before the driver reports an overrun.
+    """
+
+    def __init__(self, channel_names: List[str], sample_rate: int, buffer_size: int, preview_samples: int):
+        """
+        Args:
+            channel_names: Name of each row of the blocks (e.g. 'adc1')
+            sample_rate: Sampling rate in Hz
+            buffer_size: DAQ buffer size in samples per channel
+            preview_samples: Most recent samples per channel kept for previews
+                (capped at MAX_PREVIEW_SAMPLES)
+        """
+        self.channel_names = list(channel_names)
+        self.sample_rate = sample_rate
+        self.buffer_size = buffer_size
+        self._started = time.perf_counter()
+        self._last_read = self._started
+        self._samples = 0
+        self._blocks = 0
+        self._unread = 0
+        self._peak_fill = 0.0
+        self._error: Optional[str] = None
+        self._recent = PreTriggerBuffer(len(self.channel_names), min(preview_samples, MAX_PREVIEW_SAMPLES))
+        self._lock = threading.Lock()
+
+    def record(self, block: np.ndarray, available: int):
+        """
+        Record a block drained from the DAQ buffer
+
+        Args:
+            block: Array of shape (channels, n)
+            available: Samples per channel that were in the DAQ buffer before the read
+        """
+        now = time.perf_counter()
+        with self._lock:
+            self._samples += block.shape[1]
+            self._blocks += 1
+            self._unread = max(0, available - block.shape[1])
+            self._last_read = now
+            self._peak_fill = max(self._peak_fill, available / self.buffer_size)
+            self._recent.append(block)
+
+    def record_error(self, error: str):
+        """Record that reading failed (the acquisition ended early)"""
+        self._error = error
+
+    def snapshot(self) -> dict:
+        """
+        Progress counters
+
+        Returns:
+            Dictionary with samples (per channel read so far), blocks,
+            elapsed_s, buffer_fill_percent (estimated now),
+            peak_buffer_fill_percent (measured at reads), overrun_risk
+            ('low', 'elevated', 'high' or 'overrun') and reader_error
+        """
+        now = time.perf_counter()
+        with self._lock:
+            samples, blocks = self._samples, self._blocks
+            unread, last_read, peak_fill = self._unread, self._last_read, self._peak_fill
+
+        fill = min(1.0, (unread + (now - last_read) * self.sample_rate) / self.buffer_size)
+        if self._error is not None:
+            risk = 'overrun'
+        elif fill >= RISK_HIGH:
+            risk = 'high'
+        elif fill >= RISK_ELEVATED:
+            risk = 'elevated'
+        else:
+            risk = 'low'
+        return {
+            'samples': samples,
+            'blocks': blocks,
+            'elapsed_s': now - self._started,
+            'buffer_fill_percent': fill * 100,
+            'peak_buffer_fill_percent': peak_fill * 100,
+            'overrun_risk': risk,
+            'reader_error': self._error
+        }
+
+    def preview(self, points: int, method: str = 'minmax') -> Optional[dict]:
+        """
+        Decimated copy of the most recent samples
+
+        Args:
+            points: Target points per channel
+            method: Decimation method ('lttb' or 'minmax')
+
+        Returns:
+            Dictionary with start_index and samples (the window in sample
+            indices), decimation, and per-channel indices and data (numpy
+            arrays), or None before the first block
+        """
+        with self._lock:
+            recent = self._recent.contents()
+            end = self._samples
+        if recent.shape[1] == 0:
+            return None
+
+        start = end - recent.shape[1]
+        indices, values = decimate(recent, method, points)
+        indices = indices + start
+        return {
+            'start_index': start,
+            'samples': recent.shape[1],
+            'decimation': method,
+            'indices': {name: indices[row] for row, name in enumerate(self.channel_names)},
+            'data': {name: values[row] for row, name in enumerate(self.channel_names)}
+        }
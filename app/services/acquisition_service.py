@@ -2,12 +2,29 @@
 Data Acquisition Service
 Handles capacitor charging and data reading from ADC channels
 """
+import math
+import threading
 import time
-import nidaqmx as ni
-from nidaqmx.constants import AcquisitionType
-from typing import List, Tuple
+from datetime import datetime
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+from app.core.config import settings
 from app.core.daq_config import daq_channels
+from app.core.logging_config import get_logger, log_fields
+from app.hardware import AnalogInputTask, get_backend
+from app.services import hardware_executor, metrics
+from app.services.acquisition_progress import AcquisitionProgress
+from app.services.online_stats import RunningStatistics
 from app.services.relay_service import relay_service
+from app.services.run_store import run_store, RunWriter
+from app.services.stream_buffer import StreamBlock, StreamRingBuffer
+from app.services.timing import precise_sleep
+from app.services.trigger import LevelTrigger, PreTriggerBuffer
+
+# ADC channel names, in row order of acquired arrays
+ADC_CHANNELS = ('adc1', 'adc2', 'adc3', 'adc4')
+
+logger = get_logger(__name__)
 
 
 class AcquisitionService:
@@ -16,6 +33,7 @@ class AcquisitionService:
     def __init__(self):
         self.channels = daq_channels
         self.relay_service = relay_service
+        self.backend = get_backend()
         
         # Capacitor to relay mapping
         self.capacitor_relays = {
@@ -36,28 +54,79 @@ class AcquisitionService:
         # Active acquisition task state
         self._active_task = None
         self._task_config = None
+        
+        # Most recent completed acquisition (full resolution data lives on disk)
+        self._last_config = None
+        self._last_run_id = None
+        self.run_store = run_store
+        
+        # Background reader draining the active task into the run file
+        self._relays_at_start = []
+        self._run_writer = None
+        self._reader_thread = None
+        self._reader_stop = None
+        self._reader_error = None
+        self._statistics = None
+        self._last_statistics = None
+        self._progress = None
+        
+        # Continuous streaming task state (used by /ws/daq)
+        self._stream_task = None
+        self._stream_config = None
+        self._stream_lock = threading.Lock()
+        # Held by the stream callback while it reads, so the task is never stopped mid-read
+        self._stream_read_lock = threading.Lock()
+        self.stream_buffer = StreamRingBuffer()
+        
+        # Triggered capture state (see start_capture)
+        self._capture_task = None
+        self._capture = None
+        self._capture_writer = None
+        self._capture_thread = None
+        self._capture_stop = None
+        
+        # Metric children used per block by the stream callback
+        self._stream_read_time = metrics.read_seconds.labels('stream')
+        self._stream_samples = metrics.samples_read.labels('stream')
+        self._stream_fill = metrics.buffer_fill_ratio.labels('stream')
     
-    def discharge_capacitor(self, capacitor: str = 'cs1', discharge_resistor: str = 'rz2', duration: float = 0.5):
+    def _create_task(self, kind: str, sample_rate: int, samples_per_channel: int) -> AnalogInputTask:
+        """Create a continuous analog input task on all 4 ADC channels, timing it as 'kind'"""
+        start = time.perf_counter()
+        task = self.backend.create_ai_task(
+            self.channels.adc['all'],
+            channels=4,
+            sample_rate=sample_rate,
+            samples_per_channel=samples_per_channel,
+            continuous=True
+        )
+        metrics.task_create_seconds.labels(kind).observe(time.perf_counter() - start)
+        return task
+    
+    @staticmethod
+    def _start_task(kind: str, task: AnalogInputTask):
+        """Start a task, timing it as 'kind'"""
+        start = time.perf_counter()
+        task.start()
+        metrics.task_start_seconds.labels(kind).observe(time.perf_counter() - start)
+    
+    def discharge_steps(self, capacitor: str = 'cs1', discharge_resistor: str = 'rz2', duration: float = 0.5) -> List[dict]:
         """
-        Execute capacitor discharge sequence through specified discharge resistor
+        Build the relay steps of a capacitor discharge
+        
+        Relays switched together are grouped into one 'set' step, so each
+        step is a single batched write per module port.
         
         Args:
             capacitor: Capacitor identifier ('cs1', 'cs2', 'cs3', or 'cs4')
-                      cs1 = 48 μF
-                      cs2 = 9.5 μF
-                      cs3 = 1 μF
-                      cs4 = 222 nF
             discharge_resistor: Discharge resistor identifier ('rz1', 'rz2', 'rz3', or 'rz4')
-                               rz1 = 3 Ω
-                               rz2 = 21.7 Ω (default - R2s2)
-                               rz3 = 357 Ω
-                               rz4 = 2.18 kΩ
-            duration: Discharge duration in seconds (default: 0.5)
-        
+            duration: Discharge duration in seconds
+            
+        Returns:
+            List of sequence steps ('set' and 'wait')
+            
         Raises:
             ValueError: If capacitor or discharge_resistor identifier is invalid
-            
-        Note: All relays are turned off after discharge
         """
         # Validate capacitor
         capacitor_lower = capacitor.lower()
@@ -72,152 +141,322 @@ class AcquisitionService:
         capacitor_relay = self.capacitor_relays[capacitor_lower]
         discharge_relay = self.discharge_resistor_relays[discharge_resistor_lower]
         
-        # -------------- Discharge phase --------------
-        self.relay_service.zs1_1(False)  # Main power OFF
-        self.relay_service.zs1_2(True)   # ADC1 short circuit
-        self.relay_service.zk1_5(True)   # R_1_1 ON
-        self.relay_service.control_relay(capacitor_relay, True)  # Selected capacitor ON
-        self.relay_service.zs2_1(True)   # GND ON
-        self.relay_service.zs2_2(True)   # Discharge circuit short
-        self.relay_service.control_relay(discharge_relay, True)  # Selected discharge resistor ON
-        
-        time.sleep(duration)  # Wait for discharge
-        
-        # Turn off all relays
-        self.relay_service.zs2_2(False)  # Discharge circuit OFF
-        self.relay_service.control_relay(discharge_relay, False)  # Discharge resistor OFF
-        self.relay_service.zk1_5(False)  # R_1_1 OFF
-        self.relay_service.zs1_2(False)  # ADC1 short circuit OFF
-        self.relay_service.control_relay(capacitor_relay, False)  # Capacitor OFF
-        self.relay_service.zs2_1(False)  # GND OFF
-    
-    def read_continuous_sample(
-        self,
-        samples_per_channel: int = 10,
-        sample_rate: int = 100
-    ) -> Tuple[List[float], List[float], List[float], List[float]]:
+        return [
+            # -------------- Discharge phase --------------
+            {'type': 'set', 'relays': {'zs1_1': False}},  # Main power OFF first
+            {'type': 'set', 'relays': {
+                'zs1_2': True,           # ADC1 short circuit
+                'zk1_5': True,           # R_1_1 ON
+                capacitor_relay: True,   # Selected capacitor ON
+                'zs2_1': True,           # GND ON
+                'zs2_2': True,           # Discharge circuit short
+                discharge_relay: True    # Selected discharge resistor ON
+            }},
+            {'type': 'wait', 'seconds': duration},  # Wait for discharge
+            # Open the discharge path before anything else
+            {'type': 'set', 'relays': {'zs2_2': False, discharge_relay: False}},
+            {'type': 'set', 'relays': {
+                'zk1_5': False,          # R_1_1 OFF
+                'zs1_2': False,          # ADC1 short circuit OFF
+                capacitor_relay: False,  # Capacitor OFF
+                'zs2_1': False           # GND OFF
+            }}
+        ]
+    
+    def discharge_capacitor(self, capacitor: str = 'cs1', discharge_resistor: str = 'rz2', duration: float = 0.5):
         """
-        Read a small continuous sample (for streaming)
+        Execute capacitor discharge sequence through specified discharge resistor
         
         Args:
-            samples_per_channel: Number of samples to read
-            sample_rate: Sampling rate in Hz
-            
-        Returns:
-            Tuple of (adc1_data, adc2_data, adc3_data, adc4_data)
-        """
-        samplemode = AcquisitionType.FINITE
+            capacitor: Capacitor identifier ('cs1', 'cs2', 'cs3', or 'cs4')
+                      cs1 = 48 μF
+                      cs2 = 9.5 μF
+                      cs3 = 1 μF
+                      cs4 = 222 nF
+            discharge_resistor: Discharge resistor identifier ('rz1', 'rz2', 'rz3', or 'rz4')
+                               rz1 = 3 Ω
+                               rz2 = 21.7 Ω (default - R2s2)
+                               rz3 = 357 Ω
+                               rz4 = 2.18 kΩ
+            duration: Discharge duration in seconds (default: 0.5)
         
-        with ni.Task() as task_ai:
-            task_ai.ai_channels.add_ai_voltage_chan(self.channels.adc['all'])
-            task_ai.timing.cfg_samp_clk_timing(
-                rate=sample_rate,
-                sample_mode=samplemode
-            )
+        Raises:
+            ValueError: If capacitor or discharge_resistor identifier is invalid
             
-            data = task_ai.read(number_of_samples_per_channel=samples_per_channel)
-        
-        return data[0], data[1], data[2], data[3]
+        Note: All relays are turned off after discharge
+        """
+        for step in self.discharge_steps(capacitor, discharge_resistor, duration):
+            if step['type'] == 'set':
+                self.relay_service.control_multiple_relays(step['relays'])
+            else:
+                precise_sleep(step['seconds'])
     
     def start_read_adc(
         self,
         samples_per_channel: int = 500,
-        sample_rate: int = 100
+        sample_rate: int = 100,
+        circuit: Optional[str] = None,
+        parameters: Optional[Dict[str, str]] = None,
+        trigger_relay: Optional[str] = None
     ) -> dict:
         """
         Start continuous ADC measurement from all 4 ADC channels
         
         This method configures and starts continuous data acquisition without
-        returning any data. Data collection happens in the background until
-        stop_read_adc() is called.
+        returning any data. A background reader thread drains the DAQmx buffer
+        in fixed-size blocks and appends them to the run's file on disk while
+        the task runs, so neither the DAQmx buffer nor RAM limits the run
+        length. Collection continues until stop_read_adc() is called.
+        
+        With trigger_relay set, the relay is switched on as part of the start
+        and the sample index of the switching event is reported (see
+        _switch_trigger_relay), so the transient's position in the data is
+        known instead of depending on request timing.
         
         Args:
-            samples_per_channel: Number of samples per channel to acquire
+            samples_per_channel: Expected number of samples per channel (sizes the DAQmx buffer)
             sample_rate: Sampling rate in Hz
+            circuit: Optional circuit type ('rl', 'rc', 'rlc'), stored with the run
+            parameters: Optional component labels (inductance, capacitance,
+                resistance, discharge_resistor), stored with the run
+            trigger_relay: Optional relay (normally 'zs1_1', main power) to
+                switch on once the ADC is armed; it must be OFF
             
         Returns:
-            Dictionary with status and configuration info
+            Dictionary with status and configuration info (buffer_size is
+            the DAQ buffer actually allocated), and 'trigger' when
+            trigger_relay is set
             
         Raises:
             RuntimeError: If acquisition is already running
+            ValueError: If trigger_relay is unknown or already ON
         """
         if self._active_task is not None:
             raise RuntimeError("ADC acquisition is already running. Stop it first with stop_read_adc()")
+        if self._stream_task is not None:
+            raise RuntimeError("ADC channels are in use by live streaming. Stop the stream first")
+        if self._capture_task is not None:
+            raise RuntimeError("ADC channels are in use by a triggered capture. Stop it first")
+        if trigger_relay is not None:
+            self.relay_service.validate_relay_names([trigger_relay])
+            if self.relay_service.get_tracked_states()[trigger_relay]:
+                raise ValueError(f"Trigger relay {trigger_relay} is already ON, there is no switching event to capture")
+        hardware_trigger = trigger_relay is not None and bool(settings.adc_trigger_source)
         
-        # Create and configure the task
-        self._active_task = ni.Task()
+        # Drain ~100 ms per block; the DAQmx buffer only has to absorb a few
+        # blocks of reader latency, not the whole run
+        block_size = max(10, sample_rate // 10)
+        buffer_size = max(block_size * 10, min(samples_per_channel, sample_rate * 2))
         
-        # Configure analog input channels
-        self._active_task.ai_channels.add_ai_voltage_chan(self.channels.adc['all'])
+        # Relay states before the trigger relay is switched as part of the start
+        relays_at_start = self._enabled_relays()
         
-        # Configure timing for CONTINUOUS acquisition
-        # This allows stopping at any time and reading whatever data is available
-        self._active_task.timing.cfg_samp_clk_timing(
-            rate=sample_rate,
-            sample_mode=AcquisitionType.CONTINUOUS,
-            samps_per_chan=samples_per_channel  # Buffer size
-        )
+        # Samples go straight to disk as they are drained
+        run_writer = self.run_store.create_run(channels=4, sample_rate=sample_rate)
         
-        # Start the task (begins acquisition)
-        self._active_task.start()
+        try:
+            # CONTINUOUS acquisition allows stopping at any time and reading
+            # whatever data is available
+            self._active_task = self._create_task('acquisition', sample_rate, buffer_size)
+        except Exception:
+            run_writer.abort()
+            raise
+        
+        trigger = None
+        try:
+            if hardware_trigger:
+                # The task arms on start and takes its first sample on the relay line's edge
+                self._active_task.set_start_trigger(settings.adc_trigger_source)
+            # Start the task (begins acquisition)
+            self._start_task('acquisition', self._active_task)
+            if trigger_relay is not None:
+                trigger = self._switch_trigger_relay(self._active_task, trigger_relay, sample_rate, hardware_trigger)
+        except Exception:
+            self._active_task.close()
+            self._active_task = None
+            run_writer.abort()
+            raise
         
         # Store configuration for later reference
         self._task_config = {
             'samples_per_channel': samples_per_channel,
             'sample_rate': sample_rate,
-            'channels': 4
+            'channels': 4,
+            'block_size': block_size,
+            'buffer_size': buffer_size,
+            'run_id': run_writer.run_id,
+            'started_at': datetime.now().isoformat(),
+            'circuit': circuit,
+            'parameters': parameters or {},
+            'trigger': trigger
         }
+        self._relays_at_start = relays_at_start
+        
+        # Start draining the buffer in the background
+        self._run_writer = run_writer
+        self._reader_error = None
+        self._statistics = RunningStatistics(ADC_CHANNELS, sample_rate)
+        self._progress = AcquisitionProgress(
+            ADC_CHANNELS, sample_rate, buffer_size,
+            preview_samples=max(1, int(sample_rate * settings.status_preview_seconds))
+        )
+        self._reader_stop = threading.Event()
+        self._reader_thread = threading.Thread(
+            target=self._reader_loop,
+            args=(self._active_task, run_writer, self._statistics, self._progress, self._reader_stop, block_size,
+                  sample_rate, buffer_size),
+            name="adc-reader",
+            daemon=True
+        )
+        self._reader_thread.start()
+        
+        logger.info("ADC acquisition started", extra=log_fields(
+            run_id=run_writer.run_id,
+            sample_rate=sample_rate,
+            buffer_size=buffer_size,
+            circuit=circuit,
+            trigger=trigger
+        ))
         
         return {
             'status': 'started',
             'samples_per_channel': samples_per_channel,
             'sample_rate': sample_rate,
-            'channels': 4
+            'channels': 4,
+            'buffer_size': buffer_size,
+            'trigger': trigger
+        }
+    
+    def _switch_trigger_relay(self, task: AnalogInputTask, relay_name: str, sample_rate: int,
+                              hardware_trigger: bool) -> dict:
+        """
+        Switch the trigger relay on and locate the switching event in the samples
+        
+        With a hardware start trigger the task takes its first sample on the
+        relay line's edge, so the event is sample 0. Otherwise the event is
+        placed at the middle of the port write, relative to the task's first
+        sample; the uncertainty covers the port write and the start call.
+        The relay contacts' own operate time is not included.
+        
+        Returns:
+            Dictionary with relay, mode ('hardware' or 'software'),
+            sample_index and uncertainty_samples
+        """
+        self.relay_service.control_relay(relay_name, True)
+        
+        if hardware_trigger:
+            return {'relay': relay_name, 'mode': 'hardware', 'sample_index': 0, 'uncertainty_samples': 0}
+        
+        before, after = self.relay_service.last_write_window
+        offset = (before + after) / 2 - task.start_time
+        uncertainty = (after - before) / 2 + task.start_time_uncertainty
+        return {
+            'relay': relay_name,
+            'mode': 'software',
+            'sample_index': max(0, round(offset * sample_rate)),
+            'uncertainty_samples': math.ceil(uncertainty * sample_rate)
         }
     
-    def stop_read_adc(self) -> Tuple[List[float], List[float], List[float], List[float]]:
+    def _reader_loop(self, task, store: RunWriter, statistics: RunningStatistics, progress: AcquisitionProgress,
+                     stop_event: threading.Event, block_size: int, sample_rate: int, buffer_size: int):
+        """
+        Background reader: drain the running task in fixed-size blocks
+        
+        Polls the number of available samples and reads whole blocks as soon
+        as they are in the buffer. When stop_event is set, whatever is left in
+        the buffer is read as a final partial block before exiting. Every
+        block also updates the run's running statistics and progress.
+        
+        Reads happen on this thread, not the hardware worker (see
+        HardwareWorker); stop_read_adc() joins it before stopping the task.
+        """
+        poll_interval = block_size / sample_rate / 4
+        # Reused for every block; the writer copies the samples out
+        block = np.empty((4, block_size), dtype=np.float64)
+        read_time = metrics.read_seconds.labels('acquisition')
+        samples_read = metrics.samples_read.labels('acquisition')
+        buffer_fill = metrics.buffer_fill_ratio.labels('acquisition')
+        
+        try:
+            while not stop_event.is_set():
+                available = task.available
+                if available >= block_size:
+                    buffer_fill.set(available / buffer_size)
+                    start = time.perf_counter()
+                    task.read(block)
+                    read_time.observe(time.perf_counter() - start)
+                    samples_read.inc(block_size)
+                    store.append(block)
+                    statistics.update(block)
+                    progress.record(block, available)
+                else:
+                    stop_event.wait(poll_interval)
+            
+            # Final drain of everything still in the buffer
+            remaining = task.available
+            if remaining > 0:
+                tail = np.empty((4, remaining), dtype=np.float64)
+                task.read(tail)
+                samples_read.inc(remaining)
+                store.append(tail)
+                statistics.update(tail)
+                progress.record(tail, remaining)
+            buffer_fill.set(0)
+        except Exception as e:
+            # Typically a buffer overrun; keep what was collected so far
+            logger.error("Error reading ADC data", extra=log_fields(run_id=store.run_id, error=str(e)))
+            metrics.overruns.labels('acquisition').inc()
+            self._reader_error = str(e)
+            progress.record_error(str(e))
+    
+    def stop_read_adc(self) -> np.ndarray:
         """
         Stop ADC acquisition and return all collected data
         
-        This method stops the running acquisition task and returns all
-        data collected from the 4 ADC channels since start_read_adc() was called.
+        This method stops the background reader, drains the last partial block
+        from the DAQmx buffer, closes the task, finalizes the run file and
+        returns all data collected from the 4 ADC channels since
+        start_read_adc() was called.
         
         Returns:
-            Tuple of (adc1_data, adc2_data, adc3_data, adc4_data)
+            Memory-mapped array of shape (4, samples), one row per ADC channel
+            (adc1..adc4), backed by the stored run
             
         Raises:
-            RuntimeError: If no acquisition is currently running
+            RuntimeError: If no acquisition is currently running, or reading
+                          failed before any data was collected
         """
         if self._active_task is None:
             raise RuntimeError("No ADC acquisition is running. Start it first with start_read_adc()")
         
         task_to_cleanup = self._active_task
-        config_to_return = self._task_config
+        writer = self._run_writer
         
         try:
-            # Read all available samples (-1 means read all available)
-            # This works with CONTINUOUS mode and returns whatever is in the buffer
-            data = task_to_cleanup.read(
-                number_of_samples_per_channel=-1
-            )
+            # Let the reader drain the rest of the buffer and exit
+            self._reader_stop.set()
+            self._reader_thread.join()
             
-            # Validate data format
-            if data is None or len(data) < 4:
-                raise ValueError(f"Invalid data received from DAQ: expected 4 channels, got {len(data) if data else 0}")
+            if self._reader_error is not None and writer.samples == 0:
+                writer.abort()
+                raise RuntimeError(f"Error reading ADC data: {self._reader_error}")
             
-            # Extract data for each channel
-            adc1_data = data[0] if isinstance(data[0], list) else [data[0]]
-            adc2_data = data[1] if isinstance(data[1], list) else [data[1]]
-            adc3_data = data[2] if isinstance(data[2], list) else [data[2]]
-            adc4_data = data[3] if isinstance(data[3], list) else [data[3]]
+            run_id = writer.close(self._run_metadata(self._task_config))
+            data = self.run_store.open_samples(run_id)
             
-            print(f"ADC acquisition stopped. Collected {len(adc1_data)} samples per channel.")
+            logger.info("ADC acquisition stopped", extra=log_fields(
+                run_id=run_id,
+                samples=data.shape[1],
+                sample_rate=self._task_config['sample_rate'],
+                reader_error=self._reader_error
+            ))
             
-            return adc1_data, adc2_data, adc3_data, adc4_data
+            # Keep full-resolution data retrievable after a decimated response
+            self._last_config = self._task_config.copy()
+            self._last_run_id = run_id
+            self._last_statistics = self._statistics.snapshot()
             
-        except Exception as e:
-            print(f"Error reading ADC data: {str(e)}")
-            raise
+            return data
             
         finally:
             # Always clean up the task, even if read fails
@@ -226,11 +465,524 @@ class AcquisitionService:
                     task_to_cleanup.stop()
                     task_to_cleanup.close()
             except Exception as cleanup_error:
-                print(f"Error during task cleanup: {str(cleanup_error)}")
+                logger.warning("Error during task cleanup", extra=log_fields(error=str(cleanup_error)))
             
             # Clear state
             self._active_task = None
             self._task_config = None
+            self._run_writer = None
+            self._statistics = None
+            self._progress = None
+            self._reader_thread = None
+            self._reader_stop = None
+    
+    def _enabled_relays(self) -> List[str]:
+        """Relays currently ON according to the relay service's tracked state"""
+        return [name for name, state in self.relay_service.get_tracked_states().items() if state]
+    
+    def _run_metadata(self, config: dict) -> dict:
+        """Metadata stored with a completed run"""
+        return {
+            'configuration': config,
+            'stopped_at': datetime.now().isoformat(),
+            'relays_at_start': self._relays_at_start,
+            'relays_at_stop': self._enabled_relays(),
+            'reader_error': self._reader_error,
+            'statistics': self._statistics.snapshot()
+        }
+    
+    def get_statistics(self) -> Optional[Dict[str, dict]]:
+        """
+        Running per-channel statistics of the acquisition in progress
+        
+        Computed by the reader as blocks arrive, so no samples are scanned.
+        
+        Returns:
+            Statistics per channel (see RunningStatistics.snapshot), or None
+            if no acquisition is running or no block has been read yet
+        """
+        statistics = self._statistics
+        return statistics.snapshot() if statistics is not None else None
+    
+    def get_progress(self) -> Optional[dict]:
+        """
+        Progress of the acquisition in progress, from in-memory counters
+        
+        The DAQ task is not queried, so this is safe to poll at any rate.
+        
+        Returns:
+            Progress counters (see AcquisitionProgress.snapshot), or None if
+            no acquisition is running
+        """
+        progress = self._progress
+        return progress.snapshot() if progress is not None else None
+    
+    def get_preview(self, points: int, method: str = 'minmax') -> Optional[dict]:
+        """
+        Decimated preview of the most recent samples of the acquisition in progress
+        
+        Covers the last status_preview_seconds of data (see settings).
+        
+        Args:
+            points: Target points per channel
+            method: Decimation method ('lttb' or 'minmax')
+            
+        Returns:
+            Preview (see AcquisitionProgress.preview), or None if no
+            acquisition is running or no block has been read yet
+        """
+        progress = self._progress
+        return progress.preview(points, method) if progress is not None else None
+    
+    def get_last_statistics(self) -> Optional[Dict[str, dict]]:
+        """
+        Per-channel statistics of the most recent completed acquisition
+        
+        Returns:
+            Statistics per channel, or None if no run completed or it had no samples
+        """
+        return self._last_statistics
+    
+    def get_last_run_id(self) -> Optional[str]:
+        """
+        Get the run ID of the most recent completed acquisition
+        
+        Returns:
+            Run ID, or None if no run was saved
+        """
+        return self._last_run_id
+    
+    def get_last_data(self) -> Tuple[np.ndarray, dict]:
+        """
+        Get the full-resolution data of the most recent completed acquisition
+        
+        Returns:
+            Tuple of (memory-mapped array of shape (4, samples), acquisition configuration)
+            
+        Raises:
+            RuntimeError: If no acquisition has completed yet
+        """
+        if self._last_run_id is None:
+            raise RuntimeError("No completed ADC acquisition available")
+        try:
+            return self.run_store.open_samples(self._last_run_id), self._last_config.copy()
+        except KeyError:
+            raise RuntimeError(f"Run {self._last_run_id} is no longer available")
+    
+    def start_capture(
+        self,
+        sample_rate: int,
+        level: float,
+        slope: str = 'rising',
+        channel: str = 'any',
+        pre_samples: int = 1000,
+        post_samples: int = 1000,
+        circuit: Optional[str] = None,
+        parameters: Optional[Dict[str, str]] = None
+    ) -> dict:
+        """
+        Arm a triggered capture
+        
+        A continuous task runs and a background thread checks each block for
+        the trigger condition, keeping only the last pre_samples in a ring
+        buffer. When a watched channel crosses level with the given slope,
+        the pre-trigger samples and the next post_samples (starting with the
+        trigger sample) are stored as a run and the task is stopped. Storage
+        and transfer depend on pre_samples + post_samples, not on how long
+        the capture waited.
+        
+        Args:
+            sample_rate: Sampling rate in Hz
+            level: Trigger level in volts
+            slope: 'rising', 'falling' or 'either'
+            channel: Channel to watch ('adc1'..'adc4') or 'any'
+            pre_samples: Samples per channel kept before the trigger
+            post_samples: Samples per channel kept from the trigger on
+            circuit: Optional circuit type, stored with the run
+            parameters: Optional component labels, stored with the run
+            
+        Returns:
+            Capture status (see get_capture_status)
+            
+        Raises:
+            RuntimeError: If the ADC channels are in use
+            ValueError: If channel or slope is invalid
+        """
+        if self._capture_task is not None:
+            raise RuntimeError("A triggered capture is already armed. Stop it first")
+        if self._active_task is not None:
+            raise RuntimeError("ADC acquisition is running. Stop it first with stop_read_adc()")
+        if self._stream_task is not None:
+            raise RuntimeError("ADC channels are in use by live streaming. Stop the stream first")
+        if channel != 'any' and channel not in ADC_CHANNELS:
+            raise ValueError(f"Invalid channel '{channel}'. Must be 'any' or one of: {', '.join(ADC_CHANNELS)}")
+        
+        channels = list(range(4)) if channel == 'any' else [ADC_CHANNELS.index(channel)]
+        trigger = LevelTrigger(channels, level, slope)
+        
+        # Short blocks keep the trigger-to-stop latency low; the DAQ buffer
+        # holds a second of samples
+        block_size = max(10, sample_rate // 100)
+        buffer_size = max(block_size * 20, sample_rate)
+        
+        task = self._create_task('capture', sample_rate, buffer_size)
+        try:
+            self._start_task('capture', task)
+        except Exception:
+            task.close()
+            raise
+        
+        self._capture_task = task
+        self._capture_writer = None
+        self._capture = {
+            'state': 'armed',
+            'sample_rate': sample_rate,
+            'channel': channel,
+            'level': level,
+            'slope': slope,
+            'pre_samples': pre_samples,
+            'post_samples': post_samples,
+            'block_size': block_size,
+            'buffer_size': buffer_size,
+            'circuit': circuit,
+            'parameters': parameters or {},
+            'armed_at': datetime.now().isoformat(),
+            'relays_at_start': self._enabled_relays(),
+            'samples_scanned': 0,
+            'triggered_at': None,
+            'trigger': None,
+            'run_id': None,
+            'error': None
+        }
+        self._capture_stop = threading.Event()
+        self._capture_thread = threading.Thread(
+            target=self._capture_loop,
+            args=(task, trigger, self._capture_stop),
+            name="adc-capture",
+            daemon=True
+        )
+        self._capture_thread.start()
+        
+        logger.info("Triggered capture armed", extra=log_fields(
+            sample_rate=sample_rate,
+            channel=channel,
+            level=level,
+            slope=slope,
+            pre_samples=pre_samples,
+            post_samples=post_samples
+        ))
+        return self.get_capture_status()
+    
+    def _capture_loop(self, task: AnalogInputTask, trigger: LevelTrigger, stop_event: threading.Event):
+        """
+        Background capture: scan blocks for the trigger, then store the event
+        
+        Before the trigger, each block is checked with one vectorized pass
+        and pushed into the pre-trigger ring buffer. From the trigger on,
+        samples go to the run file until post_samples are stored.
+        
+        Reads happen on this thread, not the hardware worker (see
+        HardwareWorker); the task is only stopped once the loop is done,
+        by the _finish_capture() it submits or after stop_capture() joins it.
+        """
+        status = self._capture
+        sample_rate = status['sample_rate']
+        block_size = status['block_size']
+        pre_samples = status['pre_samples']
+        remaining = status['post_samples']
+        poll_interval = block_size / sample_rate / 4
+        
+        pre_buffer = PreTriggerBuffer(4, pre_samples)
+        block = np.empty((4, block_size), dtype=np.float64)
+        read_time = metrics.read_seconds.labels('capture')
+        samples_read = metrics.samples_read.labels('capture')
+        buffer_fill = metrics.buffer_fill_ratio.labels('capture')
+        writer = None
+        
+        try:
+            while remaining > 0 and not stop_event.is_set():
+                available = task.available
+                if available < block_size:
+                    stop_event.wait(poll_interval)
+                    continue
+                buffer_fill.set(available / status['buffer_size'])
+                start = time.perf_counter()
+                task.read(block)
+                read_time.observe(time.perf_counter() - start)
+                samples_read.inc(block_size)
+                
+                if writer is not None:
+                    tail = block[:, :remaining]
+                    writer.append(tail)
+                    remaining -= tail.shape[1]
+                    continue
+                
+                index = trigger.find(block)
+                if index is None:
+                    pre_buffer.append(block)
+                    status['samples_scanned'] += block_size
+                    continue
+                
+                pre = np.concatenate((pre_buffer.contents(), block[:, :index]), axis=1)
+                pre = pre[:, pre.shape[1] - min(pre_samples, pre.shape[1]):]
+                writer = self.run_store.create_run(channels=4, sample_rate=sample_rate)
+                self._capture_writer = writer
+                writer.append(pre)
+                tail = block[:, index:index + remaining]
+                writer.append(tail)
+                remaining -= tail.shape[1]
+                
+                status['trigger'] = {
+                    'channel': status['channel'],
+                    'mode': 'level',
+                    'level': status['level'],
+                    'slope': status['slope'],
+                    'sample_index': pre.shape[1],
+                    'uncertainty_samples': 0,
+                    'wait_samples': status['samples_scanned'] + index
+                }
+                status['samples_scanned'] += block_size
+                status['triggered_at'] = datetime.now().isoformat()
+                status['state'] = 'triggered'
+                logger.info("Capture triggered", extra=log_fields(
+                    run_id=writer.run_id,
+                    wait_samples=status['trigger']['wait_samples']
+                ))
+            buffer_fill.set(0)
+        except Exception as e:
+            logger.error("Error reading capture data", extra=log_fields(error=str(e)))
+            metrics.overruns.labels('capture').inc()
+            status['error'] = str(e)
+        
+        if remaining == 0 or status['error'] is not None:
+            # Finished on its own: release the task on the hardware thread
+            try:
+                hardware_executor.submit(self._finish_capture, task)
+            except RuntimeError:
+                self._finish_capture(task)
+    
+    def _finish_capture(self, task: AnalogInputTask):
+        """Stop and close the capture task and store the captured run (no-op if done)"""
+        if task is not self._capture_task:
+            return
+        try:
+            task.stop()
+            task.close()
+        except Exception as cleanup_error:
+            logger.warning("Error during capture task cleanup", extra=log_fields(error=str(cleanup_error)))
+        self._capture_task = None
+        
+        status = self._capture
+        writer = self._capture_writer
+        self._capture_writer = None
+        if writer is None:
+            status['state'] = 'failed' if status['error'] else 'cancelled'
+            return
+        
+        config = {
+            'samples_per_channel': status['pre_samples'] + status['post_samples'],
+            'sample_rate': status['sample_rate'],
+            'channels': 4,
+            'block_size': status['block_size'],
+            'buffer_size': status['buffer_size'],
+            'run_id': writer.run_id,
+            'started_at': status['armed_at'],
+            'circuit': status['circuit'],
+            'parameters': status['parameters'],
+            'trigger': status['trigger']
+        }
+        run_id = writer.close({
+            'configuration': config,
+            'stopped_at': datetime.now().isoformat(),
+            'relays_at_start': status['relays_at_start'],
+            'relays_at_stop': self._enabled_relays(),
+            'reader_error': status['error']
+        })
+        status['run_id'] = run_id
+        status['state'] = 'completed'
+        self._last_config = config
+        self._last_run_id = run_id
+        
+        logger.info("Capture stored", extra=log_fields(run_id=run_id, samples=writer.samples))
+    
+    def stop_capture(self) -> Tuple[np.ndarray, dict]:
+        """
+        Stop the triggered capture and return the captured event
+        
+        A capture that has not completed yet is stopped; if it was already
+        triggered, the samples stored so far are kept.
+        
+        Returns:
+            Tuple of (memory-mapped array of shape (4, samples), capture status)
+            
+        Raises:
+            RuntimeError: If no capture was armed, or it ended without a trigger
+        """
+        if self._capture is None:
+            raise RuntimeError("No triggered capture was armed. Start one first with start_capture()")
+        
+        if self._capture_task is not None:
+            self._capture_stop.set()
+            self._capture_thread.join()
+            self._finish_capture(self._capture_task)
+        
+        status = self.get_capture_status()
+        if status['run_id'] is None:
+            reason = f": {status['error']}" if status['error'] else ""
+            raise RuntimeError(f"Capture ended without a trigger{reason}")
+        return self.run_store.open_samples(status['run_id']), status
+    
+    def get_capture_status(self) -> Optional[dict]:
+        """
+        Get the state of the current or last triggered capture
+        
+        Returns:
+            Dictionary with state ('armed', 'triggered', 'completed',
+            'cancelled' or 'failed'), the capture settings,
+            samples_scanned, trigger (with sample_index in the stored run),
+            run_id and error, or None if no capture was armed
+        """
+        if self._capture is None:
+            return None
+        status = self._capture.copy()
+        status.pop('relays_at_start', None)
+        return status
+    
+    def start_stream(self, sample_rate: int = 100, block_size: Optional[int] = None) -> dict:
+        """
+        Start the long-lived continuous streaming task
+        
+        A single CONTINUOUS task is created and kept running. DAQmx calls back
+        every block_size samples, the callback reads exactly that many samples
+        and publishes them to the stream ring buffer, so consecutive blocks are
+        contiguous with no gaps between them.
+        
+        Args:
+            sample_rate: Sampling rate in Hz
+            block_size: Samples per channel in each published block
+                        (default: ~50 ms worth of samples)
+            
+        Returns:
+            Dictionary with the stream configuration
+            
+        Raises:
+            RuntimeError: If ADC acquisition is running, or the stream is
+                          already running with a different configuration
+        """
+        if block_size is None:
+            block_size = max(10, sample_rate // 20)
+        
+        with self._stream_lock:
+            if self._stream_task is not None:
+                if self._stream_config['sample_rate'] != sample_rate:
+                    raise RuntimeError(
+                        f"Stream is already running at {self._stream_config['sample_rate']} Hz"
+                    )
+                return self._stream_config.copy()
+            
+            if self._active_task is not None:
+                raise RuntimeError("ADC acquisition is running. Stop it first with stop_read_adc()")
+            if self._capture_task is not None:
+                raise RuntimeError("ADC channels are in use by a triggered capture. Stop it first")
+            
+            # DAQmx buffer holds several blocks so a slow callback doesn't overrun
+            buffer_size = max(block_size * 16, sample_rate)
+            
+            task = self._create_task('stream', sample_rate, buffer_size)
+            try:
+                task.on_every_n_samples(block_size, self._on_stream_samples)
+                self.stream_buffer.reset()
+                self._stream_task = task
+                self._stream_config = {
+                    'sample_rate': sample_rate,
+                    'block_size': block_size,
+                    'buffer_size': buffer_size,
+                    'channels': 4
+                }
+                self._start_task('stream', task)
+            except Exception:
+                self._stream_task = None
+                self._stream_config = None
+                task.close()
+                raise
+            
+            return self._stream_config.copy()
+    
+    def _on_stream_samples(self, number_of_samples: int):
+        """
+        Every-N-samples callback: move one block into the ring buffer
+        
+        Runs on the driver's callback thread, not the hardware worker (see
+        HardwareWorker); stop_stream() waits for an in-flight read before
+        stopping the task.
+        """
+        try:
+            # Each block gets its own array since consumers keep references to it
+            data = np.empty((4, number_of_samples), dtype=np.float64)
+            with self._stream_read_lock:
+                task = self._stream_task
+                config = self._stream_config
+                if task is None or config is None:
+                    return
+                self._stream_fill.set(task.available / config['buffer_size'])
+                start = time.perf_counter()
+                task.read(data)
+            self._stream_read_time.observe(time.perf_counter() - start)
+            self._stream_samples.inc(number_of_samples)
+            self.stream_buffer.publish(data)
+        except Exception as e:
+            logger.error("Error reading stream block", extra=log_fields(error=str(e)))
+            metrics.overruns.labels('stream').inc()
+            self.stream_buffer.fail(f"Error reading stream data: {str(e)}")
+    
+    def read_stream_blocks(self, after_seq: int, timeout: float = 1.0) -> Tuple[List[StreamBlock], int, int]:
+        """
+        Get streamed blocks published since the given sequence number
+        
+        Args:
+            after_seq: First sequence number the caller has not seen yet
+            timeout: Maximum time to wait for new blocks in seconds
+            
+        Returns:
+            Tuple of (blocks, next_seq, dropped) - see StreamRingBuffer.read_since
+            
+        Raises:
+            RuntimeError: If the stream is not running or reading failed
+        """
+        if self._stream_task is None:
+            raise RuntimeError("Stream is not running")
+        return self.stream_buffer.read_since(after_seq, timeout=timeout)
+    
+    def stop_stream(self):
+        """Stop and close the continuous streaming task (no-op if not running)"""
+        with self._stream_lock:
+            task = self._stream_task
+            self._stream_task = None
+            self._stream_config = None
+            
+            if task is None:
+                return
+            
+            # Let a read in progress on the callback thread finish; later
+            # callbacks see no task. The lock is not held while stopping,
+            # as the driver may wait for the callback to return.
+            with self._stream_read_lock:
+                pass
+            self.stream_buffer.fail("Stream stopped")
+            try:
+                task.stop()
+                task.close()
+            except Exception as cleanup_error:
+                logger.warning("Error during stream task cleanup", extra=log_fields(error=str(cleanup_error)))
+    
+    def is_stream_running(self) -> bool:
+        """
+        Check if the continuous streaming task is running
+        
+        Returns:
+            True if streaming, False otherwise
+        """
+        return self._stream_task is not None
     
     def is_acquisition_running(self) -> bool:
         """
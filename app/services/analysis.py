@@ -0,0 +1,494 @@
+"""
+Transient Analysis
+Fits RC/RL/RLC step-response models to stored runs and derives circuit parameters
+"""
+import math
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from app.core.daq_config import CAPACITORS, INDUCTORS, R1S_RESISTORS, R2R_RESISTORS
+from app.services.run_store import RunStore
+
+CIRCUITS = ('rc', 'rl', 'rlc')
+CHANNEL_NAMES = ('adc1', 'adc2', 'adc3', 'adc4')
+
+# Most points a fit works on; longer windows are block-averaged down to this
+MAX_FIT_POINTS = 8000
+# Points used while searching the nonlinear parameters (every k-th fit point)
+_SEARCH_POINTS = 2000
+# Channels swinging less than this in the window (V) are not fitted
+MIN_SWING = 0.05
+# A sample-to-sample jump of this fraction of the largest jump marks a switching event
+_EVENT_FRACTION = 0.3
+# Band around the final value (fraction of the swing) a transient has settled in
+_SETTLE_BAND = 0.02
+# The window keeps this multiple of the settling time, so the final value is well defined
+_SETTLE_MARGIN = 3
+_MIN_WINDOW = 100
+
+# Grid search: candidates per parameter and zoom passes
+_GRID_1D = 48
+_GRID_2D = 16
+_REFINE_PASSES = 6
+# Decay rates searched, in 1/window (time constants from 10 windows to 1/1000 window)
+_RATE_RANGE = (0.1, 1000.0)
+
+
+# ====== Least squares ======
+
+def _solve_bases(bases: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Least-squares fit of y to each of K candidate sets of basis functions
+
+    The models are linear in their amplitudes once the nonlinear parameters
+    (rates, frequency) are fixed, so all candidates are solved at once from
+    their normal equations.
+
+    Args:
+        bases: Array of shape (K, m, n), m basis functions per candidate
+        y: Array of shape (n,)
+
+    Returns:
+        Tuple of (coefficients of shape (K, m), squared residual sums of shape (K,))
+    """
+    m = bases.shape[1]
+    gram = bases @ bases.transpose(0, 2, 1)
+    rhs = bases @ y
+    # A tiny ridge keeps nearly collinear candidates (rate ~ 0, equal rates) solvable
+    ridge = 1e-12 * np.trace(gram, axis1=1, axis2=2)
+    gram += ridge[:, None, None] * np.eye(m)
+    coefficients = np.linalg.solve(gram, rhs[..., None])[..., 0]
+    sse = y @ y - np.einsum('km,km->k', coefficients, rhs)
+    return coefficients, sse
+
+
+def _exponential_bases(t: np.ndarray, rates: np.ndarray) -> np.ndarray:
+    """[1, exp(-k t)] for each rate k"""
+    decay = np.exp(-np.outer(rates, t))
+    return np.stack((np.ones_like(decay), decay), axis=1)
+
+
+def _double_exponential_bases(t: np.ndarray, rates: np.ndarray) -> np.ndarray:
+    """[1, exp(-k1 t), exp(-k2 t)] for each rate pair (k1, k2)"""
+    slow = np.exp(-np.outer(rates[:, 0], t))
+    fast = np.exp(-np.outer(rates[:, 1], t))
+    return np.stack((np.ones_like(slow), slow, fast), axis=1)
+
+
+def _oscillation_bases(t: np.ndarray, params: np.ndarray) -> np.ndarray:
+    """[1, exp(-a t) cos(w t), exp(-a t) sin(w t)] for each (a, w)"""
+    envelope = np.exp(-np.outer(params[:, 0], t))
+    phase = np.outer(params[:, 1], t)
+    return np.stack((np.ones_like(envelope), envelope * np.cos(phase), envelope * np.sin(phase)), axis=1)
+
+
+def _grid_search(make_bases: Callable[[np.ndarray, np.ndarray], np.ndarray], t: np.ndarray, y: np.ndarray,
+                 axes: List[np.ndarray], geometric: List[bool],
+                 valid: Optional[Callable[[np.ndarray], np.ndarray]] = None) -> np.ndarray:
+    """
+    Find the nonlinear parameters with the smallest residual by zooming grids
+
+    Every pass evaluates the whole grid at once, then narrows each axis to
+    one grid step around the best candidate.
+
+    Args:
+        make_bases: Builds the (K, m, n) bases for K parameter rows
+        t, y: Normalized time and values to fit
+        axes: Initial candidate values of each parameter
+        geometric: Per axis, whether it is zoomed on a log scale
+        valid: Optional mask of acceptable parameter rows
+
+    Returns:
+        Best parameter row
+    """
+    best = None
+    for _ in range(_REFINE_PASSES):
+        grid = np.stack([axis.ravel() for axis in np.meshgrid(*axes, indexing='ij')], axis=1)
+        _, sse = _solve_bases(make_bases(t, grid), y)
+        if valid is not None:
+            sse = np.where(valid(grid), sse, np.inf)
+        best = grid[int(np.argmin(sse))]
+
+        zoomed = []
+        for axis, value, log_scale in zip(axes, best, geometric):
+            count = len(axis)
+            if log_scale:
+                step = (axis[-1] / axis[0]) ** (1 / (count - 1))
+                zoomed.append(np.geomspace(value / step, value * step, count))
+            else:
+                step = (axis[-1] - axis[0]) / (count - 1)
+                zoomed.append(np.linspace(max(value - step, 1e-9), value + step, count))
+        axes = zoomed
+    return best
+
+
+def _residual_stats(y: np.ndarray, fitted: np.ndarray) -> dict:
+    residual = y - fitted
+    total = float(np.sum((y - y.mean()) ** 2))
+    sse = float(residual @ residual)
+    return {
+        'residual_rms': math.sqrt(sse / len(y)),
+        'residual_max': float(np.max(np.abs(residual))),
+        'r_squared': 1.0 - sse / total if total > 0 else 0.0
+    }
+
+
+# ====== Models ======
+
+def fit_exponential(t: np.ndarray, y: np.ndarray) -> dict:
+    """
+    Fit y = final + (initial - final) exp(-t / tau)
+
+    Args:
+        t: Times in seconds from the start of the window
+        y: Values
+
+    Returns:
+        Dictionary with model, time_constant_s, initial_value, final_value
+        and the residual statistics
+    """
+    span = t[-1] if t[-1] > 0 else 1.0
+    tn = t / span
+    stride = max(1, len(t) // _SEARCH_POINTS)
+    rate, = _grid_search(
+        _exponential_bases, tn[::stride], y[::stride],
+        [np.geomspace(*_RATE_RANGE, _GRID_1D)], [True]
+    )
+    bases = _exponential_bases(tn, np.array([rate]))
+    (coefficients,), _ = _solve_bases(bases, y)
+    fitted = coefficients @ bases[0]
+    return {
+        'model': 'exponential',
+        'time_constant_s': span / rate,
+        'initial_value': float(coefficients[0] + coefficients[1]),
+        'final_value': float(coefficients[0]),
+        **_residual_stats(y, fitted)
+    }
+
+
+def fit_double_exponential(t: np.ndarray, y: np.ndarray) -> dict:
+    """
+    Fit y = final + b1 exp(-t / tau1) + b2 exp(-t / tau2), tau1 > tau2 (overdamped RLC)
+
+    Returns:
+        Dictionary with model, time_constants_s, initial_value, final_value
+        and the residual statistics
+    """
+    span = t[-1] if t[-1] > 0 else 1.0
+    tn = t / span
+    stride = max(1, len(t) // _SEARCH_POINTS)
+    rates = np.geomspace(*_RATE_RANGE, _GRID_2D)
+    slow, fast = _grid_search(
+        _double_exponential_bases, tn[::stride], y[::stride],
+        [rates, rates], [True, True],
+        valid=lambda grid: grid[:, 0] < grid[:, 1]
+    )
+    bases = _double_exponential_bases(tn, np.array([[slow, fast]]))
+    (coefficients,), _ = _solve_bases(bases, y)
+    fitted = coefficients @ bases[0]
+    return {
+        'model': 'double_exponential',
+        'time_constants_s': [span / slow, span / fast],
+        'initial_value': float(coefficients.sum()),
+        'final_value': float(coefficients[0]),
+        **_residual_stats(y, fitted)
+    }
+
+
+def _dominant_frequency(tn: np.ndarray, y: np.ndarray) -> Optional[float]:
+    """Angular frequency (1/normalized time) of the strongest oscillation, None if there is none"""
+    detrended = y - np.median(y[len(y) * 9 // 10:])
+    spectrum = np.abs(np.fft.rfft(detrended, n=len(y) * 4))
+    peak = int(np.argmax(spectrum[1:])) + 1
+    # A monotonic decay peaks at the lowest bins
+    if peak < 4 or spectrum[peak] < 1.5 * spectrum[1]:
+        return None
+    return 2 * math.pi * peak / (4 * len(y) * (tn[1] - tn[0]))
+
+
+def fit_damped_oscillation(t: np.ndarray, y: np.ndarray) -> Optional[dict]:
+    """
+    Fit y = final + exp(-alpha t) (b cos(wd t) + c sin(wd t)) (underdamped RLC)
+
+    Returns:
+        Dictionary with model, decay_rate_per_s (alpha), damped_frequency_hz,
+        initial_value, final_value and the residual statistics, or None
+        if y has no oscillation
+    """
+    span = t[-1] if t[-1] > 0 else 1.0
+    tn = t / span
+    omega = _dominant_frequency(tn, y)
+    if omega is None:
+        return None
+    stride = max(1, len(t) // _SEARCH_POINTS)
+    alpha, omega = _grid_search(
+        _oscillation_bases, tn[::stride], y[::stride],
+        [np.geomspace(*_RATE_RANGE, _GRID_2D), np.linspace(omega * 0.5, omega * 1.5, _GRID_2D)],
+        [True, False]
+    )
+    bases = _oscillation_bases(tn, np.array([[alpha, omega]]))
+    (coefficients,), _ = _solve_bases(bases, y)
+    fitted = coefficients @ bases[0]
+    return {
+        'model': 'damped_oscillation',
+        'decay_rate_per_s': alpha / span,
+        'damped_frequency_hz': omega / span / (2 * math.pi),
+        'initial_value': float(coefficients[0] + coefficients[1]),
+        'final_value': float(coefficients[0]),
+        **_residual_stats(y, fitted)
+    }
+
+
+def fit_channel(circuit: str, t: np.ndarray, y: np.ndarray) -> dict:
+    """
+    Fit the model of a circuit to one channel
+
+    RC and RL responses are single exponentials. RLC responses are fitted
+    as a damped oscillation and as two exponentials (overdamped); the one
+    with the smaller residual is kept.
+    """
+    if circuit != 'rlc':
+        return fit_exponential(t, y)
+    candidates = [fit_double_exponential(t, y)]
+    oscillation = fit_damped_oscillation(t, y)
+    if oscillation is not None:
+        candidates.append(oscillation)
+    return min(candidates, key=lambda fit: fit['residual_rms'])
+
+
+# ====== Circuit parameters ======
+
+def nominal_components(relays: List[str]) -> Dict[str, Optional[float]]:
+    """
+    Nominal series R, L and C of the loop formed by the given relays
+
+    Inductor winding resistance is part of R; capacitors are in parallel.
+
+    Returns:
+        Dictionary with resistance_ohm, inductance_h and capacitance_f
+        (None when no such component is switched in)
+    """
+    selected = set(relays)
+    inductors = [INDUCTORS[relay] for relay in INDUCTORS if relay in selected]
+    resistance = (
+        sum(value for relay, value in R1S_RESISTORS.items() if relay in selected)
+        + sum(value for relay, value in R2R_RESISTORS.items() if relay in selected)
+        + sum(winding for _, winding in inductors)
+    )
+    inductance = sum(value for value, _ in inductors)
+    capacitance = sum(value for relay, value in CAPACITORS.items() if relay in selected)
+    return {
+        'resistance_ohm': resistance or None,
+        'inductance_h': inductance or None,
+        'capacitance_f': capacitance or None
+    }
+
+
+def circuit_parameters(circuit: str, fit: dict, nominal: Dict[str, Optional[float]]) -> Tuple[dict, dict]:
+    """
+    Derive circuit quantities from a fit, and component estimates from
+    the fit combined with the nominal values of the other components
+
+    Returns:
+        Tuple of (parameters, estimates)
+    """
+    r = nominal['resistance_ohm']
+    l = nominal['inductance_h']
+    c = nominal['capacitance_f']
+    parameters: Dict[str, Optional[float]] = {}
+    estimates: Dict[str, Optional[float]] = {'resistance_ohm': None, 'inductance_h': None, 'capacitance_f': None}
+
+    if fit['model'] == 'exponential':
+        tau = fit['time_constant_s']
+        parameters['time_constant_s'] = tau
+        if circuit == 'rc':
+            # tau = R C
+            estimates['resistance_ohm'] = tau / c if c else None
+            estimates['capacitance_f'] = tau / r if r else None
+        else:
+            # tau = L / R
+            estimates['inductance_h'] = tau * r if r else None
+            estimates['resistance_ohm'] = l / tau if l else None
+        return parameters, estimates
+
+    if fit['model'] == 'damped_oscillation':
+        alpha = fit['decay_rate_per_s']
+        omega_d = 2 * math.pi * fit['damped_frequency_hz']
+        omega_0 = math.hypot(alpha, omega_d)
+        parameters['damped_frequency_hz'] = fit['damped_frequency_hz']
+    else:
+        tau_slow, tau_fast = fit['time_constants_s']
+        parameters['time_constants_s'] = [tau_slow, tau_fast]
+        # Roots -1/tau of s^2 + 2 alpha s + omega_0^2
+        alpha = (1 / tau_slow + 1 / tau_fast) / 2
+        omega_0 = 1 / math.sqrt(tau_slow * tau_fast)
+
+    parameters.update({
+        'decay_rate_per_s': alpha,
+        'resonant_frequency_hz': omega_0 / (2 * math.pi),
+        'damping_ratio': alpha / omega_0,
+        'quality_factor': omega_0 / (2 * alpha) if alpha > 0 else None
+    })
+    # omega_0^2 = 1 / (L C), 2 alpha = R / L
+    estimates['inductance_h'] = 1 / (omega_0 ** 2 * c) if c else None
+    estimates['capacitance_f'] = 1 / (omega_0 ** 2 * l) if l else None
+    estimates['resistance_ohm'] = 2 * alpha * l if l else None
+    return parameters, estimates
+
+
+# ====== Windowing ======
+
+def _switching_events(data: np.ndarray) -> np.ndarray:
+    """
+    Sample indices right after switching events (steps in any channel)
+
+    The channel with the largest sample-to-sample jump is used; jumps of
+    at least _EVENT_FRACTION of it count as events. Noise-only data has none.
+    """
+    best_jumps = None
+    best_height = 0.0
+    for channel in range(data.shape[0]):
+        jumps = np.abs(np.diff(np.asarray(data[channel], dtype=np.float32)))
+        if len(jumps) == 0:
+            return np.empty(0, dtype=np.int64)
+        height = float(jumps.max())
+        if height > best_height:
+            best_jumps, best_height = jumps, height
+    if best_jumps is None or best_height < 10 * float(np.median(best_jumps)) or best_height < MIN_SWING:
+        return np.empty(0, dtype=np.int64)
+    return np.flatnonzero(best_jumps >= _EVENT_FRACTION * best_height) + 1
+
+
+def find_window(data: np.ndarray, trigger: Optional[dict] = None, start: Optional[int] = None,
+                length: Optional[int] = None) -> Tuple[int, int]:
+    """
+    Choose the samples holding the transient
+
+    The window starts at the given start, else at the first switching event
+    at or after the run's trigger sample, else at the trigger sample (or 0).
+    Without a given length it ends at the next switching event (e.g. power
+    off) and is then cut to a few settling times of the slowest channel.
+
+    Returns:
+        Tuple of (start, stop) sample indices
+    """
+    total = data.shape[1]
+    events = _switching_events(data) if start is None or length is None else np.empty(0, dtype=np.int64)
+
+    if start is None:
+        earliest = 0
+        if trigger and trigger.get('sample_index') is not None:
+            earliest = max(0, trigger['sample_index'] - (trigger.get('uncertainty_samples') or 0))
+        after = events[events >= earliest]
+        start = int(after[0]) if len(after) else ((trigger or {}).get('sample_index') or 0)
+    start = min(max(0, start), total)
+
+    if length is not None:
+        return start, min(total, start + length)
+
+    later = events[events > start + 2]
+    stop = int(later[0]) if len(later) else total
+
+    # Cut a long steady tail: the transient must settle within the window
+    settle = 0
+    for channel in range(data.shape[0]):
+        y = np.asarray(data[channel, start:stop], dtype=np.float64)
+        if len(y) < _MIN_WINDOW:
+            return start, stop
+        final = float(np.median(y[len(y) * 9 // 10:]))
+        swing = float(np.max(np.abs(y - final)))
+        if swing < MIN_SWING:
+            continue
+        outside = np.flatnonzero(np.abs(y - final) > _SETTLE_BAND * swing)
+        if len(outside):
+            settle = max(settle, int(outside[-1]))
+    return start, min(stop, start + max(_MIN_WINDOW, _SETTLE_MARGIN * settle))
+
+
+def _block_average(y: np.ndarray, block: int) -> np.ndarray:
+    usable = len(y) // block * block
+    return y[:usable].reshape(-1, block).mean(axis=1)
+
+
+# ====== Entry point ======
+
+def analyze_run(runs_root: str, meta: dict, circuit: str, start: Optional[int] = None,
+                length: Optional[int] = None) -> dict:
+    """
+    Fit the circuit's transient model to every channel of a stored run
+
+    Runs in a worker process (see AnalysisService): it opens the run from
+    disk itself and only loads the analysis window.
+
+    Args:
+        runs_root: Directory of the run store
+        meta: Run metadata
+        circuit: 'rc', 'rl' or 'rlc'
+        start: First sample of the transient (default: detected)
+        length: Samples to analyze (default: detected)
+
+    Returns:
+        Dictionary with window, channels (fit per channel), fit_channel,
+        parameters, nominal components and component estimates
+
+    Raises:
+        ValueError: If the circuit is unknown or no channel has a transient
+    """
+    if circuit not in CIRCUITS:
+        raise ValueError(f"Invalid circuit '{circuit}'. Must be one of: {', '.join(CIRCUITS)}")
+    started = time.perf_counter()
+    config = meta.get('configuration') or {}
+    sample_rate = config.get('sample_rate') or 0
+    if sample_rate <= 0:
+        raise ValueError("Run has no sample rate")
+
+    data = RunStore(Path(runs_root)).open_samples(meta['run_id'])
+    window_start, window_stop = find_window(data, config.get('trigger'), start, length)
+    samples = window_stop - window_start
+    if samples < 10:
+        raise ValueError(f"Analysis window has only {samples} samples")
+
+    # Block-average long windows; each point sits at the center of its block
+    block = max(1, math.ceil(samples / MAX_FIT_POINTS))
+    points = samples // block
+    t = (np.arange(points) * block + (block - 1) / 2) / sample_rate
+
+    channels = {}
+    for index, name in enumerate(CHANNEL_NAMES[:data.shape[0]]):
+        y = _block_average(np.asarray(data[index, window_start:window_start + points * block], dtype=np.float64), block)
+        swing = float(y.max() - y.min())
+        if swing < MIN_SWING:
+            channels[name] = None
+            continue
+        channels[name] = fit_channel(circuit, t, y)
+        channels[name]['swing'] = swing
+
+    fitted = {name: fit for name, fit in channels.items() if fit is not None}
+    if not fitted:
+        raise ValueError(f"No channel changes by more than {MIN_SWING} V in the analysis window")
+
+    # Parameters come from the channel the model describes best
+    best = max(fitted, key=lambda name: fitted[name]['r_squared'])
+    nominal = nominal_components(meta.get('relays_at_start') or [])
+    parameters, estimates = circuit_parameters(circuit, fitted[best], nominal)
+
+    return {
+        'run_id': meta['run_id'],
+        'circuit': circuit,
+        'window': {
+            'start': window_start,
+            'length': samples,
+            'points': points,
+            'block': block,
+            'sample_rate': sample_rate
+        },
+        'channels': channels,
+        'fit_channel': best,
+        'model': fitted[best]['model'],
+        'parameters': parameters,
+        'nominal': nominal,
+        'estimates': estimates,
+        'duration_ms': (time.perf_counter() - started) * 1000
+    }
@@ -0,0 +1,72 @@
+"""
+Analysis Service
+Runs transient fits of stored runs in a process pool, off the API process
+"""
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Optional
+from app.core.config import settings
+from app.services.analysis import CIRCUITS, analyze_run
+from app.services.run_store import run_store
+
+
+class AnalysisService:
+    """
+    Submits run analyses to worker processes
+
+    Fitting a multi-million-sample run is CPU-bound numpy work; in worker
+    processes it neither holds the API process's GIL nor blocks the
+    hardware thread. Workers are started on first use with 'spawn', so
+    they don't inherit the hardware and logging threads.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = max(1, workers)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._executor
+
+    def submit(self, run_id: str, circuit: Optional[str] = None, start: Optional[int] = None,
+               length: Optional[int] = None) -> Future:
+        """
+        Queue the analysis of a stored run
+
+        Args:
+            run_id: Run ID
+            circuit: 'rc', 'rl' or 'rlc' (default: the circuit stored with the run)
+            start: First sample of the transient (default: detected)
+            length: Samples to analyze (default: detected)
+
+        Returns:
+            Future of the analysis result (see analysis.analyze_run)
+
+        Raises:
+            KeyError: If the run does not exist
+            ValueError: If the circuit is unknown and not stored with the run
+        """
+        meta = run_store.get_metadata(run_id)
+        circuit = circuit or (meta.get('configuration') or {}).get('circuit')
+        if circuit not in CIRCUITS:
+            raise ValueError(
+                f"Circuit of run {run_id} is unknown. Pass one of: {', '.join(CIRCUITS)}"
+            )
+        return self._get_executor().submit(analyze_run, str(run_store.root), meta, circuit, start, length)
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+analysis_service = AnalysisService(settings.analysis_workers)
@@ -0,0 +1,244 @@
+"""
+Broadcast Service
+Fans out one hardware stream to any number of WebSocket subscribers
+"""
+import asyncio
+from typing import List, Optional, Set
+from app.core.logging_config import get_logger, log_fields
+from app.services.acquisition_service import acquisition_service
+from app.services.hardware_executor import run_on_hardware
+from app.services.stream_buffer import StreamBlock
+
+logger = get_logger(__name__)
+
+
+class Subscription:
+    """
+    A single consumer of the shared stream
+
+    Each subscription has its own bounded queue. When the queue is full the
+    configured slow-consumer policy applies:
+    - 'drop_oldest': discard the oldest queued block and count it as dropped
+    - 'disconnect': mark the subscription as overflowed so the client is closed
+    """
+
+    POLICIES = ('drop_oldest', 'disconnect')
+
+    def __init__(
+        self,
+        sample_rate: int,
+        decimation: int = 1,
+        queue_size: int = 32,
+        policy: str = 'drop_oldest'
+    ):
+        if policy not in self.POLICIES:
+            raise ValueError(f"Invalid policy '{policy}'. Must be one of: {', '.join(self.POLICIES)}")
+
+        self.sample_rate = sample_rate  # hardware stream rate
+        self.decimation = max(1, decimation)
+        self.policy = policy
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self.overflowed = False
+        self.error: Optional[str] = None
+        # Offset of the next kept sample inside the next block, so decimation
+        # stays evenly spaced across block boundaries
+        self._phase = 0
+
+    def offer(self, block: StreamBlock):
+        """Queue a block for this subscriber, applying decimation and the overflow policy"""
+        if self.overflowed:
+            return
+
+        if self.decimation > 1:
+            block = self._decimate(block)
+            if block.data.shape[1] == 0:
+                return
+
+        if self.queue.full():
+            if self.policy == 'disconnect':
+                self.overflowed = True
+                return
+            try:
+                self.queue.get_nowait()
+                self.dropped += 1
+            except asyncio.QueueEmpty:
+                pass
+
+        self.queue.put_nowait(block)
+
+    def _decimate(self, block: StreamBlock) -> StreamBlock:
+        """Keep every N-th sample, continuing the pattern from the previous block"""
+        k = self.decimation
+        start = self._phase
+        self._phase = (start - block.data.shape[1]) % k
+        return StreamBlock(
+            block.seq,
+            block.first_sample + start,
+            block.timestamp,
+            block.data[:, start::k]
+        )
+
+
+class BroadcastHub:
+    """
+    Single producer, many consumers
+
+    The first subscriber starts the hardware stream, the last one to leave
+    stops it. One producer task reads the acquisition ring buffer and hands
+    every block to all subscriptions, so the device is read once no matter
+    how many dashboards are connected.
+    """
+
+    def __init__(self, queue_size: int = 32):
+        self.queue_size = queue_size
+        self._subscribers: Set[Subscription] = set()
+        self._producer: Optional[asyncio.Task] = None
+        self._config: Optional[dict] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _get_lock(self) -> asyncio.Lock:
+        # Created lazily so it binds to the running event loop
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    @property
+    def config(self) -> Optional[dict]:
+        """Configuration of the running hardware stream, or None"""
+        return self._config.copy() if self._config else None
+
+    @property
+    def subscriber_count(self) -> int:
+        """Number of currently subscribed clients"""
+        return len(self._subscribers)
+
+    async def subscribe(
+        self,
+        sample_rate: int = 100,
+        interval: float = 0.1,
+        policy: str = 'drop_oldest'
+    ) -> Subscription:
+        """
+        Subscribe to the shared stream
+
+        If the stream is not running yet it is started with the requested
+        sample rate and block interval. Otherwise the subscriber joins the
+        running stream and receives it decimated to approximately the
+        requested sample rate.
+
+        Args:
+            sample_rate: Desired sampling rate for this client in Hz
+            interval: Block duration in seconds (only used when starting)
+            policy: Slow-consumer policy ('drop_oldest' or 'disconnect')
+
+        Returns:
+            New subscription
+
+        Raises:
+            RuntimeError: If the hardware stream cannot be started
+            ValueError: If the policy is invalid
+        """
+        async with self._get_lock():
+            if self._config is None:
+                block_size = max(1, int(sample_rate * interval))
+                self._config = await run_on_hardware(
+                    acquisition_service.start_stream, sample_rate, block_size
+                )
+                self._producer = asyncio.create_task(self._produce())
+
+            hub_rate = self._config['sample_rate']
+            decimation = max(1, round(hub_rate / sample_rate)) if sample_rate > 0 else 1
+            subscription = Subscription(
+                sample_rate=hub_rate,
+                decimation=decimation,
+                queue_size=self.queue_size,
+                policy=policy
+            )
+            self._subscribers.add(subscription)
+            return subscription
+
+    async def unsubscribe(self, subscription: Subscription):
+        """Remove a subscription and stop the hardware stream if it was the last one"""
+        async with self._get_lock():
+            self._subscribers.discard(subscription)
+            if self._subscribers or self._config is None:
+                return
+
+            producer = self._producer
+            self._producer = None
+            self._config = None
+
+            if producer is not None:
+                producer.cancel()
+                try:
+                    await producer
+                except (asyncio.CancelledError, Exception):
+                    pass
+
+            await run_on_hardware(acquisition_service.stop_stream)
+
+    async def _produce(self):
+        """Read blocks from the acquisition ring buffer and fan them out"""
+        loop = asyncio.get_running_loop()
+        # The ring buffer is reset when the stream starts, so begin at block 0
+        seq = 0
+
+        try:
+            while True:
+                blocks, seq, dropped = await loop.run_in_executor(
+                    None, acquisition_service.read_stream_blocks, seq, 0.5
+                )
+                if dropped:
+                    for subscription in list(self._subscribers):
+                        subscription.dropped += dropped
+
+                for block in blocks:
+                    for subscription in list(self._subscribers):
+                        subscription.offer(block)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("Stream producer stopped", extra=log_fields(error=str(e)))
+            # Under the lock, so a new subscriber can't start a stream that
+            # the stop below would end
+            async with self._get_lock():
+                self._producer = None
+                self._config = None
+                # The failed subscriptions are detached: the next subscriber
+                # starts a new stream and the last one to leave stops it
+                failed = list(self._subscribers)
+                self._subscribers.clear()
+                await run_on_hardware(acquisition_service.stop_stream)
+            for subscription in failed:
+                subscription.error = f"Error reading data: {str(e)}"
+                # Wake up the consumer so it notices the stream has ended
+                try:
+                    subscription.queue.put_nowait(None)
+                except asyncio.QueueFull:
+                    pass
+
+    def get_status(self) -> dict:
+        """
+        Get hub status
+
+        Returns:
+            Dictionary with stream configuration and per-subscriber queue figures
+        """
+        subscribers: List[dict] = [
+            {
+                'decimation': s.decimation,
+                'policy': s.policy,
+                'queued': s.queue.qsize(),
+                'dropped': s.dropped
+            }
+            for s in self._subscribers
+        ]
+        return {
+            'running': self._config is not None,
+            'configuration': self.config,
+            'subscribers': subscribers
+        }
+
+
+broadcast_hub = BroadcastHub()
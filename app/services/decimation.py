@@ -0,0 +1,141 @@
+"""
+Decimation
+Reduce multi-channel sample arrays to a target point count for plotting
+"""
+from typing import Tuple
+
+import numpy as np
+
+DECIMATION_METHODS = ('lttb', 'minmax')
+
+# Samples per channel processed at once when scanning large (memory-mapped) data
+_CHUNK_SAMPLES = 1 << 20
+
+
+def _take(data: np.ndarray, indices: np.ndarray) -> np.ndarray:
+    """Gather values at per-channel indices without materializing the whole array"""
+    return np.stack([np.asarray(data[c])[indices[c]] for c in range(data.shape[0])])
+
+
+def minmax_decimate(data: np.ndarray, points: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Keep the minimum and maximum of every bucket
+
+    The signal is split into points // 2 equal buckets; for each bucket the
+    samples holding the minimum and the maximum are kept in their original
+    order, so peaks and spikes survive decimation.
+
+    Args:
+        data: Array of shape (channels, samples)
+        points: Target number of points per channel
+
+    Returns:
+        Tuple of (indices, values), both of shape (channels, points_out)
+    """
+    channels, n = data.shape
+    if n <= points:
+        indices = np.broadcast_to(np.arange(n), (channels, n))
+        return np.array(indices), np.array(data, dtype=np.float64)
+
+    buckets = max(1, points // 2)
+    size = -(-n // buckets)  # ceil division
+    full = n // size
+
+    # Work through whole buckets a slice at a time so memory-mapped runs are
+    # never loaded into memory as a whole
+    step = max(1, _CHUNK_SAMPLES // size) * size
+    imin_parts, imax_parts = [], []
+    for start in range(0, full * size, step):
+        stop = min(start + step, full * size)
+        grouped = np.asarray(data[:, start:stop]).reshape(channels, -1, size)
+        offsets = start + np.arange(grouped.shape[1]) * size
+        imin_parts.append(grouped.argmin(axis=2) + offsets)
+        imax_parts.append(grouped.argmax(axis=2) + offsets)
+
+    # Shorter last bucket with the samples that don't fill a whole one
+    if n % size:
+        tail = np.asarray(data[:, full * size:])
+        imin_parts.append(tail.argmin(axis=1)[:, None] + full * size)
+        imax_parts.append(tail.argmax(axis=1)[:, None] + full * size)
+
+    imin = np.concatenate(imin_parts, axis=1)
+    imax = np.concatenate(imax_parts, axis=1)
+    indices = np.sort(np.stack([imin, imax], axis=2), axis=2).reshape(channels, -1)
+    return indices, _take(data, indices)
+
+
+def lttb_decimate(data: np.ndarray, points: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Largest-Triangle-Three-Buckets downsampling
+
+    Keeps the first and last sample and, from each of the points - 2 buckets
+    in between, the sample forming the largest triangle with the previously
+    kept sample and the average of the next bucket. The bucket loop is
+    sequential by nature; the work inside each bucket is vectorized across
+    samples and channels.
+
+    Args:
+        data: Array of shape (channels, samples)
+        points: Target number of points per channel (>= 3)
+
+    Returns:
+        Tuple of (indices, values), both of shape (channels, points)
+    """
+    channels, n = data.shape
+    if n <= points or points < 3:
+        indices = np.broadcast_to(np.arange(n), (channels, n))
+        return np.array(indices), np.array(data, dtype=np.float64)
+
+    rows = np.arange(channels)
+    indices = np.empty((channels, points), dtype=np.int64)
+    indices[:, 0] = 0
+    indices[:, -1] = n - 1
+
+    # Bucket boundaries over the samples between the first and the last one
+    edges = (np.arange(points - 1) * ((n - 2) / (points - 2))).astype(np.int64) + 1
+    edges[-1] = n - 1
+
+    selected = np.zeros(channels, dtype=np.int64)
+    for i in range(points - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start = end
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+
+        avg_x = (next_start + next_end - 1) / 2.0
+        avg_y = data[:, next_start:next_end].mean(axis=1)
+
+        ax = selected.astype(np.float64)
+        ay = data[rows, selected]
+        x = np.arange(start, end, dtype=np.float64)
+        y = data[:, start:end]
+
+        area = np.abs(
+            (ax - avg_x)[:, None] * (y - ay[:, None])
+            - (ax[:, None] - x[None, :]) * (avg_y - ay)[:, None]
+        )
+        selected = start + area.argmax(axis=1)
+        indices[:, i + 1] = selected
+
+    return indices, _take(data, indices)
+
+
+def decimate(data: np.ndarray, method: str, points: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Decimate multi-channel data with the given method
+
+    Args:
+        data: Array of shape (channels, samples)
+        method: 'lttb' or 'minmax'
+        points: Target number of points per channel
+
+    Returns:
+        Tuple of (indices, values), both of shape (channels, points_out)
+
+    Raises:
+        ValueError: If the method is unknown
+    """
+    if method == 'lttb':
+        return lttb_decimate(data, points)
+    if method == 'minmax':
+        return minmax_decimate(data, points)
+    raise ValueError(f"Invalid decimation method '{method}'. Must be one of: {', '.join(DECIMATION_METHODS)}")
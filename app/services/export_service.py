@@ -0,0 +1,306 @@
+"""
+Run Export Service
+Generates CSV / NPY / Parquet / HDF5 files from stored runs in chunks
+"""
+import csv
+import io
+import tempfile
+from typing import Iterator
+
+import numpy as np
+from app.services.run_store import run_store
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'npy': ('application/octet-stream', 'npy'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+    'hdf5': ('application/x-hdf5', 'h5'),
+}
+
+# Parquet/HDF5 exports up to this size are built in memory, larger ones in a temporary file
+_SPOOL_MAX_BYTES = 16 * 1024 * 1024
+
+CIRCUIT_DESCRIPTIONS = {
+    'rl': 'Series RL Circuit (Inductor + Resistor)',
+    'rc': 'Series RC Circuit (Capacitor + Resistor)',
+    'rlc': 'Series RLC Circuit (Inductor + Capacitor + Resistor)',
+}
+
+PARAMETER_LABELS = {
+    'inductance': 'Inductance (Ls)',
+    'capacitance': 'Capacitance (Cs)',
+    'resistance': 'Resistance',
+    'discharge_resistor': 'Discharge Resistor (Rz)',
+}
+
+CHANNEL_NAMES = ['ADC1', 'ADC2', 'ADC3', 'ADC4']
+
+
+class ExportDependencyError(RuntimeError):
+    """Raised when an export format needs an optional package that is not installed"""
+
+
+def _csv_line(*values) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator='\n').writerow(values)
+    return buffer.getvalue()
+
+
+def csv_header(meta: dict) -> str:
+    """
+    Build the METADATA and PARAMETERS sections of a CSV export
+
+    Mirrors the layout of the dashboard's client-side CSV export.
+
+    Args:
+        meta: Run metadata
+
+    Returns:
+        Header text including the MEASUREMENT DATA column headers
+    """
+    config = meta.get('configuration') or {}
+    sample_rate = config.get('sample_rate', 0)
+    samples = meta.get('samples', 0)
+    circuit = (config.get('circuit') or '').lower()
+    parameters = config.get('parameters') or {}
+    channels = meta.get('channels', 4)
+
+    text = '=== METADATA ===\n'
+    text += _csv_line('Run ID', meta.get('run_id', ''))
+    text += _csv_line('Circuit', circuit.upper() or 'Unknown')
+    text += _csv_line('Circuit Description', CIRCUIT_DESCRIPTIONS.get(circuit, 'Unknown Circuit'))
+    text += _csv_line('Timestamp', config.get('started_at', ''))
+    text += _csv_line('Samples per Channel', samples)
+    text += _csv_line('Sample Rate', f"{sample_rate} Hz")
+    text += _csv_line('Measurement Time', f"{samples / sample_rate if sample_rate else 0:g} s")
+    text += _csv_line('Enabled Relays', ' '.join(meta.get('relays_at_start') or []))
+    text += '\n'
+
+    text += '=== PARAMETERS ===\n'
+    parameters = {'discharge_resistor': 'Not used', **parameters}
+    for key, label in PARAMETER_LABELS.items():
+        if parameters.get(key):
+            text += _csv_line(label, parameters[key].replace('Ω', 'ohm').replace('μ', 'u'))
+    text += '\n'
+
+    text += '=== MEASUREMENT DATA ===\n'
+    text += _csv_line('Time', 'Sample', *CHANNEL_NAMES[:channels])
+    text += _csv_line('(s)', 'Index', *(['V'] * channels))
+    return text
+
+
+def iter_csv(run_id: str, chunk_samples: int = 50000) -> Iterator[bytes]:
+    """
+    Stream a run as CSV
+
+    Args:
+        run_id: Run ID
+        chunk_samples: Rows formatted per chunk
+
+    Yields:
+        Encoded chunks of the CSV file
+
+    Raises:
+        KeyError: If the run does not exist
+    """
+    meta = run_store.get_metadata(run_id)
+    data = run_store.open_samples(run_id)
+    sample_rate = (meta.get('configuration') or {}).get('sample_rate', 0) or 1
+
+    yield csv_header(meta).encode('utf-8')
+
+    channels, total = data.shape
+    fmt = ['%.6f', '%d'] + ['%.6g'] * channels
+    for start in range(0, total, chunk_samples):
+        stop = min(start + chunk_samples, total)
+        index = np.arange(start, stop)
+        rows = np.column_stack([index / sample_rate, index, np.asarray(data[:, start:stop]).T])
+        buffer = io.StringIO()
+        np.savetxt(buffer, rows, fmt=fmt, delimiter=',')
+        yield buffer.getvalue().encode('utf-8')
+
+
+def iter_npy(run_id: str, chunk_samples: int = 262144) -> Iterator[bytes]:
+    """
+    Stream a run as a .npy file of shape (samples, channels)
+
+    Args:
+        run_id: Run ID
+        chunk_samples: Samples per channel per chunk
+
+    Yields:
+        Chunks of the .npy file
+
+    Raises:
+        KeyError: If the run does not exist
+    """
+    data = run_store.open_samples(run_id)
+    channels, total = data.shape
+
+    header = io.BytesIO()
+    np.lib.format.write_array_header_1_0(header, {
+        'descr': np.lib.format.dtype_to_descr(data.dtype),
+        'fortran_order': False,
+        'shape': (total, channels),
+    })
+    yield header.getvalue()
+
+    # Sample-major order; for run files this is the on-disk layout already
+    for start in range(0, total, chunk_samples):
+        stop = min(start + chunk_samples, total)
+        yield np.ascontiguousarray(data[:, start:stop].T).tobytes()
+
+
+def _spooled_file() -> tempfile.SpooledTemporaryFile:
+    """
+    Scratch file for formats that must be written before they can be streamed
+
+    Small exports stay in memory; larger ones roll over to an anonymous
+    temporary file, which the OS removes as soon as it is closed or
+    garbage-collected, even if the response is never sent.
+    """
+    return tempfile.SpooledTemporaryFile(max_size=_SPOOL_MAX_BYTES)
+
+
+def _iter_file(f, chunk_bytes: int = 1 << 20) -> Iterator[bytes]:
+    """Stream a scratch file from the start and close it afterwards"""
+    try:
+        f.seek(0)
+        while True:
+            chunk = f.read(chunk_bytes)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        f.close()
+
+
+def iter_parquet(run_id: str, chunk_samples: int = 262144) -> Iterator[bytes]:
+    """
+    Stream a run as Parquet (one row group per chunk)
+
+    Parquet needs a seekable file for its footer, so the file is built in a
+    scratch file chunk by chunk and then streamed.
+
+    Raises:
+        KeyError: If the run does not exist
+        ExportDependencyError: If pyarrow is not installed
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ExportDependencyError("Parquet export requires the 'pyarrow' package")
+
+    meta = run_store.get_metadata(run_id)
+    data = run_store.open_samples(run_id)
+    sample_rate = (meta.get('configuration') or {}).get('sample_rate', 0) or 1
+    channels, total = data.shape
+    names = ['time', 'sample'] + [name.lower() for name in CHANNEL_NAMES[:channels]]
+
+    f = _spooled_file()
+    try:
+        schema = pa.schema(
+            [('time', pa.float64()), ('sample', pa.int64())]
+            + [(name, pa.from_numpy_dtype(data.dtype)) for name in names[2:]],
+            metadata={'run_id': run_id, 'sample_rate': str(sample_rate)}
+        )
+        with pq.ParquetWriter(f, schema) as writer:
+            for start in range(0, total, chunk_samples):
+                stop = min(start + chunk_samples, total)
+                index = np.arange(start, stop)
+                columns = [index / sample_rate, index] + [np.asarray(data[c, start:stop]) for c in range(channels)]
+                writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+    except Exception:
+        f.close()
+        raise
+
+    yield from _iter_file(f)
+
+
+def iter_hdf5(run_id: str, chunk_samples: int = 262144) -> Iterator[bytes]:
+    """
+    Stream a run as HDF5 (dataset 'samples' of shape (samples, channels))
+
+    HDF5 needs a seekable file, so the file is built in a scratch file
+    chunk by chunk and then streamed. Run metadata is stored as attributes.
+
+    Raises:
+        KeyError: If the run does not exist
+        ExportDependencyError: If h5py is not installed
+    """
+    try:
+        import h5py
+    except ImportError:
+        raise ExportDependencyError("HDF5 export requires the 'h5py' package")
+
+    meta = run_store.get_metadata(run_id)
+    data = run_store.open_samples(run_id)
+    config = meta.get('configuration') or {}
+    channels, total = data.shape
+
+    f = _spooled_file()
+    try:
+        with h5py.File(f, 'w') as h5:
+            dataset = h5.create_dataset(
+                'samples',
+                shape=(total, channels),
+                dtype=data.dtype,
+                chunks=(min(max(total, 1), 65536), channels)
+            )
+            for start in range(0, total, chunk_samples):
+                stop = min(start + chunk_samples, total)
+                dataset[start:stop] = np.asarray(data[:, start:stop]).T
+            dataset.attrs['channels'] = CHANNEL_NAMES[:channels]
+            h5.attrs['run_id'] = run_id
+            h5.attrs['sample_rate'] = config.get('sample_rate', 0)
+            h5.attrs['started_at'] = config.get('started_at', '')
+            h5.attrs['circuit'] = config.get('circuit') or ''
+            h5.attrs['relays_at_start'] = ' '.join(meta.get('relays_at_start') or [])
+    except Exception:
+        f.close()
+        raise
+
+    yield from _iter_file(f)
+
+
+def export_run(run_id: str, export_format: str) -> Iterator[bytes]:
+    """
+    Get a chunk generator for exporting a run
+
+    The run is validated and optional dependencies are checked before the
+    first chunk is produced, so errors can still be reported as HTTP errors.
+
+    Args:
+        run_id: Run ID
+        export_format: 'csv', 'npy', 'parquet' or 'hdf5'
+
+    Returns:
+        Iterator over the file's bytes
+
+    Raises:
+        KeyError: If the run does not exist
+        ValueError: If the format is unknown
+        ExportDependencyError: If the format needs a package that is missing
+    """
+    run_store.get_metadata(run_id)
+
+    if export_format == 'csv':
+        return iter_csv(run_id)
+    if export_format == 'npy':
+        return iter_npy(run_id)
+    if export_format == 'parquet':
+        generator = iter_parquet(run_id)
+    elif export_format == 'hdf5':
+        generator = iter_hdf5(run_id)
+    else:
+        raise ValueError(f"Invalid export format '{export_format}'. Must be one of: {', '.join(EXPORT_FORMATS)}")
+
+    # Build the scratch file now so dependency errors surface before streaming
+    first = next(generator, b'')
+
+    def chained() -> Iterator[bytes]:
+        yield first
+        yield from generator
+
+    return chained()
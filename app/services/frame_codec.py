@@ -0,0 +1,80 @@
+"""
+Binary Frame Codec
+Packs ADC sample blocks into compact binary WebSocket frames
+
+Frame layout (little-endian):
+
+    offset  size  field
+    0       4     magic b'NIDQ'
+    4       1     version (1)
+    5       1     encoding (0 = float32, 1 = int16 scaled)
+    6       2     channel count
+    8       4     sequence number
+    12      4     samples per channel
+    16      8     t0 - time of the first sample in seconds (float64)
+    24      8     dt - time between samples in seconds (float64)
+    32      4     scale - volts per LSB for int16, 1.0 for float32 (float32)
+    36      ...   channel-interleaved samples (s0c0, s0c1, ..., s1c0, ...)
+
+The header is 36 bytes so the payload stays 4-byte aligned and can be viewed
+directly as a Float32Array / Int16Array in the browser.
+"""
+import struct
+
+import numpy as np
+
+FRAME_MAGIC = b'NIDQ'
+FRAME_VERSION = 1
+
+ENCODINGS = {
+    'float32': 0,
+    'int16': 1,
+}
+
+_HEADER = struct.Struct('<4sBBHIIddf')
+HEADER_SIZE = _HEADER.size
+
+
+def encode_frame(
+    seq: int,
+    t0: float,
+    dt: float,
+    data: np.ndarray,
+    encoding: str = 'float32',
+    full_scale: float = 10.0
+) -> bytes:
+    """
+    Encode one block of samples as a binary frame
+
+    Args:
+        seq: Block sequence number
+        t0: Time of the first sample in seconds
+        dt: Time between samples in seconds
+        data: Array of shape (channels, samples)
+        encoding: 'float32' or 'int16' (scaled to +/- full_scale volts)
+        full_scale: Input range used for int16 scaling in volts
+
+    Returns:
+        Encoded frame
+
+    Raises:
+        ValueError: If the encoding is unknown
+    """
+    if encoding not in ENCODINGS:
+        raise ValueError(f"Invalid encoding '{encoding}'. Must be one of: {', '.join(ENCODINGS)}")
+
+    channels, samples = data.shape
+
+    # Transposing gives sample-major order, i.e. channel-interleaved
+    if encoding == 'int16':
+        scale = full_scale / 32767.0
+        payload = np.clip(np.rint(data.T / scale), -32767, 32767).astype('<i2')
+    else:
+        scale = 1.0
+        payload = np.ascontiguousarray(data.T, dtype='<f4')
+
+    header = _HEADER.pack(
+        FRAME_MAGIC, FRAME_VERSION, ENCODINGS[encoding],
+        channels, seq & 0xFFFFFFFF, samples, t0, dt, scale
+    )
+    return header + payload.tobytes()
@@ -0,0 +1,229 @@
+"""
+Hardware Executor
+Runs all blocking DAQmx calls on one dedicated worker thread, off the event loop
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Dict, List, Optional
+
+# Wait times remembered for the statistics
+_WAIT_HISTORY = 256
+
+
+class _WorkItem:
+    """A queued call and the futures waiting for it"""
+
+    __slots__ = ('func', 'args', 'kwargs', 'name', 'futures', 'enqueued_at', 'relay_states')
+
+    def __init__(self, func, args, kwargs, relay_states: Optional[dict] = None):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.name = getattr(func, '__name__', 'call')
+        self.futures: List[Future] = [Future()]
+        self.enqueued_at = time.perf_counter()
+        self.relay_states = relay_states
+
+
+class HardwareWorker:
+    """
+    Single thread that owns the device
+
+    Calls are executed one at a time in submission order, which serializes
+    access to the DAQ between concurrent requests. Relay writes queued
+    back to back are coalesced into one write: later states for the same
+    relay replace earlier ones and every caller gets the merged result.
+
+    Task creation, start, stop and close and all relay writes run here.
+    Reading a running analog input task (available, read) is the one
+    exception: each task is drained by its own reader (the adc-reader and
+    adc-capture threads, the DAQmx callback thread of the stream), since
+    queueing every block behind relay sequences and their waits would
+    overrun the DAQ buffer. DAQmx allows reading a task from another
+    thread; what must not happen is stopping or closing it mid-read, so
+    the worker only does that after the reader is done (the reader thread
+    is joined; the stream callback is waited for under its read lock).
+    """
+
+    def __init__(self, name: str = "daq-hardware"):
+        self.name = name
+        self._queue: 'deque[_WorkItem]' = deque()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self._current: Optional[str] = None
+
+        self.executed = 0
+        self.coalesced = 0
+        self.failed = 0
+        self._waits: 'deque[float]' = deque(maxlen=_WAIT_HISTORY)
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping = False
+            self._thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+            self._thread.start()
+
+    def submit(self, func, *args, **kwargs) -> Future:
+        """
+        Queue a call on the hardware thread
+
+        Args:
+            func: Blocking function to call
+            *args, **kwargs: Arguments for func
+
+        Returns:
+            Future of the call's result
+        """
+        item = _WorkItem(func, args, kwargs)
+        with self._cond:
+            if self._stopping:
+                raise RuntimeError("Hardware executor is shut down")
+            self._ensure_thread()
+            self._queue.append(item)
+            self._cond.notify()
+        return item.futures[0]
+
+    def submit_relay_write(self, write_func, relay_states: Dict[str, bool]) -> Future:
+        """
+        Queue a relay write, merging it into a relay write still waiting at
+        the end of the queue
+
+        Only the last queued item is merged with, so a write never moves
+        past another queued operation.
+
+        Args:
+            write_func: Function taking a {relay_name: state} dictionary
+            relay_states: Relay states to write
+
+        Returns:
+            Future of the (merged) write's result
+        """
+        with self._cond:
+            if self._stopping:
+                raise RuntimeError("Hardware executor is shut down")
+            tail = self._queue[-1] if self._queue else None
+            if tail is not None and tail.relay_states is not None and tail.func == write_func:
+                # Later state wins; keep the relay's first position in the write
+                tail.relay_states.update(relay_states)
+                future = Future()
+                tail.futures.append(future)
+                self.coalesced += 1
+                return future
+
+            states = dict(relay_states)
+            item = _WorkItem(write_func, (states,), {}, relay_states=states)
+            self._ensure_thread()
+            self._queue.append(item)
+            self._cond.notify()
+        return item.futures[0]
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._stopping:
+                    self._cond.wait()
+                if not self._queue:
+                    return
+                item = self._queue.popleft()
+                self._current = item.name
+
+            started = time.perf_counter()
+            futures = [future for future in item.futures if future.set_running_or_notify_cancel()]
+            try:
+                result = item.func(*item.args, **item.kwargs) if futures else None
+            except BaseException as e:
+                self.failed += 1
+                for future in futures:
+                    future.set_exception(e)
+            else:
+                for future in futures:
+                    future.set_result(result)
+            finally:
+                with self._cond:
+                    self._current = None
+                    self.executed += 1
+                    self._waits.append(started - item.enqueued_at)
+
+    def get_stats(self) -> dict:
+        """
+        Get queue statistics
+
+        Returns:
+            Dictionary with queue_depth, current (name of the running call),
+            executed, coalesced, failed and wait times in ms (last, avg, max
+            over the last calls)
+        """
+        with self._cond:
+            waits = list(self._waits)
+            return {
+                'queue_depth': len(self._queue),
+                'current': self._current,
+                'executed': self.executed,
+                'coalesced': self.coalesced,
+                'failed': self.failed,
+                'wait_ms_last': waits[-1] * 1000 if waits else 0.0,
+                'wait_ms_avg': sum(waits) / len(waits) * 1000 if waits else 0.0,
+                'wait_ms_max': max(waits) * 1000 if waits else 0.0
+            }
+
+    def shutdown(self, wait: bool = True):
+        """Finish queued calls and stop the hardware thread"""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+            thread = self._thread
+        if wait and thread is not None:
+            thread.join()
+
+
+hardware_worker = HardwareWorker()
+
+
+def submit(func, *args, **kwargs) -> Future:
+    """Queue a call on the hardware thread (see HardwareWorker.submit)"""
+    return hardware_worker.submit(func, *args, **kwargs)
+
+
+async def run_on_hardware(func, *args, **kwargs):
+    """
+    Run a blocking call on the hardware thread and await its result
+
+    The event loop keeps serving other requests and WebSockets meanwhile.
+
+    Args:
+        func: Blocking function to call
+        *args, **kwargs: Arguments for func
+
+    Returns:
+        The call's return value (its exception is re-raised)
+    """
+    return await asyncio.wrap_future(hardware_worker.submit(func, *args, **kwargs))
+
+
+async def run_relay_write(write_func, relay_states: Dict[str, bool]):
+    """
+    Queue a relay write on the hardware thread (coalesced with a relay write
+    waiting at the end of the queue) and await its result
+
+    Args:
+        write_func: Function taking a {relay_name: state} dictionary
+        relay_states: Relay states to write
+
+    Returns:
+        The write's return value
+    """
+    return await asyncio.wrap_future(hardware_worker.submit_relay_write(write_func, relay_states))
+
+
+def get_stats() -> dict:
+    """Get queue statistics of the hardware thread"""
+    return hardware_worker.get_stats()
+
+
+def shutdown():
+    """Finish queued calls and stop the hardware thread"""
+    hardware_worker.shutdown(wait=True)
@@ -0,0 +1,131 @@
+"""
+Hardware Job Service
+Tracks long-running hardware operations started in the background
+"""
+import asyncio
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional
+from app.services import hardware_executor
+
+# Finished jobs kept for status queries
+MAX_FINISHED_JOBS = 100
+
+
+class Job:
+    """A hardware operation queued on the hardware executor"""
+
+    def __init__(self, kind: str, params: Dict[str, Any]):
+        self.job_id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.params = params
+        self.status = 'pending'  # pending -> running -> completed | failed
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.now().isoformat()
+        self.started_at: Optional[str] = None
+        self.finished_at: Optional[str] = None
+        self.future = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in ('completed', 'failed')
+
+    def to_dict(self) -> dict:
+        return {
+            'job_id': self.job_id,
+            'kind': self.kind,
+            'status': self.status,
+            'params': self.params,
+            'result': self.result,
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at
+        }
+
+
+class JobService:
+    """Starts hardware operations as jobs and reports their progress"""
+
+    def __init__(self):
+        self._jobs: 'OrderedDict[str, Job]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, params: Dict[str, Any], func, *args, **kwargs) -> Job:
+        """
+        Queue an operation on the hardware executor
+
+        Args:
+            kind: Job type (e.g. 'discharge')
+            params: Parameters reported with the job status
+            func: Blocking function to run
+            *args, **kwargs: Arguments for func
+
+        Returns:
+            The new job (status 'pending')
+        """
+        job = Job(kind, params)
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._prune()
+        job.future = hardware_executor.submit(self._run, job, func, args, kwargs)
+        return job
+
+    @staticmethod
+    def _run(job: Job, func, args, kwargs):
+        job.status = 'running'
+        job.started_at = datetime.now().isoformat()
+        try:
+            job.result = func(*args, **kwargs)
+            job.status = 'completed'
+        except Exception as e:
+            job.error = str(e)
+            job.status = 'failed'
+        finally:
+            job.finished_at = datetime.now().isoformat()
+
+    def _prune(self):
+        """Forget the oldest finished jobs beyond MAX_FINISHED_JOBS"""
+        finished = [job_id for job_id, job in self._jobs.items() if job.done]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Job:
+        """
+        Get a job by ID
+
+        Raises:
+            KeyError: If the job does not exist
+        """
+        with self._lock:
+            if job_id not in self._jobs:
+                raise KeyError(f"Unknown job: {job_id}")
+            return self._jobs[job_id]
+
+    async def wait(self, job_id: str, timeout: float) -> Job:
+        """
+        Wait until a job has finished or the timeout has passed
+
+        Args:
+            job_id: Job ID
+            timeout: Maximum time to wait in seconds
+
+        Returns:
+            The job (check its status; it may still be running)
+
+        Raises:
+            KeyError: If the job does not exist
+        """
+        job = self.get(job_id)
+        if not job.done:
+            try:
+                await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(job.future)), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return job
+
+
+job_service = JobService()
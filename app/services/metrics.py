@@ -0,0 +1,253 @@
+"""
+Metrics Service
+Counters, gauges and histograms for the DAQ hot paths, rendered in the
+Prometheus text exposition format
+"""
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Bucket upper bounds in seconds, from 50 µs to 10 s
+LATENCY_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+# Bucket upper bounds for queue lengths
+DEPTH_BUCKETS = (0, 1, 2, 4, 8, 16, 32, 64)
+
+
+def _format_labels(labels: Dict[str, str], extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(labels.items())
+    if extra is not None:
+        items.append(extra)
+    if not items:
+        return ''
+    return '{' + ','.join(f'{key}="{value}"' for key, value in items) + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonically increasing value"""
+
+    __slots__ = ('labels', 'value', '_lock')
+
+    def __init__(self, labels: Dict[str, str]):
+        self.labels = labels
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self.value += amount
+
+    def samples(self, name: str) -> List[str]:
+        return [f'{name}_total{_format_labels(self.labels)} {_format_value(self.value)}']
+
+
+class Gauge:
+    """Value that goes up and down"""
+
+    __slots__ = ('labels', 'value', '_lock')
+
+    def __init__(self, labels: Dict[str, str]):
+        self.labels = labels
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def set(self, value: float):
+        self.value = value
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1):
+        with self._lock:
+            self.value -= amount
+
+    def samples(self, name: str) -> List[str]:
+        return [f'{name}{_format_labels(self.labels)} {_format_value(self.value)}']
+
+
+class Histogram:
+    """
+    Distribution of observed values in fixed buckets
+
+    Counts are kept per bucket in a preallocated list and only made
+    cumulative when rendered, so observe() is a bisect and three increments.
+    """
+
+    __slots__ = ('labels', 'bounds', 'counts', 'sum', 'count', '_lock')
+
+    def __init__(self, labels: Dict[str, str], bounds: Tuple[float, ...]):
+        self.labels = labels
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def samples(self, name: str) -> List[str]:
+        with self._lock:
+            counts = list(self.counts)
+            total, count = self.sum, self.count
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.bounds + (float('inf'),), counts):
+            cumulative += bucket_count
+            le = ('le', _format_value(bound) if isinstance(bound, float) else str(bound))
+            lines.append(f'{name}_bucket{_format_labels(self.labels, le)} {cumulative}')
+        lines.append(f'{name}_sum{_format_labels(self.labels)} {_format_value(total)}')
+        lines.append(f'{name}_count{_format_labels(self.labels)} {count}')
+        return lines
+
+
+class MetricFamily:
+    """
+    A metric and its labelled children
+
+    Look children up once with labels() and keep the reference on hot paths;
+    the lookup builds a key tuple, updating the child allocates nothing.
+    """
+
+    _TYPES = {'counter': Counter, 'gauge': Gauge, 'histogram': Histogram}
+
+    def __init__(self, kind: str, name: str, help_text: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Optional[Tuple[float, ...]] = None):
+        self.kind = kind
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str):
+        """
+        Get the child for the given label values (created on first use)
+
+        Raises:
+            ValueError: If the number of values doesn't match the label names
+        """
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    labels = dict(zip(self.labelnames, (str(value) for value in values)))
+                    if self.kind == 'histogram':
+                        child = Histogram(labels, self.buckets)
+                    else:
+                        child = self._TYPES[self.kind](labels)
+                    self._children[values] = child
+        return child
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} {self.kind}']
+        for child in list(self._children.values()):
+            lines.extend(child.samples(self.name))
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metric families, rendered together for /metrics"""
+
+    def __init__(self):
+        self._families: Dict[str, MetricFamily] = {}
+        self._callbacks: List[Tuple[str, str, Callable[[], float]]] = []
+
+    def _register(self, family: MetricFamily) -> MetricFamily:
+        if family.name in self._families:
+            raise ValueError(f"Metric {family.name} is already registered")
+        self._families[family.name] = family
+        return family
+
+    def counter(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()) -> MetricFamily:
+        """Register a counter (rendered with a _total suffix)"""
+        return self._register(MetricFamily('counter', name, help_text, labelnames))
+
+    def gauge(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()) -> MetricFamily:
+        """Register a gauge"""
+        return self._register(MetricFamily('gauge', name, help_text, labelnames))
+
+    def histogram(self, name: str, help_text: str, labelnames: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> MetricFamily:
+        """Register a histogram with the given bucket upper bounds"""
+        return self._register(MetricFamily('histogram', name, help_text, labelnames, tuple(buckets)))
+
+    def gauge_callback(self, name: str, help_text: str, func: Callable[[], float]):
+        """Register a gauge whose value is read from func when rendering"""
+        self._callbacks.append((name, help_text, func))
+
+    def render(self) -> str:
+        """
+        Render all metrics in the Prometheus text exposition format (0.0.4)
+
+        Returns:
+            Exposition text
+        """
+        lines = []
+        for family in list(self._families.values()):
+            lines.extend(family.render())
+        for name, help_text, func in self._callbacks:
+            try:
+                value = func()
+            except Exception:
+                continue
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} gauge')
+            lines.append(f'{name} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+# DAQ tasks (kind: acquisition, capture, stream, relay_port)
+task_create_seconds = registry.histogram(
+    'daq_task_create_seconds', 'Time to create and configure a DAQ task', ('kind',))
+task_start_seconds = registry.histogram(
+    'daq_task_start_seconds', 'Time to commit and start an analog input task', ('kind',))
+read_seconds = registry.histogram(
+    'daq_read_seconds', 'Duration of one analog input block read', ('kind',))
+samples_read = registry.counter(
+    'daq_samples_read', 'Samples per channel read from analog input tasks', ('kind',))
+buffer_fill_ratio = registry.gauge(
+    'daq_buffer_fill_ratio', 'Unread samples as a fraction of the DAQ buffer, at the last read', ('kind',))
+overruns = registry.counter(
+    'daq_overruns', 'Analog input reads that failed (buffer overrun or driver error)', ('kind',))
+
+# Relays (module: zs1, zs2, zk1, ...)
+relay_write_seconds = registry.histogram(
+    'relay_write_seconds', 'Duration of one relay port write', ('module',))
+
+# WebSocket streaming (format: json, binary)
+ws_send_seconds = registry.histogram(
+    'ws_send_seconds', 'Time to encode and send one data message to a client', ('format',))
+ws_queue_depth = registry.histogram(
+    'ws_queue_depth', 'Blocks still queued for a client after taking one to send', buckets=DEPTH_BUCKETS)
+ws_dropped_blocks = registry.counter(
+    'ws_dropped_blocks', 'Blocks skipped because a client could not keep up')
+
+# API responses (endpoint: stop_read_adc, adc_data, adc_status, capture, sequence, run_samples)
+response_encode_seconds = registry.histogram(
+    'response_encode_seconds', 'Time to JSON-encode a sample data response', ('endpoint',))
+
+
+def render() -> str:
+    """Render all registered metrics (see MetricsRegistry.render)"""
+    return registry.render()
@@ -0,0 +1,117 @@
+"""
+Online Statistics
+Per-channel running statistics, updated one block at a time as samples
+are acquired
+"""
+import math
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+class RunningStatistics:
+    """
+    Count, min, max, mean, RMS and variance of every channel, without
+    keeping the samples
+
+    Each block's mean and sum of squared deviations are computed
+    vectorized and merged into the running values with Chan's parallel
+    form of Welford's update, which stays accurate for long runs with a
+    large DC offset. update() is called from the reader thread and
+    snapshot() from API requests, so both hold a lock.
+    """
+
+    def __init__(self, channel_names: List[str], sample_rate: int):
+        """
+        Args:
+            channel_names: Name of each row of the blocks (e.g. 'adc1')
+            sample_rate: Sampling rate in Hz, to convert peak indices to times
+        """
+        self.channel_names = list(channel_names)
+        self.sample_rate = sample_rate
+        channels = len(self.channel_names)
+        self._count = 0
+        self._mean = np.zeros(channels)
+        self._m2 = np.zeros(channels)
+        self._min = np.full(channels, np.inf)
+        self._max = np.full(channels, -np.inf)
+        self._min_index = np.zeros(channels, dtype=np.int64)
+        self._max_index = np.zeros(channels, dtype=np.int64)
+        self._lock = threading.Lock()
+
+    @property
+    def count(self) -> int:
+        """Samples per channel seen so far"""
+        return self._count
+
+    def update(self, block: np.ndarray):
+        """
+        Add a block of samples
+
+        Args:
+            block: Array of shape (channels, n), following the previous block
+        """
+        n = block.shape[1]
+        if n == 0:
+            return
+        block_mean = block.mean(axis=1)
+        block_m2 = np.square(block - block_mean[:, None]).sum(axis=1)
+        block_min_index = block.argmin(axis=1)
+        block_max_index = block.argmax(axis=1)
+        rows = np.arange(block.shape[0])
+        block_min = block[rows, block_min_index]
+        block_max = block[rows, block_max_index]
+
+        with self._lock:
+            offset = self._count
+            total = offset + n
+            delta = block_mean - self._mean
+            self._mean += delta * (n / total)
+            self._m2 += block_m2 + np.square(delta) * (offset * n / total)
+            self._count = total
+
+            # The first occurrence of a peak is kept
+            lower = block_min < self._min
+            self._min = np.where(lower, block_min, self._min)
+            self._min_index = np.where(lower, block_min_index + offset, self._min_index)
+            higher = block_max > self._max
+            self._max = np.where(higher, block_max, self._max)
+            self._max_index = np.where(higher, block_max_index + offset, self._max_index)
+
+    def snapshot(self) -> Optional[Dict[str, dict]]:
+        """
+        Statistics of every channel so far
+
+        Returns:
+            Dictionary of channel name to count, min, max, mean, rms,
+            variance (population), std, and the sample index and time in
+            seconds from the first sample of the min and max, or None
+            before the first block
+        """
+        with self._lock:
+            count = self._count
+            if count == 0:
+                return None
+            mean = self._mean.copy()
+            m2 = self._m2.copy()
+            minimum, maximum = self._min.copy(), self._max.copy()
+            min_index, max_index = self._min_index.copy(), self._max_index.copy()
+
+        variance = np.maximum(m2 / count, 0.0)
+        statistics = {}
+        for row, name in enumerate(self.channel_names):
+            statistics[name] = {
+                'count': count,
+                'min': float(minimum[row]),
+                'max': float(maximum[row]),
+                'mean': float(mean[row]),
+                'rms': math.sqrt(variance[row] + mean[row] ** 2),
+                'variance': float(variance[row]),
+                'std': math.sqrt(variance[row]),
+                'min_index': int(min_index[row]),
+                'max_index': int(max_index[row]),
+                'min_time_s': int(min_index[row]) / self.sample_rate,
+                'max_time_s': int(max_index[row]) / self.sample_rate
+            }
+        return statistics
@@ -2,10 +2,17 @@
 Relay Control Service
 Handles switching relays on/off
 """
-import nidaqmx as ni
-from typing import List
+import threading
+import time
+import numpy as np
+from typing import Dict, List, Optional
 from app.core.daq_config import relay_mapping
 from app.core.config import settings
+from app.core.logging_config import get_logger, log_fields, sampler
+from app.hardware import DeviceError, DigitalPortTask, get_backend
+from app.services import metrics
+
+logger = get_logger(__name__)
 
 
 class RelayService:
@@ -15,10 +22,145 @@ class RelayService:
         self.relay_mapping = relay_mapping
         # Track relay states (all start as False/OFF)
         self._relay_states = {relay: False for relay in self.relay_mapping.get_all_relay_names()}
-        # Detect if we're using simulated device (cDAQ1 doesn't support reading DO states)
-        self.is_simulated = settings.daq_device_name.lower() in ['cdaq1', 'dev1', 'sim']
+        self.backend = get_backend()
+        # Detect if the device can't read DO states back (e.g. NI MAX simulated cDAQ1)
+        self.is_simulated = not self.backend.supports_do_readback
         if self.is_simulated:
-            print(f"⚠️  Using simulated device '{settings.daq_device_name}' - relay states will be tracked in memory only")
+            logger.warning(
+                "Device can't read relay states back, tracking them in memory only",
+                extra=log_fields(device=settings.daq_device_name)
+            )
+        
+        # Lines of each module port, indexed by line number
+        self._port_relays: Dict[str, List[Optional[str]]] = {}
+        # Write latency histogram of each port, labelled with its module
+        self._port_write_time = {}
+        for relay_name in self.relay_mapping.get_all_relay_names():
+            port, line = self.relay_mapping.get_port_and_line(relay_name)
+            lines = self._port_relays.setdefault(port, [])
+            lines.extend([None] * (line + 1 - len(lines)))
+            lines[line] = relay_name
+            self._port_write_time[port] = metrics.relay_write_seconds.labels(relay_name.split('_')[0])
+        self._task_create_time = metrics.task_create_seconds.labels('relay_port')
+        
+        # One committed DO task per port, created on first use and reused
+        self._port_tasks: Dict[str, DigitalPortTask] = {}
+        self._lock = threading.RLock()
+        
+        # Last hardware read of each port: (monotonic time, {relay_name: state})
+        self._port_cache: Dict[str, tuple] = {}
+        self.state_cache_ttl = settings.relay_state_cache_ttl
+        
+        # time.perf_counter() before and after the most recent port write
+        self.last_write_window = (0.0, 0.0)
+    
+    def _port_task(self, port: str) -> DigitalPortTask:
+        """Get the pooled task of a port, creating it if needed"""
+        task = self._port_tasks.get(port)
+        if task is None:
+            start = time.perf_counter()
+            task = self.backend.create_port_task(port, len(self._port_relays[port]))
+            self._task_create_time.observe(time.perf_counter() - start)
+            self._port_tasks[port] = task
+            if not self.is_simulated:
+                # Port writes set every line: start from the hardware state so
+                # relays left ON are not switched off by the first write
+                try:
+                    self._relay_states.update(self.relay_mapping.decode_port_mask(port, task.read_mask()))
+                except DeviceError as e:
+                    logger.warning("Could not read initial relay states", extra=log_fields(port=port, error=str(e)))
+        return task
+    
+    def _discard_port_task(self, port: str):
+        """Close and forget the pooled task of a port (it is recreated on next use)"""
+        task = self._port_tasks.pop(port, None)
+        if task is not None:
+            task.close()
+    
+    def _run_on_port(self, port: str, operation):
+        """
+        Run an operation on the pooled task of a port
+        
+        If the device reports an error (e.g. it was reset or reconnected),
+        the task is recreated and the operation retried once.
+        """
+        try:
+            return operation(self._port_task(port))
+        except DeviceError as e:
+            logger.warning("DO task failed, recreating it", extra=log_fields(port=port, error=str(e)))
+            self._discard_port_task(port)
+            try:
+                return operation(self._port_task(port))
+            except DeviceError:
+                self._discard_port_task(port)
+                raise
+    
+    def _write_ports(self, relay_states: Dict[str, bool]) -> List[str]:
+        """
+        Write new relay states, one write per affected port
+        
+        Lines not in relay_states keep their tracked state, since a port
+        write always sets every line of the port.
+        
+        Returns:
+            Relay names in the order they were written
+            
+        Raises:
+            ValueError: If a relay name is unknown (nothing is written)
+        """
+        groups = self.relay_mapping.group_by_port(list(relay_states.keys()))
+        written = []
+        
+        with self._lock:
+            for port, lines in groups.items():
+                port_states = np.array(
+                    [self._relay_states.get(relay_name, False) if relay_name else False
+                     for relay_name in self._port_relays[port]],
+                    dtype=bool
+                )
+                for relay_name, line in lines:
+                    port_states[line] = bool(relay_states[relay_name])
+                
+                self._port_cache.pop(port, None)
+                start = time.perf_counter()
+                self._run_on_port(port, lambda task: task.write(port_states))
+                end = time.perf_counter()
+                self._port_write_time[port].observe(end - start)
+                self.last_write_window = (start, end)
+                
+                for relay_name, line in lines:
+                    self._relay_states[relay_name] = bool(port_states[line])
+                    written.append(relay_name)
+        
+        return written
+    
+    def _read_port(self, port: str) -> Dict[str, bool]:
+        """
+        Read all relay lines of a port from hardware and update tracking
+        
+        The port is read with a single bitmask read. The result is reused
+        for state_cache_ttl seconds; any write to the port invalidates it.
+        
+        Returns:
+            Dictionary of {relay_name: state} for the relays on the port
+        """
+        with self._lock:
+            cached = self._port_cache.get(port)
+            if cached is not None and time.monotonic() - cached[0] < self.state_cache_ttl:
+                return cached[1].copy()
+            
+            mask = self._run_on_port(port, lambda task: task.read_mask())
+            port_states = self.relay_mapping.decode_port_mask(port, mask)
+            self._relay_states.update(port_states)
+            self._port_cache[port] = (time.monotonic(), port_states)
+            return port_states.copy()
+    
+    def close(self):
+        """Close all pooled DO tasks"""
+        with self._lock:
+            self._port_cache.clear()
+            for port in list(self._port_tasks):
+                self._discard_port_task(port)
     
     def control_relay(self, relay_name: str, state: bool) -> str:
         """
@@ -34,18 +176,27 @@ class RelayService:
         Raises:
             ValueError: If relay name is unknown
         """
-        channel = self.relay_mapping.get_channel(relay_name)
-        
-        with ni.Task() as task:
-            task.do_channels.add_do_chan(channel)
-            task.write(state)
-        
-        # Update state tracking
-        self._relay_states[relay_name] = state
+        start = time.perf_counter()
+        self._write_ports({relay_name: state})
+        
+        if sampler('relay_switch'):
+            logger.info("Relay switched", extra=log_fields(
+                relay=relay_name,
+                state=bool(state),
+                duration_ms=(time.perf_counter() - start) * 1000,
+                sampled=sampler.every
+            ))
+        return f'{relay_name} {"ON" if state else "OFF"}'
+    
+    def validate_relay_names(self, relay_names: List[str]):
+        """
+        Check that all relay names exist
         
-        info = f'{relay_name} {"ON" if state else "OFF"}'
-        print(info)
-        return info
+        Raises:
+            ValueError: If a relay name is unknown
+        """
+        for relay_name in relay_names:
+            self.relay_mapping.get_channel(relay_name)
     
     def get_available_relays(self) -> List[str]:
         """
@@ -73,12 +224,18 @@ class RelayService:
         """
         Control multiple relays at once
         
+        Relays are grouped by module port and each affected port is set with
+        a single multi-line write on its pooled task.
+        
         Args:
             relay_states: Dictionary of {relay_name: state} pairs
             
         Returns:
             Status message string
             
+        Raises:
+            ValueError: If a relay name is unknown (nothing is written)
+            
         Example:
             control_multiple_relays({
                 'zs1_1': True,
@@ -86,11 +243,20 @@ class RelayService:
                 'zk2_1': True
             })
         """
-        results = []
-        for relay_name, state in relay_states.items():
-            result = self.control_relay(relay_name, state)
-            results.append(result)
+        if not relay_states:
+            return ""
         
+        start = time.perf_counter()
+        relay_order = self._write_ports(relay_states)
+        
+        if sampler('relay_switch'):
+            logger.info("Relays switched", extra=log_fields(
+                relays={relay_name: self._relay_states[relay_name] for relay_name in relay_order},
+                duration_ms=(time.perf_counter() - start) * 1000,
+                sampled=sampler.every
+            ))
+        
+        results = [f'{relay_name} {"ON" if self._relay_states[relay_name] else "OFF"}' for relay_name in relay_order]
         return "; ".join(results)
     
     # Convenience methods for commonly used relays in acquisition sequences
@@ -149,22 +315,26 @@ class RelayService:
         if self.is_simulated:
             return self._relay_states[relay_name]
         
-        # For real hardware, read from device
-        channel = self.relay_mapping.get_channel(relay_name)
+        # For real hardware, read the relay's port from the device
+        port, _ = self.relay_mapping.get_port_and_line(relay_name)
         
         try:
-            with ni.Task() as task:
-                task.do_channels.add_do_chan(channel)
-                # Read the current state from hardware
-                state = task.read()
-                # Update internal state to match hardware
-                self._relay_states[relay_name] = state
-                return state
+            return self._read_port(port)[relay_name]
         except Exception as e:
             # If hardware read fails, fall back to internal state
-            print(f"Warning: Could not read relay {relay_name} from hardware: {e}")
+            logger.warning("Could not read relay from hardware, using tracked state",
+                           extra=log_fields(relay=relay_name, error=str(e)))
             return self._relay_states.get(relay_name, False)
     
+    def get_tracked_states(self) -> dict:
+        """
+        Get relay states as tracked in memory, without touching the hardware
+        
+        Returns:
+            Dictionary of {relay_name: state} for all relays
+        """
+        return self._relay_states.copy()
+    
     def get_all_relay_states(self) -> dict:
         """
         Get the current state of all relays
@@ -179,23 +349,19 @@ class RelayService:
         if self.is_simulated:
             return self._relay_states.copy()
         
-        # For real hardware, read from device
+        # For real hardware, read each module port from the device
         hardware_states = {}
         
-        for relay_name in self._relay_states.keys():
+        for port, relay_names in self._port_relays.items():
             try:
-                channel = self.relay_mapping.get_channel(relay_name)
-                with ni.Task() as task:
-                    task.do_channels.add_do_chan(channel)
-                    # Read the current state from hardware
-                    state = task.read()
-                    hardware_states[relay_name] = state
-                    # Update internal state to match hardware
-                    self._relay_states[relay_name] = state
+                hardware_states.update(self._read_port(port))
             except Exception as e:
                 # If hardware read fails, use internal state
-                print(f"Warning: Could not read relay {relay_name} from hardware: {e}")
-                hardware_states[relay_name] = self._relay_states.get(relay_name, False)
+                logger.warning("Could not read relays from hardware, using tracked states",
+                               extra=log_fields(port=port, error=str(e)))
+                for relay_name in relay_names:
+                    if relay_name:
+                        hardware_states[relay_name] = self._relay_states.get(relay_name, False)
         
         return hardware_states
     
@@ -223,18 +389,16 @@ class RelayService:
         Returns:
             Status message string
         """
-        disabled_count = 0
         # Get states (from hardware or internal depending on mode)
         states = self.get_all_relay_states()
         
-        for relay_name, state in states.items():
-            if state:  # Only disable if currently ON in hardware
-                self.control_relay(relay_name, False)
-                disabled_count += 1
+        # Only disable relays that are currently ON in hardware, in one write
+        enabled = [relay_name for relay_name, state in states.items() if state]
+        self.control_multiple_relays({relay_name: False for relay_name in enabled})
+        disabled_count = len(enabled)
         
-        message = f"Disabled {disabled_count} relay(s)"
-        print(message)
-        return message
+        logger.info("Relays disabled", extra=log_fields(count=disabled_count))
+        return f"Disabled {disabled_count} relay(s)"
     
     def disable_enabled_relays(self) -> tuple:
         """
@@ -244,8 +408,7 @@ class RelayService:
             Tuple of (list of disabled relay names, count)
         """
         enabled = self.get_enabled_relays()
-        for relay_name in enabled:
-            self.control_relay(relay_name, False)
+        self.control_multiple_relays({relay_name: False for relay_name in enabled})
         
         return enabled, len(enabled)
     
@@ -260,19 +423,17 @@ class RelayService:
         Returns:
             Dictionary of {relay_name: state} reflecting hardware/internal state
         """
-        if self.is_simulated:
-            print("⚠️  Simulated device mode - returning internal state (hardware read not supported)")
-        else:
-            print("Syncing relay states with hardware...")
-        
+        # Force fresh hardware reads
+        with self._lock:
+            self._port_cache.clear()
         hardware_states = self.get_all_relay_states()
         
         enabled_count = sum(1 for state in hardware_states.values() if state)
         
-        if self.is_simulated:
-            print(f"Internal state: {enabled_count} relay(s) currently enabled")
-        else:
-            print(f"Sync complete: {enabled_count} relay(s) currently enabled in hardware")
+        logger.info("Relay states synced", extra=log_fields(
+            enabled=enabled_count,
+            source='memory' if self.is_simulated else 'hardware'
+        ))
         
         return hardware_states
 
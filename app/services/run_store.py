@@ -0,0 +1,295 @@
+"""
+Measurement Run Store
+Persists acquired runs to disk under a run ID and serves sample ranges
+"""
+import json
+import re
+import shutil
+import struct
+import threading
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+from app.core.config import settings
+from app.core.logging_config import get_logger, log_fields
+
+logger = get_logger(__name__)
+
+_RUN_ID_PATTERN = re.compile(r'^[0-9]{8}-[0-9]{6}-[0-9a-f]{6}$')
+
+# samples.bin header: magic, version, dtype code, channels, sample rate, samples.
+# Padded to 64 bytes so the sample data is aligned.
+RUN_FILE_MAGIC = b'NIDQRUN1'
+RUN_FILE_VERSION = 1
+RUN_FILE_HEADER_SIZE = 64
+_RUN_HEADER = struct.Struct('<8sHHIdQ')
+_DTYPE_CODES = {'float32': 0, 'float64': 1}
+_CODE_DTYPES = {code: np.dtype(name).newbyteorder('<') for name, code in _DTYPE_CODES.items()}
+
+
+class RunWriter:
+    """
+    Appends sample blocks of one run to its flat binary file
+
+    Samples are stored channel-interleaved (s0c0, s0c1, ..., s1c0, ...) after
+    a 64-byte header, so any sample range is one contiguous region of the
+    file. Memory use is one block, regardless of run length.
+    """
+
+    def __init__(self, run_id: str, run_dir: Path, channels: int, sample_rate: int, dtype: str = 'float32'):
+        if dtype not in _DTYPE_CODES:
+            raise ValueError(f"Invalid dtype '{dtype}'. Must be one of: {', '.join(_DTYPE_CODES)}")
+
+        self.run_id = run_id
+        self.run_dir = run_dir
+        self.channels = channels
+        self.sample_rate = sample_rate
+        self.dtype = np.dtype(dtype).newbyteorder('<')
+        self._dtype_code = _DTYPE_CODES[dtype]
+        self._samples = 0
+        self._lock = threading.Lock()
+
+        run_dir.mkdir(parents=True, exist_ok=True)
+        self._file = open(run_dir / 'samples.bin', 'w+b')
+        self._write_header()
+
+    @property
+    def samples(self) -> int:
+        """Number of samples per channel written so far"""
+        return self._samples
+
+    def _write_header(self):
+        header = _RUN_HEADER.pack(
+            RUN_FILE_MAGIC, RUN_FILE_VERSION, self._dtype_code,
+            self.channels, float(self.sample_rate), self._samples
+        )
+        self._file.seek(0)
+        self._file.write(header.ljust(RUN_FILE_HEADER_SIZE, b'\0'))
+        self._file.seek(0, 2)
+
+    def append(self, data: np.ndarray):
+        """
+        Append a block of samples
+
+        Args:
+            data: Array of shape (channels, n)
+        """
+        if data.shape[1] == 0:
+            return
+        with self._lock:
+            # Transposing gives sample-major order, i.e. channel-interleaved
+            self._file.write(np.ascontiguousarray(data.T, dtype=self.dtype).tobytes())
+            self._samples += data.shape[1]
+
+    def flush(self):
+        """Make everything appended so far visible to readers of the file"""
+        with self._lock:
+            self._file.flush()
+
+    def close(self, metadata: dict) -> str:
+        """
+        Finalize the sample file and write the run metadata
+
+        Args:
+            metadata: JSON-serializable run metadata
+
+        Returns:
+            The run ID
+        """
+        with self._lock:
+            self._write_header()
+            self._file.close()
+
+        meta = {
+            **metadata,
+            'run_id': self.run_id,
+            'channels': self.channels,
+            'samples': self._samples,
+            'dtype': self.dtype.name,
+            'format': 'bin',
+            'saved_at': datetime.now().isoformat()
+        }
+        # meta.json is written last: a run exists once its metadata does
+        with open(self.run_dir / 'meta.json', 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+
+        return self.run_id
+
+    def abort(self):
+        """Discard the run"""
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+        shutil.rmtree(self.run_dir, ignore_errors=True)
+
+
+def open_run_file(path: Path) -> np.ndarray:
+    """
+    Open a samples.bin file memory-mapped (read-only)
+
+    The sample count is taken from the header, or from the file size when the
+    header was never finalized (e.g. the run is still being written).
+
+    Args:
+        path: Path of the samples.bin file
+
+    Returns:
+        Array view of shape (channels, samples)
+
+    Raises:
+        ValueError: If the file is not a run file
+    """
+    with open(path, 'rb') as f:
+        header = f.read(RUN_FILE_HEADER_SIZE)
+
+    magic, version, dtype_code, channels, sample_rate, samples = _RUN_HEADER.unpack_from(header)
+    if magic != RUN_FILE_MAGIC or dtype_code not in _CODE_DTYPES:
+        raise ValueError(f"Not a run file: {path}")
+
+    dtype = _CODE_DTYPES[dtype_code]
+    available = (path.stat().st_size - RUN_FILE_HEADER_SIZE) // (channels * dtype.itemsize)
+    samples = min(samples, available) if samples else available
+
+    if samples == 0:
+        return np.empty((channels, 0), dtype=dtype)
+
+    data = np.memmap(path, dtype=dtype, mode='r', offset=RUN_FILE_HEADER_SIZE, shape=(samples, channels))
+    return data.T
+
+
+class RunStore:
+    """
+    On-disk store of measurement runs
+
+    Each run is a directory named after its run ID containing:
+    - meta.json: acquisition configuration, relay states and timing
+    - samples.bin: 64-byte header followed by channel-interleaved samples
+      (runs saved by older versions have samples.npy instead)
+
+    Samples are opened memory-mapped, so reading a range only touches the
+    requested part of the file.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def new_run_id() -> str:
+        """Generate a sortable, unique run ID (e.g. '20250114-153012-a1b2c3')"""
+        return f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+    def _run_dir(self, run_id: str) -> Path:
+        """
+        Resolve the directory of a run
+
+        Raises:
+            KeyError: If the run ID is malformed or the run does not exist
+        """
+        if not _RUN_ID_PATTERN.match(run_id):
+            raise KeyError(f"Unknown run: {run_id}")
+        run_dir = self.root / run_id
+        if not (run_dir / 'meta.json').exists():
+            raise KeyError(f"Unknown run: {run_id}")
+        return run_dir
+
+    def create_run(self, channels: int, sample_rate: int, dtype: Optional[str] = None) -> RunWriter:
+        """
+        Start a new run that is written block by block
+
+        Args:
+            channels: Number of channels
+            sample_rate: Sampling rate in Hz
+            dtype: Sample type on disk ('float32' or 'float64', default from settings)
+
+        Returns:
+            Writer for the new run
+        """
+        run_id = self.new_run_id()
+        return RunWriter(
+            run_id,
+            self.root / run_id,
+            channels=channels,
+            sample_rate=sample_rate,
+            dtype=dtype or settings.sample_dtype
+        )
+
+    def list_runs(self) -> List[dict]:
+        """
+        Get metadata of all stored runs
+
+        Returns:
+            List of run metadata dictionaries, newest first
+        """
+        if not self.root.exists():
+            return []
+
+        runs = []
+        for meta_path in sorted(self.root.glob('*/meta.json'), reverse=True):
+            try:
+                with open(meta_path, 'r', encoding='utf-8') as f:
+                    runs.append(json.load(f))
+            except (OSError, ValueError) as e:
+                logger.warning("Skipping unreadable run metadata", extra=log_fields(path=str(meta_path), error=str(e)))
+        return runs
+
+    def get_metadata(self, run_id: str) -> dict:
+        """
+        Get metadata of a run
+
+        Raises:
+            KeyError: If the run does not exist
+        """
+        with open(self._run_dir(run_id) / 'meta.json', 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def open_samples(self, run_id: str) -> np.ndarray:
+        """
+        Open the samples of a run memory-mapped (read-only)
+
+        Returns:
+            Array view of shape (channels, samples)
+
+        Raises:
+            KeyError: If the run does not exist
+        """
+        run_dir = self._run_dir(run_id)
+        if (run_dir / 'samples.bin').exists():
+            return open_run_file(run_dir / 'samples.bin')
+        return np.load(run_dir / 'samples.npy', mmap_mode='r')
+
+    def read_samples(self, run_id: str, offset: int = 0, length: int = -1) -> np.ndarray:
+        """
+        Read a range of samples from a run
+
+        Args:
+            run_id: Run ID
+            offset: First sample index
+            length: Number of samples per channel (-1 for everything after offset)
+
+        Returns:
+            Array of shape (channels, n) with n <= length
+
+        Raises:
+            KeyError: If the run does not exist
+        """
+        samples = self.open_samples(run_id)
+        end = samples.shape[1] if length < 0 else min(samples.shape[1], offset + length)
+        return np.array(samples[:, offset:end])
+
+    def delete_run(self, run_id: str):
+        """
+        Delete a run from disk
+
+        Raises:
+            KeyError: If the run does not exist
+        """
+        run_dir = self._run_dir(run_id)
+        with self._lock:
+            shutil.rmtree(run_dir)
+
+
+run_store = RunStore(Path(settings.runs_dir))
@@ -0,0 +1,222 @@
+"""
+Relay Sequence Service
+Executes declarative step lists (relay switching, waits, ADC start/stop) on the server
+"""
+import threading
+import time
+from typing import List
+from app.core.logging_config import get_logger, log_fields
+from app.services.acquisition_service import acquisition_service
+from app.services.relay_service import relay_service
+from app.services.timing import precise_sleep
+
+logger = get_logger(__name__)
+
+STEP_TYPES = ('set', 'wait', 'disable_all', 'discharge', 'start_adc', 'stop_adc')
+
+# Longest single wait step, in seconds
+MAX_WAIT_SECONDS = 60.0
+# Longest total of wait and discharge times in one sequence, in seconds. A
+# sequence holds the hardware thread throughout, so every other relay
+# write, stop request and discharge queues behind it
+MAX_SEQUENCE_SECONDS = 60.0
+
+
+class SequenceError(Exception):
+    """Raised when a step of a sequence fails; the sequence is aborted"""
+
+    def __init__(self, index: int, step_type: str, cause: Exception):
+        super().__init__(f"Step {index} ({step_type}) failed: {cause}")
+        self.index = index
+        self.step_type = step_type
+        self.cause = cause
+
+
+class SequenceService:
+    """
+    Runs relay/acquisition sequences described as lists of steps
+
+    Step types:
+    - set: {'relays': {relay_name: state, ...}} - one batched write per module port
+    - wait: {'seconds': float} - precise wait
+    - disable_all: turn off all enabled relays
+    - discharge: {'capacitor', 'discharge_resistor', 'duration'} - capacitor discharge
+    - start_adc: {'samples', 'sample_rate', 'measurement_time', 'circuit', 'parameters',
+      'trigger_relay'} - trigger_relay is switched on once the ADC is armed
+    - stop_adc: stop the acquisition; its data is returned with the result
+
+    All steps are validated before the first one runs; their waits and
+    discharge durations may add up to at most MAX_SEQUENCE_SECONDS. If a
+    step fails, the acquisition started by the sequence is stopped, enabled
+    relays are turned off and SequenceError is raised.
+    """
+
+    def __init__(self):
+        self.relay_service = relay_service
+        self.acquisition_service = acquisition_service
+        self._lock = threading.Lock()
+
+    def validate(self, steps: List[dict]):
+        """
+        Check a sequence without executing it
+
+        Args:
+            steps: List of step dictionaries
+
+        Raises:
+            ValueError: If a step is malformed, or the sequence would wait
+                longer than MAX_SEQUENCE_SECONDS in total
+        """
+        waited = 0.0
+        for index, step in enumerate(steps):
+            step_type = step.get('type')
+            if step_type not in STEP_TYPES:
+                raise ValueError(f"Step {index}: invalid type '{step_type}'. Must be one of: {', '.join(STEP_TYPES)}")
+
+            if step_type == 'set':
+                relays = step.get('relays')
+                if not relays:
+                    raise ValueError(f"Step {index}: 'set' needs a non-empty 'relays' mapping")
+                try:
+                    for relay_name in relays:
+                        self.relay_service.relay_mapping.get_channel(relay_name)
+                except ValueError as e:
+                    raise ValueError(f"Step {index}: {e}")
+            elif step_type == 'wait':
+                seconds = step.get('seconds')
+                if seconds is None or not 0 <= seconds <= MAX_WAIT_SECONDS:
+                    raise ValueError(f"Step {index}: 'wait' needs 'seconds' between 0 and {MAX_WAIT_SECONDS:g}")
+                waited += seconds
+            elif step_type == 'discharge':
+                try:
+                    discharge = self.acquisition_service.discharge_steps(
+                        step.get('capacitor', 'cs1'),
+                        step.get('discharge_resistor', 'rz2'),
+                        step.get('duration', 0.5)
+                    )
+                except ValueError as e:
+                    raise ValueError(f"Step {index}: {e}")
+                waited += sum(part['seconds'] for part in discharge if part['type'] == 'wait')
+            elif step_type == 'start_adc' and step.get('trigger_relay') is not None:
+                try:
+                    self.relay_service.relay_mapping.get_channel(step['trigger_relay'])
+                except ValueError as e:
+                    raise ValueError(f"Step {index}: {e}")
+
+        if waited > MAX_SEQUENCE_SECONDS:
+            raise ValueError(
+                f"Sequence waits {waited:g} s in total; the limit is {MAX_SEQUENCE_SECONDS:g} s "
+                f"since it holds the hardware for its whole duration"
+            )
+
+    def _run_step(self, step: dict, result: dict):
+        """Execute one validated step"""
+        step_type = step['type']
+
+        if step_type == 'set':
+            self.relay_service.control_multiple_relays(step['relays'])
+        elif step_type == 'wait':
+            precise_sleep(step['seconds'])
+        elif step_type == 'disable_all':
+            self.relay_service.disable_enabled_relays()
+        elif step_type == 'discharge':
+            self.acquisition_service.discharge_capacitor(
+                capacitor=step.get('capacitor', 'cs1'),
+                discharge_resistor=step.get('discharge_resistor', 'rz2'),
+                duration=step.get('duration', 0.5)
+            )
+        elif step_type == 'start_adc':
+            sample_rate = step.get('sample_rate', 100)
+            samples = step.get('samples', 500)
+            measurement_time = step.get('measurement_time', 0)
+            if measurement_time > 0:
+                # Same sizing as /start-read-adc: 15% safety margin
+                samples = max(int(sample_rate * measurement_time * 1.15), samples)
+            started = self.acquisition_service.start_read_adc(
+                samples_per_channel=samples,
+                sample_rate=sample_rate,
+                circuit=step.get('circuit'),
+                parameters=step.get('parameters'),
+                trigger_relay=step.get('trigger_relay')
+            )
+            result['started_adc'] = True
+            result['run_id'] = self.acquisition_service._task_config['run_id']
+            result['trigger'] = started['trigger']
+        elif step_type == 'stop_adc':
+            config = self.acquisition_service._task_config.copy() if self.acquisition_service._task_config else {}
+            data = self.acquisition_service.stop_read_adc()
+            result['acquisition'] = {
+                'data': data,
+                'sample_rate': config.get('sample_rate', 0),
+                'run_id': self.acquisition_service.get_last_run_id(),
+                'trigger': config.get('trigger'),
+                'statistics': self.acquisition_service.get_last_statistics(),
+                'reader_error': self.acquisition_service._reader_error,
+                'decimate': step.get('decimate'),
+                'points': step.get('points') or 2000
+            }
+            result['run_id'] = result['acquisition']['run_id']
+
+    def _abort(self, result: dict):
+        """Leave the hardware in a safe state after a failed step"""
+        if result.get('started_adc') and self.acquisition_service.is_acquisition_running():
+            try:
+                self.acquisition_service.stop_read_adc()
+            except Exception as e:
+                logger.warning("Could not stop ADC after failed sequence", extra=log_fields(error=str(e)))
+        try:
+            self.relay_service.disable_enabled_relays()
+        except Exception as e:
+            logger.warning("Could not disable relays after failed sequence", extra=log_fields(error=str(e)))
+
+    def run(self, steps: List[dict]) -> dict:
+        """
+        Validate and execute a sequence
+
+        Args:
+            steps: List of step dictionaries
+
+        Returns:
+            Dictionary with:
+            - steps: per-step timing ({index, type, started_ms, duration_ms})
+            - total_ms: duration of the whole sequence
+            - run_id: ID of the run started or stopped by the sequence, if any
+            - trigger: switching event of a start_adc step with trigger_relay, if any
+            - acquisition: data of the stop_adc step, if any
+
+        Raises:
+            ValueError: If a step is malformed (nothing is executed)
+            RuntimeError: If another sequence is running
+            SequenceError: If a step fails
+        """
+        self.validate(steps)
+
+        if not self._lock.acquire(blocking=False):
+            raise RuntimeError("Another sequence is already running")
+
+        result: dict = {'steps': [], 'run_id': None, 'trigger': None, 'acquisition': None}
+        try:
+            start = time.perf_counter()
+            for index, step in enumerate(steps):
+                step_start = time.perf_counter()
+                try:
+                    self._run_step(step, result)
+                except Exception as e:
+                    self._abort(result)
+                    raise SequenceError(index, step['type'], e)
+                step_end = time.perf_counter()
+                result['steps'].append({
+                    'index': index,
+                    'type': step['type'],
+                    'started_ms': (step_start - start) * 1000,
+                    'duration_ms': (step_end - step_start) * 1000
+                })
+            result['total_ms'] = (time.perf_counter() - start) * 1000
+        finally:
+            self._lock.release()
+
+        result.pop('started_adc', None)
+        return result
+
+
+sequence_service = SequenceService()
@@ -0,0 +1,109 @@
+"""
+Stream Ring Buffer
+Thread-safe ring of sequence-numbered sample blocks used by continuous streaming
+"""
+import threading
+import time
+from collections import deque
+from typing import Deque, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+
+class StreamBlock(NamedTuple):
+    """A contiguous block of samples from all ADC channels"""
+    seq: int
+    first_sample: int
+    timestamp: float
+    data: np.ndarray  # shape (channels, samples)
+
+
+class StreamRingBuffer:
+    """
+    Fixed-capacity ring of acquired sample blocks
+
+    The producer (DAQmx callback thread) publishes blocks with consecutive
+    sequence numbers. Consumers keep track of the last sequence number they
+    have seen and ask for everything published after it. When a consumer falls
+    further behind than the ring capacity, the oldest blocks are gone and the
+    number of skipped blocks is reported instead of silently losing them.
+    """
+
+    def __init__(self, capacity: int = 256):
+        self.capacity = capacity
+        self._blocks: Deque[StreamBlock] = deque(maxlen=capacity)
+        self._cond = threading.Condition()
+        self._next_seq = 0
+        self._next_sample = 0
+        self._error: Optional[str] = None
+
+    def reset(self):
+        """Drop all blocks and restart sequence numbering"""
+        with self._cond:
+            self._blocks.clear()
+            self._next_seq = 0
+            self._next_sample = 0
+            self._error = None
+            self._cond.notify_all()
+
+    def publish(self, data: np.ndarray) -> int:
+        """
+        Append a new block of samples
+
+        Args:
+            data: Array of shape (channels, samples)
+
+        Returns:
+            Sequence number assigned to the block
+        """
+        with self._cond:
+            seq = self._next_seq
+            self._blocks.append(StreamBlock(seq, self._next_sample, time.time(), data))
+            self._next_seq += 1
+            self._next_sample += data.shape[1]
+            self._cond.notify_all()
+            return seq
+
+    def fail(self, error: str):
+        """Mark the stream as failed and wake up all waiting consumers"""
+        with self._cond:
+            self._error = error
+            self._cond.notify_all()
+
+    def read_since(self, seq: int, timeout: float = 1.0) -> Tuple[List[StreamBlock], int, int]:
+        """
+        Get all blocks with a sequence number >= seq
+
+        Blocks until at least one block is available or the timeout expires.
+
+        Args:
+            seq: First sequence number the consumer has not seen yet
+            timeout: Maximum time to wait for new blocks in seconds
+
+        Returns:
+            Tuple of (blocks, next_seq, dropped) where next_seq is the value to
+            pass on the following call and dropped is the number of blocks that
+            were overwritten before the consumer could read them
+
+        Raises:
+            RuntimeError: If the producer reported an error
+        """
+        with self._cond:
+            if seq > self._next_seq:
+                # Buffer was reset since the consumer last read - start over
+                seq = 0
+            self._cond.wait_for(
+                lambda: self._next_seq > seq or self._error is not None,
+                timeout=timeout
+            )
+            if self._error is not None:
+                raise RuntimeError(self._error)
+
+            if not self._blocks or self._next_seq <= seq:
+                return [], max(seq, 0), 0
+
+            oldest = self._blocks[0].seq
+            dropped = max(0, oldest - seq)
+            start = max(seq, oldest) - oldest
+            blocks = [self._blocks[i] for i in range(start, len(self._blocks))]
+            return blocks, self._next_seq, dropped
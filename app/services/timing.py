@@ -0,0 +1,25 @@
+"""
+Timing Helpers
+"""
+import time
+
+# Last part of a wait that is busy-waited instead of slept, since OS sleeps
+# may overshoot by a scheduler tick
+_SPIN_SECONDS = 0.002
+
+
+def precise_sleep(seconds: float):
+    """
+    Sleep for the given time with sub-millisecond accuracy
+
+    Sleeps for most of the interval and busy-waits the last couple of
+    milliseconds on the performance counter.
+
+    Args:
+        seconds: Time to wait in seconds
+    """
+    deadline = time.perf_counter() + seconds
+    if seconds > _SPIN_SECONDS:
+        time.sleep(seconds - _SPIN_SECONDS)
+    while time.perf_counter() < deadline:
+        pass
@@ -0,0 +1,104 @@
+"""
+Level Trigger
+Vectorized level/slope trigger detection and the pre-trigger ring buffer
+used by triggered captures
+"""
+from typing import List, Optional
+
+import numpy as np
+
+SLOPES = ('rising', 'falling', 'either')
+
+
+class LevelTrigger:
+    """
+    Finds where selected channels cross a level, one block at a time
+
+    Each block is compared with the level as a whole; the state of the last
+    sample is carried over, so a crossing between two blocks is found at the
+    first sample of the second one.
+    """
+
+    def __init__(self, channels: List[int], level: float, slope: str = 'rising'):
+        """
+        Args:
+            channels: Row indices of the channels to watch (any of them triggers)
+            level: Trigger level in volts
+            slope: 'rising', 'falling' or 'either'
+
+        Raises:
+            ValueError: If slope or channels are invalid
+        """
+        if slope not in SLOPES:
+            raise ValueError(f"Invalid slope '{slope}'. Must be one of: {', '.join(SLOPES)}")
+        if not channels:
+            raise ValueError("At least one trigger channel is required")
+        self.channels = list(channels)
+        self.level = level
+        self.slope = slope
+        self._previous_above: Optional[np.ndarray] = None
+
+    def find(self, block: np.ndarray) -> Optional[int]:
+        """
+        Index of the first crossing in a block
+
+        Args:
+            block: Array of shape (channels, n), consecutive with the previous block
+
+        Returns:
+            Sample index within the block, or None if there is no crossing
+        """
+        if block.shape[1] == 0:
+            return None
+        above = block[self.channels] >= self.level
+        # The first sample of the very first block has nothing to cross from
+        previous = above[:, :1] if self._previous_above is None else self._previous_above[:, None]
+        before = np.concatenate((previous, above[:, :-1]), axis=1)
+        self._previous_above = above[:, -1].copy()
+
+        if self.slope == 'rising':
+            hits = above & ~before
+        elif self.slope == 'falling':
+            hits = before & ~above
+        else:
+            hits = above != before
+
+        columns = np.flatnonzero(hits.any(axis=0))
+        return int(columns[0]) if len(columns) else None
+
+
+class PreTriggerBuffer:
+    """Fixed-size ring buffer keeping the most recent samples of every channel"""
+
+    def __init__(self, channels: int, size: int, dtype=np.float64):
+        self.size = size
+        self._data = np.empty((channels, size), dtype=dtype)
+        self._pos = 0
+        self._count = 0
+
+    def append(self, block: np.ndarray):
+        """Add a block, overwriting the oldest samples"""
+        n = block.shape[1]
+        if self.size == 0 or n == 0:
+            return
+        if n >= self.size:
+            self._data[:] = block[:, -self.size:]
+            self._pos = 0
+            self._count = self.size
+            return
+        first = min(n, self.size - self._pos)
+        self._data[:, self._pos:self._pos + first] = block[:, :first]
+        self._data[:, :n - first] = block[:, first:]
+        self._pos = (self._pos + n) % self.size
+        self._count = min(self.size, self._count + n)
+
+    def contents(self) -> np.ndarray:
+        """
+        Buffered samples, oldest first
+
+        Returns:
+            New array of shape (channels, buffered samples)
+        """
+        if self._count < self.size:
+            return self._data[:, :self._count].copy()
+        return np.concatenate((self._data[:, self._pos:], self._data[:, :self._pos]), axis=1)
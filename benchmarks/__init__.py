@@ -0,0 +1,10 @@
+"""
+Benchmark Suite
+Measures relay, acquisition, streaming and encoding performance of the
+service in-process against the simulated DAQ backend
+
+Usage:
+    python -m benchmarks [--suite relays,acquisition,stream,encode]
+                         [--quick] [--output results.json]
+                         [--compare baseline.json] [--tolerance 0.2]
+"""
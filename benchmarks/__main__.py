@@ -0,0 +1,111 @@
+"""
+Benchmark Runner
+Runs the selected suites against the simulated backend and writes JSON results
+"""
+import argparse
+import contextlib
+import importlib
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+
+SUITES = ('relays', 'acquisition', 'stream', 'encode')
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description=__doc__)
+    parser.add_argument('--suite', default=','.join(SUITES),
+                        help=f"Comma-separated suites to run (default: {','.join(SUITES)})")
+    parser.add_argument('--quick', action='store_true', help='Fewer sizes and iterations')
+    parser.add_argument('--output', help='Write results to this file instead of stdout')
+    parser.add_argument('--compare', metavar='BASELINE', help='Compare with a previous results file')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Allowed relative slowdown before a result counts as a regression (default: 0.2)')
+    args = parser.parse_args(argv)
+
+    suites = [suite.strip() for suite in args.suite.split(',') if suite.strip()]
+    unknown = [suite for suite in suites if suite not in SUITES]
+    if unknown:
+        parser.error(f"Unknown suite(s): {', '.join(unknown)}. Must be one of: {', '.join(SUITES)}")
+
+    # Must be set before the application (and its settings) is imported
+    os.environ['DAQ_BACKEND'] = 'simulated'
+    runs_dir = tempfile.mkdtemp(prefix='daq-benchmark-runs-')
+    os.environ['RUNS_DIR'] = runs_dir
+
+    try:
+        from fastapi.testclient import TestClient
+    except ImportError as e:
+        print(f"Benchmarks need httpx for the in-process client (pip install 'httpx<0.28'): {e}", file=sys.stderr)
+        return 2
+
+    results = {}
+    try:
+        # The service prints to stdout; keep it free for the results
+        with contextlib.redirect_stdout(sys.stderr):
+            from app.main import app
+            from app.core.config import settings
+
+            with TestClient(app) as client:
+                for suite in suites:
+                    print(f"Running {suite} benchmarks...", file=sys.stderr)
+                    module = importlib.import_module(f'benchmarks.{suite}')
+                    results.update(module.run(client, quick=args.quick))
+    finally:
+        shutil.rmtree(runs_dir, ignore_errors=True)
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'app_version': settings.app_version,
+            'git_commit': _git_commit(),
+            'backend': settings.daq_backend,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'quick': args.quick,
+            'suites': suites
+        },
+        'results': results
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+    if args.compare:
+        from benchmarks.common import compare
+
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+        rows = compare(results, baseline, args.tolerance)
+        for row in rows:
+            flag = '  REGRESSION' if row['regression'] else ''
+            print(f"{row['name']:<55} {row['baseline']:>12.3f} -> {row['current']:>12.3f} {row['unit']:<10} "
+                  f"{row['change']:+7.1%}{flag}", file=sys.stderr)
+        if any(row['regression'] for row in rows):
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
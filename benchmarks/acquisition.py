@@ -0,0 +1,56 @@
+"""
+Acquisition Benchmarks
+End-to-end /start-read-adc -> /stop-read-adc latency vs. sample count
+"""
+import time
+from typing import Dict
+
+from benchmarks.common import latency
+
+SAMPLE_RATE = 100000
+
+
+def run(client, quick: bool = False) -> Dict[str, dict]:
+    """
+    Acquire runs of increasing length at SAMPLE_RATE
+
+    Start and stop are timed separately; the time the task spends acquiring
+    (samples / rate) is not part of either. Stop returns the full-resolution
+    data, so its latency includes reading, storing and encoding the run.
+
+    Args:
+        client: TestClient of the application
+        quick: Fewer sizes and repetitions
+
+    Returns:
+        Results by benchmark name
+    """
+    sizes = [1000, 10000] if quick else [1000, 10000, 100000, 500000]
+    repeats = 2 if quick else 5
+    results = {}
+
+    for samples in sizes:
+        start_times, stop_times, sizes_bytes = [], [], []
+        for _ in range(repeats):
+            begin = time.perf_counter()
+            response = client.post('/api/start-read-adc', params={'samples': samples, 'sample_rate': SAMPLE_RATE})
+            response.raise_for_status()
+            start_times.append(time.perf_counter() - begin)
+
+            time.sleep(samples / SAMPLE_RATE)
+
+            begin = time.perf_counter()
+            response = client.post('/api/stop-read-adc')
+            response.raise_for_status()
+            stop_times.append(time.perf_counter() - begin)
+            sizes_bytes.append(len(response.content))
+
+        results[f'acquisition.start.samples_{samples}'] = latency(start_times, samples=samples, sample_rate=SAMPLE_RATE)
+        results[f'acquisition.stop.samples_{samples}'] = latency(
+            stop_times,
+            samples=samples,
+            sample_rate=SAMPLE_RATE,
+            response_bytes=int(sum(sizes_bytes) / len(sizes_bytes))
+        )
+
+    return results
@@ -0,0 +1,77 @@
+"""
+Benchmark Helpers
+Statistics, result records and baseline comparison
+"""
+import time
+from typing import Callable, Dict, List
+
+import numpy as np
+
+
+def timed(func: Callable, *args, **kwargs) -> float:
+    """Run a call and return its duration in seconds"""
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def latency(durations: List[float], **extra) -> dict:
+    """
+    Summarize call durations as a latency result (lower is better)
+
+    Args:
+        durations: Durations in seconds
+        **extra: Additional fields stored with the result
+
+    Returns:
+        Result record; 'value' is the median in ms
+    """
+    ms = np.asarray(durations, dtype=np.float64) * 1000
+    return {
+        'value': float(np.median(ms)),
+        'unit': 'ms',
+        'better': 'lower',
+        'n': int(ms.size),
+        'mean': float(ms.mean()),
+        'min': float(ms.min()),
+        'p95': float(np.percentile(ms, 95)),
+        'p99': float(np.percentile(ms, 99)),
+        'max': float(ms.max()),
+        **extra
+    }
+
+
+def throughput(value: float, unit: str, **extra) -> dict:
+    """Result record for a rate (higher is better)"""
+    return {'value': float(value), 'unit': unit, 'better': 'higher', **extra}
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float) -> List[dict]:
+    """
+    Compare results with a baseline run
+
+    Args:
+        results: Current results ({name: record})
+        baseline: Baseline results ({name: record})
+        tolerance: Allowed relative slowdown (0.2 = 20%)
+
+    Returns:
+        One entry per benchmark present in both runs, with baseline, current,
+        change (relative, positive = better) and regression flag
+    """
+    rows = []
+    for name, record in results.items():
+        base = baseline.get(name)
+        if base is None or not base.get('value'):
+            continue
+        ratio = record['value'] / base['value']
+        change = 1 / ratio - 1 if record['better'] == 'lower' else ratio - 1
+        rows.append({
+            'name': name,
+            'unit': record['unit'],
+            'baseline': base['value'],
+            'current': record['value'],
+            'change': change,
+            'regression': change < -tolerance
+        })
+    return rows
@@ -0,0 +1,85 @@
+"""
+Encoding Benchmarks
+Time to build and JSON-encode DAQReadResponse for full-resolution data,
+through the Pydantic model and through the pre-encoded fast path, for
+in-memory arrays and for stored runs as the endpoints read them
+"""
+import json
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+from fastapi.encoders import jsonable_encoder
+
+from app.api.acquisition import build_read_payload, build_read_response
+from app.api.responses import dumps
+from app.services.run_store import RunStore
+from benchmarks.common import latency, timed
+
+
+def _framework_json(response) -> bytes:
+    # What FastAPI does with a response model: encode to plain Python, then
+    # JSONResponse's json.dumps
+    return json.dumps(jsonable_encoder(response), ensure_ascii=False, allow_nan=False,
+                      indent=None, separators=(',', ':')).encode('utf-8')
+
+
+def _fast_json(data: np.ndarray) -> bytes:
+    # What the endpoints send: payload with numpy arrays, encoded directly
+    return dumps(build_read_payload(data, sample_rate=100000))
+
+
+def _stored_run(store: RunStore, data: np.ndarray) -> np.ndarray:
+    # Written and reopened the way acquisitions are, so rows are float32
+    # memory-map views like the ones the endpoints encode
+    writer = store.create_run(channels=data.shape[0], sample_rate=100000)
+    writer.append(data)
+    return store.open_samples(writer.close({}))
+
+
+def run(client=None, quick: bool = False) -> Dict[str, dict]:
+    """
+    Encode responses of increasing size
+
+    Args:
+        client: Unused (the response is built directly)
+        quick: Fewer sizes and repetitions
+
+    Returns:
+        Results by benchmark name
+    """
+    sizes = [10000, 100000] if quick else [10000, 100000, 500000]
+    repeats = 3 if quick else 10
+    rng = np.random.default_rng(0)
+    results = {}
+    store = RunStore(Path(tempfile.mkdtemp(prefix='daq-benchmark-encode-')))
+
+    try:
+        for samples in sizes:
+            data = rng.normal(0.0, 1.0, (4, samples))
+            response = build_read_response(data, sample_rate=100000)
+            size = len(_framework_json(response))
+
+            results[f'encode.build.samples_{samples}'] = latency(
+                [timed(build_read_response, data, 100000) for _ in range(repeats)], samples=samples
+            )
+            results[f'encode.fastapi_json.samples_{samples}'] = latency(
+                [timed(_framework_json, response) for _ in range(repeats)], samples=samples, bytes=size
+            )
+            results[f'encode.model_dump_json.samples_{samples}'] = latency(
+                [timed(response.model_dump_json) for _ in range(repeats)], samples=samples
+            )
+            results[f'encode.fast_json.samples_{samples}'] = latency(
+                [timed(_fast_json, data) for _ in range(repeats)], samples=samples, bytes=len(_fast_json(data))
+            )
+
+            stored = _stored_run(store, data)
+            results[f'encode.fast_json_stored_run.samples_{samples}'] = latency(
+                [timed(_fast_json, stored) for _ in range(repeats)], samples=samples, bytes=len(_fast_json(stored))
+            )
+    finally:
+        shutil.rmtree(store.root, ignore_errors=True)
+
+    return results
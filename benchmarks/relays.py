@@ -0,0 +1,48 @@
+"""
+Relay Switching Benchmarks
+Latency of /api/relay/{name}/{state} and /api/relays/multiple
+"""
+from typing import Dict
+
+from benchmarks.common import latency, timed
+
+# Spare module, not wired into the measured circuit
+_RELAY = 'zk3_1'
+_MULTIPLE = ['zk3_1', 'zk3_2', 'zk4_5', 'zk4_6', 'zs2_3', 'zs2_4']
+
+
+def _post(client, url: str, **kwargs):
+    response = client.post(url, **kwargs)
+    response.raise_for_status()
+
+
+def run(client, quick: bool = False) -> Dict[str, dict]:
+    """
+    Switch relays on and off through the API
+
+    Args:
+        client: TestClient of the application
+        quick: Fewer iterations
+
+    Returns:
+        Results by benchmark name
+    """
+    iterations = 50 if quick else 500
+
+    single = [
+        timed(_post, client, f'/api/relay/{_RELAY}/{"true" if n % 2 == 0 else "false"}')
+        for n in range(iterations)
+    ]
+
+    multiple = [
+        timed(_post, client, '/api/relays/multiple',
+              json={'relay_states': {relay: n % 2 == 0 for relay in _MULTIPLE}})
+        for n in range(iterations)
+    ]
+
+    _post(client, '/api/relays/disable-all')
+
+    return {
+        'relays.single': latency(single),
+        'relays.multiple': latency(multiple, relays=len(_MULTIPLE), ports=4)
+    }
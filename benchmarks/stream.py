@@ -0,0 +1,87 @@
+"""
+Streaming Benchmarks
+Sustained /ws/daq throughput with several clients sharing one hardware stream
+"""
+import json
+import struct
+import threading
+import time
+from typing import Dict
+
+from benchmarks.common import throughput
+
+STREAM_RATE = 20000
+INTERVAL = 0.05
+
+
+def _client(client, data_format: str, duration: float, start_barrier: threading.Barrier, totals: dict, lock: threading.Lock):
+    frames = samples = overruns = 0
+    with client.websocket_connect('/ws/daq') as websocket:
+        websocket.receive_text()  # connection message
+        websocket.send_json({'action': 'start', 'sample_rate': STREAM_RATE, 'interval': INTERVAL, 'format': data_format})
+        websocket.receive_text()  # streaming status
+
+        start_barrier.wait()
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline:
+            message = websocket.receive()
+            if message.get('bytes') is not None:
+                frames += 1
+                # Samples per channel, see app.services.frame_codec
+                samples += struct.unpack_from('<I', message['bytes'], 12)[0]
+                continue
+            payload = json.loads(message['text'])
+            if payload['type'] == 'data':
+                frames += 1
+                samples += len(payload['data']['adc1'])
+            elif payload['type'] == 'overrun':
+                overruns += 1
+
+    with lock:
+        totals['frames'] += frames
+        totals['samples'] += samples
+        totals['overruns'] += overruns
+
+
+def run(client, quick: bool = False) -> Dict[str, dict]:
+    """
+    Stream to N concurrent WebSocket clients and count what they receive
+
+    Client decoding runs in the same process, so the figures are a lower
+    bound for what the server can deliver.
+
+    Args:
+        client: TestClient of the application (used as a context manager, so
+                all connections share one event loop)
+        quick: Fewer client counts and a shorter duration
+
+    Returns:
+        Results by benchmark name
+    """
+    client_counts = [1, 4] if quick else [1, 4, 16]
+    duration = 1.0 if quick else 3.0
+    results = {}
+
+    for data_format in ('json', 'binary'):
+        for count in client_counts:
+            totals = {'frames': 0, 'samples': 0, 'overruns': 0}
+            lock = threading.Lock()
+            start_barrier = threading.Barrier(count)
+            threads = [
+                threading.Thread(target=_client, args=(client, data_format, duration, start_barrier, totals, lock))
+                for _ in range(count)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            name = f'stream.{data_format}.clients_{count}'
+            extra = {'clients': count, 'sample_rate': STREAM_RATE, 'overruns': totals['overruns']}
+            results[f'{name}.samples_per_s'] = throughput(totals['samples'] / duration, 'samples/s', **extra)
+            results[f'{name}.frames_per_s'] = throughput(totals['frames'] / duration, 'frames/s', **extra)
+
+            # Let the hub stop the hardware stream before the next round
+            time.sleep(0.2)
+
+    return results
@@ -147,6 +147,16 @@ let isMeasuring = false;
 let measurementTimer = null;
 let charts = {};
 let measurementData = {};
+let lastRunId = null; // Server-side run ID of the last completed measurement
+let triggerSample = 0; // Sample index at which the circuit was powered (zs1_1 switched on)
+
+// Points per channel requested for charts (server decimates larger runs)
+const CHART_POINTS = 2000;
+
+// Live progress while measuring: poll interval and preview points per channel
+const STATUS_POLL_MS = 500;
+const PREVIEW_POINTS = 500;
+let statusPollTimer = null;
 
 // Persistent measurement values (remember across circuit switches)
 let measurementValues = {
@@ -889,25 +899,14 @@ async function startMeasurement() {
     });
     
     try {
-        // ========== STEP 1: Disable any enabled relays (twice) ==========
-        console.log('📋 Step 1: Disabling all enabled relays (pass 1)...');
-        let response = await fetch('/api/relays/disable-enabled', { method: 'POST' });
-        if (!response.ok) {
-            const error = await response.json();
-            throw new Error(`Failed to disable relays (pass 1): ${error.detail || response.statusText}`);
-        }
-        console.log('✅ Pass 1 complete');
+        // The whole start-up runs as one server-side sequence, so relay
+        // steps are not separated by browser round trips
+        const steps = [];
         
-        console.log('📋 Step 1: Disabling all enabled relays (pass 2)...');
-        response = await fetch('/api/relays/disable-enabled', { method: 'POST' });
-        if (!response.ok) {
-            const error = await response.json();
-            throw new Error(`Failed to disable relays (pass 2): ${error.detail || response.statusText}`);
-        }
-        console.log('✅ Pass 2 complete');
+        // ========== STEP 1: Disable any enabled relays (twice) ==========
+        steps.push({ type: 'disable_all' }, { type: 'disable_all' });
         
         // ========== STEP 2: Discharge all capacitors ==========
-        console.log('📋 Step 2: Discharging all capacitors...');
         const capacitorsToDischarge = ['cs1', 'cs2', 'cs3', 'cs4'];
         const chosenCapacitor = selectedParams.cs;
         const dischargeResistor = selectedParams.dischargeResistor;
@@ -918,26 +917,14 @@ async function startMeasurement() {
                 ? dischargeResistor 
                 : 'rz2';
             
-            console.log(`  Discharging ${capacitor.toUpperCase()} through ${resistor.toUpperCase()}...`);
-            
-            response = await fetch('/api/discharge-capacitor', {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({
-                    capacitor: capacitor,
-                    discharge_resistor: resistor,
-                    duration: 0.2
-                })
+            console.log(`  Discharge ${capacitor.toUpperCase()} through ${resistor.toUpperCase()}`);
+            steps.push({
+                type: 'discharge',
+                capacitor: capacitor,
+                discharge_resistor: resistor,
+                duration: 0.2
             });
-            
-            if (!response.ok) {
-                const error = await response.json();
-                throw new Error(`Failed to discharge ${capacitor}: ${error.detail || response.statusText}`);
-            }
-            
-            console.log(`  ✅ ${capacitor.toUpperCase()} discharged`);
         }
-        console.log('✅ All capacitors discharged');
         
         // ========== STEP 3: Connect chosen circuit ==========
         console.log('📋 Step 3: Connecting circuit components...');
@@ -1032,57 +1019,63 @@ async function startMeasurement() {
         
         // Enable all circuit relays
         if (Object.keys(relaysToEnable).length > 0) {
-            console.log(`  Enabling ${Object.keys(relaysToEnable).length} relay(s)...`);
-            response = await fetch('/api/relays/multiple', {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ relay_states: relaysToEnable })
-            });
-            
-            if (!response.ok) {
-                const error = await response.json();
-                throw new Error(`Failed to enable circuit relays: ${error.detail || response.statusText}`);
-            }
-            console.log('✅ Circuit relays enabled');
+            steps.push({ type: 'set', relays: relaysToEnable });
         } else {
             console.warn('⚠️  No relays to enable - check component mappings');
         }
         
         // ========== STEP 4: Start ADC acquisition ==========
-        console.log('📋 Step 4: Starting ADC acquisition...');
-        const adcParams = new URLSearchParams({
+        // Component labels are stored with the run for server-side exports
+        const runParameters = {};
+        const parameterSelects = {
+            inductance: 'select-ls',
+            capacitance: 'select-cs',
+            resistance: 'select-resistance',
+            discharge_resistor: 'select-discharge'
+        };
+        Object.entries(parameterSelects).forEach(([param, selectId]) => {
+            const text = getSelectedOptionText(selectId);
+            if (text) runParameters[param] = text;
+        });
+        
+        // ========== STEP 5: Power the circuit (enable zs1_1) ==========
+        // The server arms the ADC and then switches zs1_1 itself, reporting
+        // the sample index of the switching event
+        steps.push({
+            type: 'start_adc',
             samples: measurementValues.samples,
             sample_rate: measurementValues.sampleRate,
-            measurement_time: measurementValues.measurementTime || 0
+            measurement_time: measurementValues.measurementTime || 0,
+            circuit: selectedCircuit,
+            parameters: runParameters,
+            trigger_relay: 'zs1_1'
         });
         
-        response = await fetch(`/api/start-read-adc?${adcParams}`, {
+        console.log(`📋 Running start-up sequence (${steps.length} steps)...`);
+        const response = await fetch('/api/sequence', {
             method: 'POST',
-            headers: { 'Content-Type': 'application/json' }
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ steps: steps })
         });
         
         if (!response.ok) {
             const error = await response.json();
-            throw new Error(`Failed to start ADC: ${error.detail || response.statusText}`);
+            throw new Error(`Failed to start measurement: ${error.detail || response.statusText}`);
         }
         
-        const adcResult = await response.json();
-        console.log('✅ ADC acquisition started:', adcResult);
+        const sequenceResult = await response.json();
+        triggerSample = sequenceResult.trigger ? sequenceResult.trigger.sample_index : 0;
+        console.log(`✅ ADC acquisition started, circuit powered (${sequenceResult.total_ms.toFixed(1)} ms):`, sequenceResult);
+        if (sequenceResult.trigger) {
+            const trigger = sequenceResult.trigger;
+            console.log(`⚡ zs1_1 switched at sample ${trigger.sample_index} (${trigger.mode}, ±${trigger.uncertainty_samples} samples)`);
+        }
         
         // NOW enable stop button since ADC is running
         isMeasuring = true;
         stopBtn.disabled = false;
         stopBtn.setAttribute('data-tooltip', 'Click to stop the ongoing measurement');
-        
-        // ========== STEP 5: Power the circuit (enable zs1_1) ==========
-        console.log('📋 Step 5: Powering circuit (enabling zs1_1)...');
-        response = await fetch('/api/relay/zs1_1/true', { method: 'POST' });
-        
-        if (!response.ok) {
-            const error = await response.json();
-            throw new Error(`Failed to enable zs1_1: ${error.detail || response.statusText}`);
-        }
-        console.log('✅ Circuit powered (zs1_1 enabled)');
+        startStatusPolling();
         
         
         // ========== STEP 6: Wait for measurement or stop button ==========
@@ -1126,6 +1119,7 @@ async function startMeasurement() {
         
         // Reset state
         isMeasuring = false;
+        stopStatusPolling();
         if (measurementTimer) {
             clearTimeout(measurementTimer);
             measurementTimer = null;
@@ -1151,46 +1145,47 @@ async function startMeasurement() {
  */
 async function completeMeasurement() {
     console.log('📋 Completing measurement...');
+    // The final data replaces the live preview
+    stopStatusPolling();
     
     try {
-        // ========== STEP 7: Disable circuit power (zs1_1) BEFORE stopping ADC ==========
-        // This allows ADC to capture the power-down transient behavior
-        console.log('📋 Step 7: Disabling circuit power (zs1_1)...');
-        let response = await fetch('/api/relay/zs1_1/false', { method: 'POST' });
-        
-        if (!response.ok) {
-            const error = await response.json();
-            throw new Error(`Failed to disable zs1_1: ${error.detail || response.statusText}`);
-        }
-        console.log('✅ Circuit power disabled');
-        
-        // ========== STEP 8: Stop ADC and get data ==========
-        console.log('📋 Step 8: Stopping ADC and retrieving data...');
-        response = await fetch('/api/stop-read-adc', {
+        // Steps 7-9 run as one server-side sequence
+        const response = await fetch('/api/sequence', {
             method: 'POST',
-            headers: { 'Content-Type': 'application/json' }
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({
+                steps: [
+                    // ========== STEP 7: Disable circuit power (zs1_1) BEFORE stopping ADC ==========
+                    // This allows ADC to capture the power-down transient behavior
+                    { type: 'set', relays: { zs1_1: false } },
+                    // ========== STEP 8: Stop ADC and get data ==========
+                    // Charts only need a few thousand points; full resolution stays on the server
+                    { type: 'stop_adc', decimate: 'minmax', points: CHART_POINTS },
+                    // ========== STEP 9: Disable all enabled relays ==========
+                    { type: 'disable_all' }
+                ]
+            })
         });
         
         if (!response.ok) {
             const error = await response.json();
-            throw new Error(`Failed to stop ADC: ${error.detail || response.statusText}`);
+            throw new Error(`Failed to complete measurement: ${error.detail || response.statusText}`);
         }
         
-        const result = await response.json();
+        const sequenceResult = await response.json();
+        const result = sequenceResult.acquisition;
         console.log('✅ ADC stopped, data received:', result);
         console.log(`📊 Received ${result.samples} samples from ${result.channels} channels`);
+        lastRunId = result.run_id || null;
+        if (result.trigger_sample !== null && result.trigger_sample !== undefined) {
+            triggerSample = result.trigger_sample;
+        }
+        if (lastRunId) {
+            console.log(`💾 Measurement stored as run ${lastRunId}`);
+        }
         
         // Update charts with data
-        updateChartsWithData(result.data);
-        
-        // ========== STEP 9: Disable all enabled relays ==========
-        console.log('📋 Step 9: Disabling all enabled relays...');
-        response = await fetch('/api/relays/disable-enabled', { method: 'POST' });
-        
-        if (!response.ok) {
-            const error = await response.json();
-            throw new Error(`Failed to disable relays: ${error.detail || response.statusText}`);
-        }
+        updateChartsWithData(result.data, result.indices);
         console.log('✅ All relays disabled');
         
         // ========== SUCCESS ==========
@@ -1398,15 +1393,17 @@ function initializeCharts() {
  * Update chart with new data
  * @param {string} channelId - Channel ID (e.g., 'ch1')
  * @param {Array<number>} data - Array of voltage values
+ * @param {Array<number>} [indices] - Sample index of each value (for decimated data)
  */
-function updateChart(channelId, data) {
+function updateChart(channelId, data, indices) {
     const chart = charts[channelId];
     if (!chart) return;
 
-    // Calculate time values based on sample rate
+    // Calculate time values based on sample rate, with t = 0 at the power-on switching event
     const sampleRate = measurementValues.sampleRate;
     const timeStep = 1 / sampleRate; // Time between samples in seconds
-    const timeLabels = data.map((_, i) => (i * timeStep).toFixed(6)); // Time in seconds with 6 decimal precision
+    const sampleIndices = indices || data.map((_, i) => i);
+    const timeLabels = sampleIndices.map(i => ((i - triggerSample) * timeStep).toFixed(6)); // Time in seconds with 6 decimal precision
     
     chart.data.labels = timeLabels;
     chart.data.datasets[0].data = data;
@@ -1416,40 +1413,196 @@ function updateChart(channelId, data) {
     measurementData[channelId] = {
         voltage: data,
         time: timeLabels,
-        samples: data.map((_, i) => i)
+        samples: sampleIndices
     };
 }
 
 /**
  * Sync measurement state with backend
- * Checks if backend has an active acquisition and updates UI accordingly
+ * Checks if backend has an active acquisition and updates UI accordingly.
+ * While measuring, shows the acquisition's progress and plots the preview
+ * of its most recent samples.
  */
 async function syncMeasurementState() {
     try {
-        const response = await fetch('/api/adc-status');
+        const response = await fetch(`/api/adc-status?preview_points=${PREVIEW_POINTS}`);
         if (!response.ok) {
             console.warn('Could not sync measurement state with backend');
             return;
         }
         
         const status = await response.json();
-        console.log('Backend measurement status:', status);
         
         // If backend says no acquisition is running, ensure frontend reflects that
         if (!status.is_running && isMeasuring) {
             console.log('Syncing state: Backend has no active acquisition');
             isMeasuring = false;
+            stopStatusPolling();
             if (measurementTimer) {
                 clearTimeout(measurementTimer);
                 measurementTimer = null;
             }
             validateParameters();
+            return;
+        }
+        
+        // Polling may have been stopped while the request was in flight
+        if (status.is_running && isMeasuring && statusPollTimer !== null) {
+            updateMeasurementProgress(status.progress);
+            if (status.preview) {
+                updateChartsWithData(status.preview.data, status.preview.indices);
+            }
         }
     } catch (error) {
         console.error('Error syncing measurement state:', error);
     }
 }
 
+/**
+ * Poll the acquisition status until stopStatusPolling() is called
+ */
+function startStatusPolling() {
+    stopStatusPolling();
+    const poll = async () => {
+        await syncMeasurementState();
+        if (statusPollTimer !== null) {
+            statusPollTimer = setTimeout(poll, STATUS_POLL_MS);
+        }
+    };
+    statusPollTimer = setTimeout(poll, STATUS_POLL_MS);
+}
+
+/**
+ * Stop polling the acquisition status and clear the progress line
+ */
+function stopStatusPolling() {
+    if (statusPollTimer !== null) {
+        clearTimeout(statusPollTimer);
+        statusPollTimer = null;
+    }
+    updateMeasurementProgress(null);
+}
+
+/**
+ * Show the progress of the running acquisition below the measurement buttons
+ * @param {Object|null} progress - `progress` of /api/adc-status, or null to clear
+ */
+function updateMeasurementProgress(progress) {
+    const element = document.getElementById('measurementProgress');
+    if (!element) return;
+    
+    element.className = 'measurement-progress';
+    if (!progress) {
+        element.textContent = '';
+        return;
+    }
+    
+    const riskLabels = {
+        en: { low: 'low', elevated: 'elevated', high: 'high', overrun: 'overrun' },
+        pl: { low: 'niskie', elevated: 'podwyższone', high: 'wysokie', overrun: 'przepełnienie' }
+    };
+    const samples = progress.samples.toLocaleString(currentLanguage === 'en' ? 'en-US' : 'pl-PL');
+    const fill = progress.buffer_fill_percent.toFixed(0);
+    const risk = riskLabels[currentLanguage][progress.overrun_risk] || progress.overrun_risk;
+    element.textContent = currentLanguage === 'en'
+        ? `⏺ ${progress.elapsed_s.toFixed(1)} s · ${samples} samples · buffer ${fill}% (overrun risk: ${risk})`
+        : `⏺ ${progress.elapsed_s.toFixed(1)} s · ${samples} próbek · bufor ${fill}% (ryzyko przepełnienia: ${risk})`;
+    element.classList.add(`risk-${progress.overrun_risk}`);
+}
+
+// ============== Live Stream (WebSocket) ==============
+
+const DAQ_FRAME_HEADER_SIZE = 36;
+const DAQ_FRAME_ENCODING_INT16 = 1;
+
+/**
+ * Decode a binary ADC frame received from /ws/daq
+ * Layout is described in app/services/frame_codec.py (little-endian)
+ * @param {ArrayBuffer} buffer - Binary frame
+ * @returns {Object} Frame with seq, t0, dt and one Float32Array per channel
+ */
+function decodeDaqFrame(buffer) {
+    const view = new DataView(buffer);
+    const magic = String.fromCharCode(
+        view.getUint8(0), view.getUint8(1), view.getUint8(2), view.getUint8(3)
+    );
+    if (magic !== 'NIDQ') {
+        throw new Error('Invalid DAQ frame');
+    }
+    
+    const encoding = view.getUint8(5);
+    const channelCount = view.getUint16(6, true);
+    const seq = view.getUint32(8, true);
+    const samples = view.getUint32(12, true);
+    const t0 = view.getFloat64(16, true);
+    const dt = view.getFloat64(24, true);
+    const scale = view.getFloat32(32, true);
+    
+    // Typed array views use platform byte order, which is little-endian in all browsers we target
+    const count = samples * channelCount;
+    const interleaved = encoding === DAQ_FRAME_ENCODING_INT16
+        ? new Int16Array(buffer, DAQ_FRAME_HEADER_SIZE, count)
+        : new Float32Array(buffer, DAQ_FRAME_HEADER_SIZE, count);
+    
+    // De-interleave into one array per channel
+    const channels = [];
+    for (let c = 0; c < channelCount; c++) {
+        const channel = new Float32Array(samples);
+        for (let i = 0, j = c; i < samples; i++, j += channelCount) {
+            channel[i] = interleaved[j] * scale;
+        }
+        channels.push(channel);
+    }
+    
+    return { seq, t0, dt, samples, channels };
+}
+
+/**
+ * Open a live data stream from /ws/daq
+ * @param {Object} options - { sampleRate, interval, format: 'json'|'binary', encoding: 'float32'|'int16' }
+ * @param {Function} onBlock - Called with { seq, t0, dt, channels } for every data block
+ * @returns {WebSocket} The socket; call close() to stop streaming
+ */
+function openLiveStream(options, onBlock) {
+    const protocol = window.location.protocol === 'https:' ? 'wss' : 'ws';
+    const socket = new WebSocket(`${protocol}://${window.location.host}/ws/daq`);
+    socket.binaryType = 'arraybuffer';
+    
+    socket.onopen = () => {
+        socket.send(JSON.stringify({
+            action: 'start',
+            sample_rate: options.sampleRate || 100,
+            interval: options.interval || 0.1,
+            format: options.format || 'binary',
+            encoding: options.encoding || 'float32'
+        }));
+    };
+    
+    socket.onmessage = (event) => {
+        if (event.data instanceof ArrayBuffer) {
+            onBlock(decodeDaqFrame(event.data));
+            return;
+        }
+        
+        const message = JSON.parse(event.data);
+        if (message.type === 'data') {
+            onBlock({
+                seq: message.seq,
+                t0: message.t0,
+                dt: message.dt,
+                samples: message.data.adc1.length,
+                channels: ['adc1', 'adc2', 'adc3', 'adc4'].map(adc => Float32Array.from(message.data[adc]))
+            });
+        } else if (message.type === 'error') {
+            console.error('Live stream error:', message.message);
+        } else {
+            console.log('Live stream:', message);
+        }
+    };
+    
+    return socket;
+}
+
 /**
  * Legacy function kept for backwards compatibility
  * NOTE: The main measurement workflow is now in startMeasurement()
@@ -1488,8 +1641,10 @@ function simulateMeasurementData() {
 
 /**
  * Update charts with real data from backend
+ * @param {Object} data - Values per ADC channel (adc1..adc4)
+ * @param {Object} [indices] - Sample indices per ADC channel when data is decimated
  */
-function updateChartsWithData(data) {
+function updateChartsWithData(data, indices) {
     // Map ADC channels to chart IDs based on selected circuit
     const channelMappings = {
         'rl': [
@@ -1517,21 +1672,51 @@ function updateChartsWithData(data) {
     // Update each chart with corresponding ADC data
     mapping.forEach(({ adc, chartId }) => {
         if (data[adc] && charts[chartId]) {
-            updateChart(chartId, data[adc]);
+            updateChart(chartId, data[adc], indices ? indices[adc] : undefined);
         }
     });
 }
 
+/**
+ * Fetch the full-resolution data of the last measurement
+ * Charts only hold decimated points, exports need every sample
+ * @returns {Promise<Object|null>} Values per ADC channel (adc1..adc4), or null if unavailable
+ */
+async function fetchFullResolutionData() {
+    try {
+        const response = await fetch('/api/adc-data');
+        if (!response.ok) {
+            console.warn('Full-resolution data not available, exporting chart data');
+            return null;
+        }
+        const result = await response.json();
+        return result.data;
+    } catch (error) {
+        console.error('Error fetching full-resolution data:', error);
+        return null;
+    }
+}
+
 /**
  * Save results to JSON file
  */
-function saveResultsJSON() {
+async function saveResultsJSON() {
     if (Object.keys(measurementData).length === 0) {
         alert('No measurement data to save');
         return;
     }
     
-    const exportData = prepareExportData();
+    let exportData;
+    if (lastRunId) {
+        // Stored runs can be millions of samples; the full-resolution data
+        // is exported by the server (CSV, NPY, Parquet, HDF5), the JSON file
+        // holds the decimated chart data
+        exportData = prepareExportData(null);
+        exportData.metadata.runId = lastRunId;
+        exportData.metadata.fullResolutionExport = `/api/runs/${encodeURIComponent(lastRunId)}/export`;
+    } else {
+        exportData = prepareExportData(await fetchFullResolutionData());
+    }
     
     // Convert to JSON with formatting
     const dataStr = JSON.stringify(exportData, null, 2);
@@ -1550,16 +1735,49 @@ function saveResultsJSON() {
     console.log('Results saved to JSON file');
 }
 
+/**
+ * Get the text of the selected option of a select element
+ * @param {string} selectId - Select element ID
+ * @returns {string|null} Option text, or null if nothing is selected
+ */
+function getSelectedOptionText(selectId) {
+    const selectElement = document.getElementById(selectId);
+    if (!selectElement || !selectElement.value) return null;
+    const selectedOption = selectElement.options[selectElement.selectedIndex];
+    return selectedOption ? selectedOption.text : null;
+}
+
+/**
+ * Download the last measurement run as a file generated by the server
+ * The server streams the file from disk, so run length does not matter
+ * @param {string} format - Export format ('csv', 'npy', 'parquet', 'hdf5')
+ */
+function downloadRunExport(format) {
+    const link = document.createElement('a');
+    link.href = `/api/runs/${encodeURIComponent(lastRunId)}/export?format=${format}`;
+    document.body.appendChild(link);
+    link.click();
+    document.body.removeChild(link);
+    
+    console.log(`Run ${lastRunId} exported as ${format.toUpperCase()}`);
+}
+
 /**
  * Save results to CSV file
  */
-function saveResultsCSV() {
+async function saveResultsCSV() {
     if (Object.keys(measurementData).length === 0) {
         alert('No measurement data to save');
         return;
     }
     
-    const exportData = prepareExportData();
+    // Stored runs are exported by the server instead of building the file here
+    if (lastRunId) {
+        downloadRunExport('csv');
+        return;
+    }
+    
+    const exportData = prepareExportData(await fetchFullResolutionData());
     
     // Build CSV content
     let csvContent = '';
@@ -1641,9 +1859,10 @@ function saveResultsCSV() {
 
 /**
  * Prepare export data structure (common for JSON and CSV)
+ * @param {Object} [fullData] - Full-resolution values per ADC channel; chart data is used if missing
  * @returns {Object} Export data with metadata, parameters, and channels
  */
-function prepareExportData() {
+function prepareExportData(fullData) {
     // Get selected parameters for metadata
     const selectLs = document.getElementById('select-ls');
     const selectCs = document.getElementById('select-cs');
@@ -1663,10 +1882,12 @@ function prepareExportData() {
     
     activeChannels.forEach(channel => {
         if (measurementData[channel.id]) {
-            const channelData = measurementData[channel.id];
+            // Chart IDs ch1..ch4 correspond to ADC channels adc1..adc4
+            const adc = channel.id.replace('ch', 'adc');
+            const channelData = (fullData && fullData[adc]) ? fullData[adc] : measurementData[channel.id];
             // Handle both old format (array) and new format (object with voltage/time/samples)
             const voltageData = channelData.voltage || channelData;
-            const timeData = channelData.time || voltageData.map((_, i) => (i / measurementValues.sampleRate).toFixed(6));
+            const timeData = channelData.time || voltageData.map((_, i) => ((i - triggerSample) / measurementValues.sampleRate).toFixed(6)); // Same time axis as the charts
             const samplesData = channelData.samples || voltageData.map((_, i) => i);
             
             channelsExport[channel.id] = {
@@ -1691,6 +1912,8 @@ function prepareExportData() {
             samplesPerChannel: measurementValues.samples,
             sampleRate: measurementValues.sampleRate,
             sampleRateUnit: 'Hz',
+            triggerSample: triggerSample,
+            dataResolution: fullData ? 'full' : 'decimated', // 'decimated': the chart points only
             measurementTime: measurementValues.measurementTime,
             measurementTimeUnit: 's'
         },